@@ -0,0 +1,73 @@
+"""add composite indexes for per-user time-window queries
+
+Tables were historically created by init_db.py, so this first revision
+assumes they already exist and only adds the indexes. Fresh databases
+created by init_db.py are stamped at head and skip it.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_career_goals_user_id_status",
+        "career_goals",
+        ["user_id", "status"],
+    )
+    op.create_index(
+        "ix_health_records_user_id_recorded_at",
+        "health_records",
+        ["user_id", "recorded_at"],
+    )
+    op.create_index(
+        "ix_health_records_user_id_record_type_recorded_at",
+        "health_records",
+        ["user_id", "record_type", "recorded_at"],
+    )
+    op.create_index(
+        "ix_financial_transactions_user_id_transaction_date",
+        "financial_transactions",
+        ["user_id", "transaction_date"],
+    )
+    op.create_index(
+        "ix_ml_recommendations_user_id_type_created_at",
+        "ml_recommendations",
+        ["user_id", "recommendation_type", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_ml_recommendations_user_id_type_created_at",
+        table_name="ml_recommendations",
+    )
+    op.drop_index(
+        "ix_financial_transactions_user_id_transaction_date",
+        table_name="financial_transactions",
+    )
+    op.drop_index(
+        "ix_health_records_user_id_record_type_recorded_at",
+        table_name="health_records",
+    )
+    op.drop_index(
+        "ix_health_records_user_id_recorded_at",
+        table_name="health_records",
+    )
+    op.drop_index(
+        "ix_career_goals_user_id_status",
+        table_name="career_goals",
+    )
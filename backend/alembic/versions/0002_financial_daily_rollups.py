@@ -0,0 +1,62 @@
+"""add financial_daily_rollups and backfill from financial_transactions
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "financial_daily_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("transaction_type", sa.String(), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("total_amount", sa.Float(), nullable=False),
+        sa.Column("transaction_count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "day", "transaction_type", "category",
+            name="uq_financial_daily_rollups_user_day_type_category"
+        ),
+    )
+    op.create_index(
+        "ix_financial_daily_rollups_id", "financial_daily_rollups", ["id"]
+    )
+    # Same day bucketing as shared.finance_rollups.rollup_day (UTC)
+    op.execute(
+        """
+        INSERT INTO financial_daily_rollups
+            (user_id, day, transaction_type, category, total_amount, transaction_count)
+        SELECT user_id,
+               CAST(transaction_date AT TIME ZONE 'UTC' AS DATE),
+               transaction_type,
+               category,
+               SUM(amount),
+               COUNT(*)
+        FROM financial_transactions
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_financial_daily_rollups_id", table_name="financial_daily_rollups"
+    )
+    op.drop_table("financial_daily_rollups")
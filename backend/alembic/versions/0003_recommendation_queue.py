@@ -0,0 +1,49 @@
+"""add recommendation_queue for the background recommendation worker
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recommendation_queue",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("recommendation_type", sa.String(), nullable=False),
+        sa.Column("first_enqueued_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("enqueued_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "user_id", "recommendation_type",
+            name="uq_recommendation_queue_user_type"
+        ),
+    )
+    op.create_index(
+        "ix_recommendation_queue_id", "recommendation_queue", ["id"]
+    )
+    op.create_index(
+        "ix_recommendation_queue_enqueued_at", "recommendation_queue", ["enqueued_at"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_recommendation_queue_enqueued_at", table_name="recommendation_queue"
+    )
+    op.drop_index("ix_recommendation_queue_id", table_name="recommendation_queue")
+    op.drop_table("recommendation_queue")
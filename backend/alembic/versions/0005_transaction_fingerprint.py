@@ -0,0 +1,54 @@
+"""add financial_transactions.fingerprint for statement import dedupe
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "financial_transactions",
+        sa.Column("fingerprint", sa.String(length=32), nullable=True),
+    )
+    # Same inputs as shared.finance_import.transaction_fingerprint:
+    # UTC day, amount signed by type to 2 places, normalized description
+    op.execute(
+        r"""
+        UPDATE financial_transactions
+        SET fingerprint = md5(
+            to_char(CAST(transaction_date AT TIME ZONE 'UTC' AS DATE), 'YYYY-MM-DD')
+            || '|' ||
+            CAST(round(CAST(
+                CASE WHEN transaction_type = 'income' THEN amount ELSE -amount END
+                AS numeric), 2) AS text)
+            || '|' ||
+            lower(btrim(regexp_replace(coalesce(description, ''), '\s+', ' ', 'g')))
+        )
+        """
+    )
+    op.create_index(
+        "ix_financial_transactions_user_id_fingerprint",
+        "financial_transactions",
+        ["user_id", "fingerprint"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_financial_transactions_user_id_fingerprint",
+        table_name="financial_transactions",
+    )
+    op.drop_column("financial_transactions", "fingerprint")
@@ -0,0 +1,34 @@
+"""partition health_records and financial_transactions by month
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from shared.partitioning import PARTITIONED_TABLES, partition_all, unpartition_table, is_partitioned
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Rewrites both tables (copying every row) under an exclusive lock;
+    # PostgreSQL only, other databases keep plain tables
+    partition_all(op.get_bind())
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if conn.dialect.name != "postgresql":
+        return
+    for table in PARTITIONED_TABLES:
+        if is_partitioned(conn, table):
+            unpartition_table(conn, table)
@@ -0,0 +1,112 @@
+"""ml_recommendations fingerprint, expiry and unread index
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "ml_recommendations",
+        sa.Column("fingerprint", sa.String(length=32), nullable=True),
+    )
+    op.add_column(
+        "ml_recommendations",
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    # Same inputs as shared.recommendation_store.recommendation_fingerprint;
+    # existing rows get the default 30 day lifetime from their creation
+    op.execute(
+        """
+        UPDATE ml_recommendations
+        SET fingerprint = md5(title || '|' || description),
+            expires_at = date_trunc('day', coalesce(created_at, now()) AT TIME ZONE 'UTC')
+                AT TIME ZONE 'UTC' + interval '31 days',
+            is_read = coalesce(is_read, false)
+        """
+    )
+    # Collapse duplicates onto the newest row, which stays read if any copy was
+    op.execute(
+        """
+        UPDATE ml_recommendations AS keep
+        SET is_read = true
+        FROM (
+            SELECT max(id) AS id, bool_or(is_read) AS is_read
+            FROM ml_recommendations
+            GROUP BY user_id, recommendation_type, fingerprint
+            HAVING count(*) > 1
+        ) AS dup
+        WHERE keep.id = dup.id AND dup.is_read
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM ml_recommendations AS r
+        USING ml_recommendations AS newer
+        WHERE newer.user_id = r.user_id
+          AND newer.recommendation_type = r.recommendation_type
+          AND newer.fingerprint = r.fingerprint
+          AND newer.id > r.id
+        """
+    )
+    op.alter_column("ml_recommendations", "fingerprint", nullable=False)
+    op.alter_column("ml_recommendations", "expires_at", nullable=False)
+    op.alter_column(
+        "ml_recommendations", "is_read",
+        nullable=False, server_default=sa.false(),
+    )
+
+    op.drop_index(
+        "ix_ml_recommendations_user_id_type_created_at",
+        table_name="ml_recommendations",
+    )
+    op.create_unique_constraint(
+        "uq_ml_recommendations_user_type_fingerprint",
+        "ml_recommendations",
+        ["user_id", "recommendation_type", "fingerprint"],
+    )
+    op.create_index(
+        "ix_ml_recommendations_unread",
+        "ml_recommendations",
+        ["user_id", "recommendation_type", "created_at"],
+        postgresql_where=sa.text("NOT is_read"),
+    )
+    op.create_index(
+        "ix_ml_recommendations_expires_at",
+        "ml_recommendations",
+        ["expires_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ml_recommendations_expires_at", table_name="ml_recommendations")
+    op.drop_index("ix_ml_recommendations_unread", table_name="ml_recommendations")
+    op.drop_constraint(
+        "uq_ml_recommendations_user_type_fingerprint",
+        "ml_recommendations",
+        type_="unique",
+    )
+    op.create_index(
+        "ix_ml_recommendations_user_id_type_created_at",
+        "ml_recommendations",
+        ["user_id", "recommendation_type", "created_at"],
+    )
+    op.alter_column(
+        "ml_recommendations", "is_read",
+        nullable=True, server_default=None,
+    )
+    op.drop_column("ml_recommendations", "expires_at")
+    op.drop_column("ml_recommendations", "fingerprint")
@@ -0,0 +1,99 @@
+"""
+Async endpoints for the auth service (DB_MODE=async)
+Mirrors the sync endpoints in main.py on an AsyncSession.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import timedelta
+from shared.database import get_async_db
+from shared.models import User
+from shared.schemas import UserCreate, UserResponse, Token
+from shared.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from shared.hashing import (
+    hash_password_async,
+    verify_password_with_rehash_async,
+    hashing_busy_exception,
+    HashingOverloaded
+)
+from shared.auth import get_current_user_async, invalidate_user, update_user, UserPrincipal
+
+router = APIRouter()
+
+@router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """Register a new user"""
+    db_user = (await db.execute(
+        select(User).where(
+            (User.email == user_data.email) | (User.username == user_data.username)
+        )
+    )).scalars().first()
+    if db_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email or username already registered"
+        )
+
+    try:
+        hashed_password = await hash_password_async(user_data.password)
+    except HashingOverloaded:
+        raise hashing_busy_exception()
+    db_user = User(
+        email=user_data.email,
+        username=user_data.username,
+        hashed_password=hashed_password,
+        full_name=user_data.full_name
+    )
+    db.add(db_user)
+    await db.commit()
+    await db.refresh(db_user)
+    return db_user
+
+@router.post("/token", response_model=Token)
+async def login(
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Authenticate user and return JWT token"""
+    user = (await db.execute(
+        select(User).where(User.username == form_data.username)
+    )).scalars().first()
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = await verify_password_with_rehash_async(
+                form_data.password, user.hashed_password
+            )
+        except HashingOverloaded:
+            raise hashing_busy_exception()
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Upgrade hashes made with an old scheme or cost
+    revision = user.revision
+    if new_hash:
+        revision = (await db.execute(
+            update_user(user.id, hashed_password=new_hash)
+        )).scalar_one()
+        await db.commit()
+        invalidate_user(user.id)
+
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": user.username, "uid": user.id, "ver": revision},
+        expires_delta=access_token_expires
+    )
+    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.get("/me", response_model=UserResponse)
+async def get_current_user_info(
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get current user information"""
+    return await db.get(User, current_user.id)
@@ -2,18 +2,26 @@ from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from datetime import timedelta
-from shared.database import get_db
+from shared.database import get_db, DB_MODE
+from shared.routing import use_async_routes
 from shared.models import User
 from shared.schemas import UserCreate, UserResponse, Token
-from shared.security import (
-    verify_password,
-    get_password_hash,
-    create_access_token,
-    ACCESS_TOKEN_EXPIRE_MINUTES
+from shared.security import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from shared.hashing import (
+    hash_password,
+    verify_password_with_rehash,
+    shutdown_pool,
+    hashing_busy_exception,
+    HashingOverloaded
 )
-from shared.auth import get_current_user
+from shared.auth import get_current_user, invalidate_user, update_user, UserPrincipal
+from shared.rate_limit import LoadSheddingMiddleware
+from auth_service.async_routes import router as async_router
 
 app = FastAPI(title="ThriveMentor Auth Service", version="1.0.0")
+app.add_middleware(LoadSheddingMiddleware)
+
+app.add_event_handler("shutdown", shutdown_pool)
 
 @app.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 def register(user_data: UserCreate, db: Session = Depends(get_db)):
@@ -29,7 +37,10 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    try:
+        hashed_password = hash_password(user_data.password)
+    except HashingOverloaded:
+        raise hashing_busy_exception()
     db_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -48,26 +59,51 @@ def login(
 ):
     """Authenticate user and return JWT token"""
     user = db.query(User).filter(User.username == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    valid, new_hash = False, None
+    if user:
+        try:
+            valid, new_hash = verify_password_with_rehash(
+                form_data.password, user.hashed_password
+            )
+        except HashingOverloaded:
+            raise hashing_busy_exception()
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Upgrade hashes made with an old scheme or cost
+    revision = user.revision
+    if new_hash:
+        revision = (db.execute(
+            update_user(user.id, hashed_password=new_hash)
+        )).scalar_one()
+        db.commit()
+        invalidate_user(user.id)
+    
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data={"sub": user.username, "uid": user.id, "ver": revision},
+        expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
 
 @app.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
     """Get current user information"""
-    return current_user
+    # The principal only carries what auth checks need; load the full profile
+    return db.get(User, current_user.id)
 
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "auth_service"}
 
+# DB_MODE=async: serve the AsyncSession endpoints on the same paths
+if DB_MODE == "async":
+    use_async_routes(app, async_router)
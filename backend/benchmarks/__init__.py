@@ -0,0 +1 @@
+"""Performance benchmarks; run from the backend directory with python -m benchmarks.<name>"""
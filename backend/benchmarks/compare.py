@@ -0,0 +1,45 @@
+"""
+Compare two benchmarks.load result files
+Prints each route's p50/p95/p99 and throughput side by side with the
+relative change:
+
+    python -m benchmarks.compare results/before.json results/after.json
+"""
+import argparse
+import json
+
+METRICS = ["p50_ms", "p95_ms", "p99_ms", "throughput_rps"]
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("before", help="baseline results file")
+    parser.add_argument("after", help="results file to compare")
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+
+    for key in ("database", "db_mode", "transport", "concurrency", "users"):
+        if before["meta"].get(key) != after["meta"].get(key):
+            print(f"Note: {key} differs ({before['meta'].get(key)} vs {after['meta'].get(key)})")
+    print(f"{before['meta'].get('commit')} -> {after['meta'].get('commit')}")
+    print(f"{'route':<45}" + "".join(f"{metric:>26}" for metric in METRICS))
+    for name, result in after["routes"].items():
+        baseline = before["routes"].get(name)
+        if baseline is None:
+            print(f"{name:<45} (new)")
+            continue
+        print(f"{name:<45}" + "".join(
+            f"{baseline[metric]:>9.2f} -> {result[metric]:>8.2f} {change(baseline[metric], result[metric]):>7}"
+            for metric in METRICS
+        ))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Synthetic data for benchmarks
+Bulk-loads users with goals, health records, transactions (plus their
+daily rollups) and recommendations into DATABASE_URL. Each user's data
+depends only on the seed and the user's position, so the same arguments
+always give the same data:
+
+    python -m benchmarks.datagen --users 1000 --days 90
+
+Use a scratch database; --reset drops and recreates every table.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import numpy as np
+from sqlalchemy import insert, select
+from shared.database import Base, SessionLocal, engine
+from shared.models import (
+    User, CareerGoal, HealthRecord, FinancialTransaction, MLRecommendation
+)
+from shared.security import get_password_hash
+from shared.finance_import import transaction_fingerprint
+from shared.finance_rollups import apply_to_rollups
+from shared.recommendation_store import expiry, recommendation_row
+from shared import ml_service
+
+USERNAME_PREFIX = "bench"
+# Every generated user can log in with this password
+PASSWORD = "benchmark-password"
+
+GOAL_TITLES = [
+    "Get promoted to senior engineer", "Learn a new programming language",
+    "Earn a cloud certification", "Build a professional network",
+    "Switch to a product management role", "Publish a technical blog series",
+    "Mentor junior colleagues", "Improve public speaking",
+]
+GOAL_STATUSES = ["in_progress", "completed", "on_hold"]
+GOAL_STATUS_WEIGHTS = [0.6, 0.25, 0.15]
+
+EXERCISES = ["running", "cycling", "swimming", "gym", "yoga", "walking"]
+
+# category -> (share of expenses, median amount, merchants)
+EXPENSE_CATEGORIES = {
+    "food": (0.35, 14.0, ["Grocery Mart", "Corner Cafe", "Pizza Place", "Sushi Bar"]),
+    "transport": (0.15, 9.0, ["Metro Card", "Rideshare", "Fuel Station"]),
+    "shopping": (0.15, 38.0, ["Online Store", "Book Shop", "Clothing Co"]),
+    "entertainment": (0.10, 22.0, ["Cinema", "Streaming Service", "Concert Tickets"]),
+    "utilities": (0.05, 75.0, ["Electric Company", "Water Utility", "Mobile Carrier"]),
+    "health": (0.05, 30.0, ["Pharmacy", "Dental Clinic"]),
+    "travel": (0.03, 180.0, ["Airline", "Hotel Booking"]),
+    "other": (0.12, 18.0, ["Gift Shop", "Hardware Store", "Charity"]),
+}
+
+RECOMMENDATION_TITLES = {
+    "career": [
+        ("Update Your LinkedIn Profile", 0.85),
+        ("Take an Online Course", 0.78),
+    ],
+    "health": [
+        (rec["title"], rec["confidence_score"]) for rec in (
+            ml_service.START_TRACKING_HEALTH, ml_service.MAINTAIN_EXERCISE,
+            ml_service.MONITOR_SLEEP,
+        )
+    ],
+    "finance": [
+        (rec["title"], rec["confidence_score"]) for rec in (
+            ml_service.START_TRACKING_EXPENSES, ml_service.CONSIDER_BUDGETING,
+            ml_service.START_INVESTING, ml_service.REVIEW_FINANCIAL_GOALS,
+        )
+    ],
+}
+
+def username(index: int) -> str:
+    return f"{USERNAME_PREFIX}{index:07d}"
+
+def _at(now: datetime, rng, day: int) -> datetime:
+    """A random time of day `day` days ago"""
+    return now - timedelta(days=int(day), seconds=int(rng.integers(0, 86400)))
+
+def user_goals(rng, user_id: int, now: datetime) -> list:
+    rows = []
+    for _ in range(min(int(rng.poisson(2.0)), len(GOAL_TITLES))):
+        status = rng.choice(GOAL_STATUSES, p=GOAL_STATUS_WEIGHTS)
+        created_at = _at(now, rng, rng.integers(0, 365))
+        rows.append({
+            "user_id": user_id,
+            "title": str(rng.choice(GOAL_TITLES)),
+            "description": "Generated benchmark goal",
+            "target_date": created_at + timedelta(days=int(rng.integers(30, 540))),
+            "status": str(status),
+            "progress_percentage": 100.0 if status == "completed" else float(rng.integers(0, 91)),
+            "created_at": created_at,
+        })
+    return rows
+
+def user_health_records(rng, user_id: int, now: datetime, days: int) -> list:
+    # A tenth of users never log anything; the rest log more or less often
+    if rng.random() < 0.1:
+        return []
+    engagement = rng.beta(2, 2)
+    base_weight = float(np.clip(rng.normal(75, 12), 45, 150))
+    trend = rng.normal(0, 0.02)
+    rows = []
+
+    def record(day, record_type, value, unit, notes=None):
+        recorded_at = _at(now, rng, day)
+        rows.append({
+            "user_id": user_id, "record_type": record_type, "value": round(float(value), 2),
+            "unit": unit, "notes": notes, "recorded_at": recorded_at, "created_at": recorded_at,
+        })
+
+    for day in range(days):
+        if rng.random() < 0.3 * engagement:
+            record(day, "weight", base_weight - trend * day + rng.normal(0, 0.4), "kg")
+        if rng.random() < 0.5 * engagement:
+            record(day, "exercise", rng.lognormal(np.log(35), 0.5), "minutes",
+                   str(rng.choice(EXERCISES)))
+        if rng.random() < 0.25 * engagement:
+            record(day, "mood", np.clip(round(rng.normal(6.5, 1.8)), 1, 10), "score")
+        if rng.random() < 0.7 * engagement:
+            record(day, "sleep", np.clip(rng.normal(7.1, 1.0), 3, 12), "hours")
+    return rows
+
+def user_transactions(rng, user_id: int, now: datetime, days: int) -> list:
+    if rng.random() < 0.1:
+        return []
+    engagement = rng.beta(2, 2)
+    salary = round(float(rng.lognormal(np.log(4000), 0.4)), 2)
+    categories = list(EXPENSE_CATEGORIES)
+    shares = [EXPENSE_CATEGORIES[category][0] for category in categories]
+    rows = []
+
+    def transaction(day, transaction_type, category, amount, description):
+        transaction_date = _at(now, rng, day)
+        amount = round(float(amount), 2)
+        rows.append({
+            "user_id": user_id, "transaction_type": transaction_type, "category": category,
+            "amount": amount, "description": description,
+            "transaction_date": transaction_date, "created_at": transaction_date,
+            "fingerprint": transaction_fingerprint(
+                transaction_type, amount, description, transaction_date
+            ),
+        })
+
+    for day in range(days):
+        if day % 30 == 0:
+            transaction(day, "income", "salary", salary, "Monthly salary")
+            transaction(day, "expense", "rent", salary * rng.uniform(0.2, 0.4), "Rent")
+            if rng.random() < 0.5:
+                transaction(day, "investment", str(rng.choice(["stocks", "retirement"])),
+                            salary * rng.uniform(0.05, 0.15), "Monthly investment")
+        if rng.random() < 0.03:
+            transaction(day, "income", "freelance", rng.lognormal(np.log(500), 0.6),
+                        "Freelance project")
+        for _ in range(int(rng.poisson(2.0 * engagement))):
+            category = str(rng.choice(categories, p=shares))
+            _, median, merchants = EXPENSE_CATEGORIES[category]
+            transaction(day, "expense", category, rng.lognormal(np.log(median), 0.6),
+                        str(rng.choice(merchants)))
+    return rows
+
+def user_recommendations(rng, user_id: int, now: datetime) -> list:
+    rows = []
+    for recommendation_type, candidates in RECOMMENDATION_TITLES.items():
+        for index in rng.permutation(len(candidates))[:int(rng.integers(0, 3))]:
+            title, confidence_score = candidates[index]
+            created_at = _at(now, rng, rng.integers(0, 30))
+            rows.append({
+                **recommendation_row(user_id, recommendation_type, {
+                    "title": title, "description": f"{title} (generated)",
+                    "confidence_score": confidence_score,
+                }, expiry(created_at)),
+                "is_read": bool(rng.random() < 0.3),
+                "created_at": created_at,
+            })
+    return rows
+
+def generate(users: int, days: int = 90, seed: int = 0, chunk_size: int = 200) -> dict:
+    """Load `users` generated users and their data; returns row counts"""
+    now = datetime.now(timezone.utc)
+    # One hash for everyone: hashing per user would dominate the load time
+    hashed_password = get_password_hash(PASSWORD)
+    counts = {"users": 0, "goals": 0, "health_records": 0, "transactions": 0,
+              "recommendations": 0}
+    db = SessionLocal()
+    try:
+        if db.scalar(select(User.id).where(User.username == username(0))) is not None:
+            raise SystemExit("Benchmark users already exist; use --reset or a fresh database")
+        for start in range(0, users, chunk_size):
+            indexes = range(start, min(start + chunk_size, users))
+            user_ids = db.scalars(
+                insert(User).returning(User.id, sort_by_parameter_order=True),
+                [{
+                    "email": f"{username(i)}@example.com",
+                    "username": username(i),
+                    "hashed_password": hashed_password,
+                    "full_name": f"Benchmark User {i}",
+                    "created_at": now,
+                } for i in indexes]
+            ).all()
+            goals, records, transactions, recommendations = [], [], [], []
+            for i, user_id in zip(indexes, user_ids):
+                rng = np.random.default_rng([seed, i])
+                goals += user_goals(rng, user_id, now)
+                records += user_health_records(rng, user_id, now, days)
+                transactions += user_transactions(rng, user_id, now, days)
+                recommendations += user_recommendations(rng, user_id, now)
+            for model, rows in ((CareerGoal, goals), (HealthRecord, records),
+                                (FinancialTransaction, transactions),
+                                (MLRecommendation, recommendations)):
+                if rows:
+                    db.execute(insert(model), rows)
+            apply_to_rollups(db, [SimpleNamespace(**row) for row in transactions])
+            db.commit()
+            counts["users"] += len(user_ids)
+            counts["goals"] += len(goals)
+            counts["health_records"] += len(records)
+            counts["transactions"] += len(transactions)
+            counts["recommendations"] += len(recommendations)
+    finally:
+        db.close()
+    return counts
+
+def reset_database():
+    """Drop and recreate every table (scratch databases only)"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000, help="users to generate")
+    parser.add_argument("--days", type=int, default=90, help="days of history per user")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args()
+
+    if args.reset:
+        reset_database()
+    else:
+        Base.metadata.create_all(bind=engine)
+    print(f"Generating {args.users} users with {args.days} days of history...")
+    start = time.perf_counter()
+    counts = generate(args.users, args.days, args.seed)
+    elapsed = time.perf_counter() - start
+    print(", ".join(f"{count} {name}" for name, count in counts.items()) + f" in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""
+API latency benchmark
+Seeds a database with benchmarks.datagen, then calls every endpoint many
+times as randomly chosen generated users and reports throughput and
+p50/p95/p99 latency per route. Results are written as JSON for
+benchmarks.compare:
+
+    python -m benchmarks.load --users 200 --requests 200 --concurrency 4
+    python -m benchmarks.load --database-url postgresql://.../bench --reset
+    python -m benchmarks.load --transport uvicorn --server-workers 4
+
+Without --database-url a fresh SQLite file is used. Requests go through
+Starlette's TestClient in this process, or over HTTP to a local uvicorn
+started for the run (--transport uvicorn).
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class Route:
+    """One endpoint: how to build a request for a given benchmark user"""
+
+    def __init__(self, method: str, path: str, build=None, max_requests: int = None,
+                 auth: bool = True):
+        self.method = method
+        self.path = path
+        self.name = f"{method} {path}"
+        # build(user, rng) -> (url, request kwargs); defaults to the path as is
+        self.build = build or (lambda user, rng: (path, {}))
+        # Cap for routes that are slow by design (password hashing)
+        self.max_requests = max_requests
+        self.auth = auth
+
+def _pick(ids_name: str, template: str):
+    def build(user, rng):
+        return template.format(rng.choice(user[ids_name])), {}
+    return build
+
+def _goal(rng) -> dict:
+    return {"title": "Benchmark goal", "description": "Created by the benchmark",
+            "target_date": "2030-01-01T00:00:00"}
+
+def _record(rng) -> dict:
+    return {"record_type": rng.choice(["weight", "exercise", "mood", "sleep"]),
+            "value": round(rng.uniform(1, 100), 2), "unit": "unit", "notes": None}
+
+def _transaction(rng) -> dict:
+    return {"transaction_type": "expense", "category": rng.choice(["food", "transport"]),
+            "amount": round(rng.uniform(1, 100), 2), "description": "Benchmark purchase"}
+
+def _statement(user, rng):
+    lines = ["date,amount,description"] + [
+        f"2026-01-{day:02d},-{rng.uniform(1, 100):.2f},Import {rng.random()}"
+        for day in range(1, 21)
+    ]
+    data = io.BytesIO(("\n".join(lines) + "\n").encode())
+    return "/finance/transactions/import", {"files": {"file": ("statement.csv", data, "text/csv")}}
+
+_registrations = iter(range(10 ** 9))
+
+def _register(user, rng):
+    n = next(_registrations)
+    name = f"register-{os.getpid()}-{n}"
+    return "/auth/register", {"json": {
+        "email": f"{name}@example.com", "username": name, "password": "benchmark-password"
+    }}
+
+def _login(user, rng):
+    from benchmarks.datagen import PASSWORD
+    return "/auth/token", {"data": {"username": user["username"], "password": PASSWORD}}
+
+# Reads first so they see the generated data, not the benchmark's own writes
+ROUTES = [
+    Route("GET", "/", auth=False),
+    Route("GET", "/health", auth=False),
+    Route("GET", "/auth/me"),
+    Route("GET", "/career/goals"),
+    Route("GET", "/career/goals/{goal_id}", _pick("goal_ids", "/career/goals/{}")),
+    Route("GET", "/career/export"),
+    Route("GET", "/career/recommendations"),
+    Route("GET", "/health/records"),
+    Route("GET", "/health/records/{record_id}", _pick("record_ids", "/health/records/{}")),
+    Route("GET", "/health/export"),
+    Route("GET", "/health/analytics/summary"),
+    Route("GET", "/health/records/series?bucket=day", lambda user, rng: (
+        f"/health/records/series?record_type={rng.choice(['sleep', 'exercise'])}&bucket=day", {}
+    )),
+    Route("GET", "/health/records/series?points=200", lambda user, rng: (
+        f"/health/records/series?record_type={rng.choice(['sleep', 'exercise'])}"
+        "&days=90&points=200", {}
+    )),
+    Route("GET", "/health/recommendations"),
+    Route("GET", "/finance/transactions"),
+    Route("GET", "/finance/transactions/{transaction_id}",
+          _pick("transaction_ids", "/finance/transactions/{}")),
+    Route("GET", "/finance/export"),
+    Route("GET", "/finance/analytics/summary"),
+    Route("GET", "/finance/recommendations"),
+    Route("GET", "/dashboard"),
+    Route("POST", "/career/goals", lambda user, rng: ("/career/goals", {"json": _goal(rng)})),
+    Route("PUT", "/career/goals/{goal_id}", lambda user, rng: (
+        f"/career/goals/{rng.choice(user['goal_ids'])}", {"json": _goal(rng)}
+    )),
+    Route("POST", "/health/records", lambda user, rng: ("/health/records", {"json": _record(rng)})),
+    Route("POST", "/health/records/bulk", lambda user, rng: (
+        "/health/records/bulk", {"json": [_record(rng) for _ in range(50)]}
+    )),
+    Route("POST", "/finance/transactions", lambda user, rng: (
+        "/finance/transactions", {"json": _transaction(rng)}
+    )),
+    Route("POST", "/finance/transactions/bulk", lambda user, rng: (
+        "/finance/transactions/bulk", {"json": [_transaction(rng) for _ in range(50)]}
+    )),
+    Route("POST", "/finance/transactions/import", _statement),
+    Route("POST", "/auth/token", _login, max_requests=50, auth=False),
+    Route("POST", "/auth/register", _register, max_requests=50, auth=False),
+]
+
+def load_users(limit: int = 1000) -> list:
+    """Generated users with a token and a few ids of each kind to request"""
+    from sqlalchemy import select
+    from shared.database import SessionLocal
+    from shared.models import User, CareerGoal, HealthRecord, FinancialTransaction
+    from shared.security import create_access_token
+    from benchmarks.datagen import USERNAME_PREFIX
+
+    def ids(db, model, user_id):
+        return list(db.scalars(select(model.id).where(model.user_id == user_id).limit(20)))
+
+    db = SessionLocal()
+    try:
+        users = []
+        for user in db.scalars(
+            select(User).where(User.username.startswith(USERNAME_PREFIX))
+            .order_by(User.id).limit(limit)
+        ):
+            users.append({
+                "username": user.username,
+                "token": create_access_token(
+                    {"sub": user.username, "uid": user.id, "ver": user.revision}
+                ),
+                "goal_ids": ids(db, CareerGoal, user.id),
+                "record_ids": ids(db, HealthRecord, user.id),
+                "transaction_ids": ids(db, FinancialTransaction, user.id),
+            })
+        return users
+    finally:
+        db.close()
+
+def eligible_users(route: Route, users: list) -> list:
+    """Users the route has something to request for"""
+    for ids_name in ("goal_ids", "record_ids", "transaction_ids"):
+        if "{" + ids_name[:-1] + "}" in route.path:
+            return [user for user in users if user[ids_name]]
+    return users
+
+def summarize(latencies: list, errors: int, elapsed: float) -> dict:
+    ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+def run_route(client_for, route: Route, users: list, requests: int, concurrency: int,
+              warmup: int, seed: int) -> dict:
+    """Time `requests` calls to one route spread over `concurrency` threads"""
+    users = eligible_users(route, users)
+    if not users:
+        return None
+    count = min(requests, route.max_requests or requests)
+    latencies, statuses = [], {}
+    lock = threading.Lock()
+
+    def call(rng, timed: bool):
+        user = users[rng.randrange(len(users))]
+        url, kwargs = route.build(user, rng)
+        if route.auth:
+            kwargs["headers"] = {"Authorization": f"Bearer {user['token']}"}
+        client = client_for()
+        start = time.perf_counter()
+        response = client.request(route.method, url, **kwargs)
+        elapsed = time.perf_counter() - start
+        if timed:
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    def worker(index: int, calls: int):
+        rng = random.Random(f"{seed}-{route.name}-{index}")
+        for _ in range(calls):
+            call(rng, True)
+
+    warmup_rng = random.Random(f"{seed}-{route.name}-warmup")
+    for _ in range(min(warmup, count)):
+        call(warmup_rng, False)
+    shares = [count // concurrency + (i < count % concurrency) for i in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency), shares))
+    elapsed = time.perf_counter() - start
+    errors = sum(n for status, n in statuses.items() if status >= 400)
+    result = summarize(latencies, errors, elapsed)
+    result["statuses"] = {str(status): n for status, n in sorted(statuses.items())}
+    return result
+
+def start_server(port: int, workers: int, env: dict) -> subprocess.Popen:
+    import httpx
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("uvicorn exited during startup")
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/health", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise SystemExit("uvicorn did not start within 60s")
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url", help="database to use (default: fresh SQLite file)")
+    parser.add_argument("--reset", action="store_true",
+                        help="drop and recreate all tables of --database-url first")
+    parser.add_argument("--skip-seed", action="store_true",
+                        help="reuse users generated by an earlier run")
+    parser.add_argument("--users", type=int, default=200, help="users to generate")
+    parser.add_argument("--days", type=int, default=90, help="days of history per user")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests per route")
+    parser.add_argument("--concurrency", type=int, default=1, help="client threads")
+    parser.add_argument("--transport", choices=["testclient", "uvicorn"], default="testclient")
+    parser.add_argument("--server-workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--port", type=int, default=8765, help="uvicorn port")
+    parser.add_argument("--routes", nargs="+", metavar="TEXT",
+                        help="only routes whose name contains one of these")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--output", help="results file (default: results/<timestamp>.json)")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(prefix="thrivementor-bench-"), "bench.db")
+        os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    # Recommendation generation would run alongside the timed requests
+    os.environ.setdefault("RECOMMENDATION_WORKER", "external")
+    # Every request comes from a handful of users on one IP; with the limits
+    # on, the auth routes would measure the rate limiter instead of hashing
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    # Imported after DATABASE_URL is set: shared.database reads it on import
+    from shared.database import Base, engine, DB_MODE
+    from shared.rate_limit import RATE_LIMIT_ENABLED, RATE_LIMITS
+    from benchmarks import datagen
+
+    if args.reset:
+        datagen.reset_database()
+    else:
+        Base.metadata.create_all(bind=engine)
+    if not args.skip_seed:
+        print(f"Generating {args.users} users...")
+        print(datagen.generate(args.users, args.days, args.seed))
+    users = load_users()
+    if not users:
+        raise SystemExit("No generated users found")
+
+    routes = [
+        route for route in ROUTES
+        if not args.routes or any(text in route.name for text in args.routes)
+    ]
+    server = None
+    if args.transport == "uvicorn":
+        import httpx
+        server = start_server(args.port, args.server_workers, dict(os.environ))
+        local = threading.local()
+
+        def client_for():
+            if not hasattr(local, "client"):
+                local.client = httpx.Client(base_url=f"http://127.0.0.1:{args.port}", timeout=60)
+            return local.client
+        context = None
+    else:
+        from fastapi.testclient import TestClient
+        from main import app
+        context = TestClient(app)
+        client = context.__enter__()
+
+        def client_for():
+            return client
+
+    results = {}
+    try:
+        for route in routes:
+            result = run_route(client_for, route, users, args.requests, args.concurrency,
+                               args.warmup, args.seed)
+            if result is None:
+                print(f"{route.name:<45} skipped (no data)")
+                continue
+            results[route.name] = result
+            print(f"{route.name:<45} {result['throughput_rps']:>9.1f} req/s  "
+                  f"p50 {result['p50_ms']:>8.2f}  p95 {result['p95_ms']:>8.2f}  "
+                  f"p99 {result['p99_ms']:>8.2f} ms  errors {result['errors']}")
+    finally:
+        if context is not None:
+            context.__exit__(None, None, None)
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "commit": git_commit(),
+            "database": engine.dialect.name,
+            "db_mode": DB_MODE,
+            "transport": args.transport,
+            "server_workers": args.server_workers if args.transport == "uvicorn" else None,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "users": len(users),
+            "days": args.days,
+            "seed": args.seed,
+            "rate_limits": RATE_LIMITS if RATE_LIMIT_ENABLED else None,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "routes": results,
+    }
+    output = args.output or os.path.join(
+        BACKEND_DIR, "benchmarks", "results",
+        datetime.utcnow().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+List response serialization benchmark
+Compares the ORM + Pydantic + stdlib json path the list endpoints used to
+take with the column tuple + orjson path they take now, on an in-memory
+SQLite database, and checks both produce the same bytes:
+
+    python -m benchmarks.serialization --rows 500 --repeat 200
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from shared.database import Base
+from shared.models import User, FinancialTransaction
+from shared.schemas import FinancialTransactionResponse
+from shared.fast_json import list_response, response_columns
+
+CATEGORIES = ["food", "rent", "transport", "salary", "fun", "health"]
+
+def seed(db, rows: int):
+    user = User(email="bench@example.com", username="bench", hashed_password="x")
+    db.add(user)
+    db.flush()
+    now = datetime.utcnow()
+    rng = random.Random(0)
+    db.add_all([
+        FinancialTransaction(
+            user_id=user.id,
+            amount=round(rng.uniform(1, 500), 2),
+            transaction_type=rng.choice(["income", "expense"]),
+            category=rng.choice(CATEGORIES),
+            description=f"Transaction {i} – café",
+            transaction_date=now - timedelta(minutes=i),
+            created_at=now - timedelta(minutes=i),
+        )
+        for i in range(rows)
+    ])
+    db.commit()
+    return user.id
+
+def legacy_body(db, user_id: int, rows: int) -> bytes:
+    transactions = db.query(FinancialTransaction).filter(
+        FinancialTransaction.user_id == user_id
+    ).order_by(FinancialTransaction.id.desc()).limit(rows).all()
+    validated = TypeAdapter(List[FinancialTransactionResponse]).validate_python(
+        transactions, from_attributes=True
+    )
+    body = JSONResponse(jsonable_encoder(validated)).body
+    # Fresh objects next round, as in a request
+    db.expunge_all()
+    return body
+
+def fast_body(db, user_id: int, rows: int) -> bytes:
+    transactions = db.query(
+        *response_columns(FinancialTransaction, FinancialTransactionResponse)
+    ).filter(
+        FinancialTransaction.user_id == user_id
+    ).order_by(FinancialTransaction.id.desc()).limit(rows).all()
+    return list_response(transactions, FinancialTransactionResponse).body
+
+def measure(fn, repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500, help="rows per response")
+    parser.add_argument("--repeat", type=int, default=200, help="timed runs per path")
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    user_id = seed(db, args.rows)
+
+    legacy = legacy_body(db, user_id, args.rows)
+    fast = fast_body(db, user_id, args.rows)
+    if legacy != fast:
+        raise SystemExit("Response bodies differ")
+
+    print(f"{args.rows} rows per response, {len(fast)} bytes, {args.repeat} runs")
+    results = {}
+    for name, fn in [("legacy", legacy_body), ("fast", fast_body)]:
+        timings = measure(lambda: fn(db, user_id, args.rows), args.repeat)
+        results[name] = statistics.median(timings)
+        print(f"  {name:<7} median {results[name]:.2f} ms, p95 "
+              f"{statistics.quantiles(timings, n=20)[-1]:.2f} ms")
+    print(f"  speedup {results['legacy'] / results['fast']:.1f}x")
+    db.close()
+
+if __name__ == "__main__":
+    main()
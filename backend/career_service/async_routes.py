@@ -0,0 +1,121 @@
+"""
+Async endpoints for the career service (DB_MODE=async)
+Mirrors the sync endpoints in main.py on an AsyncSession.
+"""
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from shared.database import get_async_db
+from shared.replicas import get_read_async_db
+from shared.models import CareerGoal
+from shared.schemas import CareerGoalCreate, CareerGoalResponse, MLRecommendationResponse
+from shared.auth import get_current_user_async, UserPrincipal
+from shared.data_version import bump_data_version, conditional_json_async
+from shared.recommendation_store import active_recommendations
+from shared.recommendation_worker import enqueue_recommendations
+from shared.fast_json import list_response, response_columns
+
+router = APIRouter()
+
+async def _get_user_goal(db: AsyncSession, goal_id: int, user_id: int) -> CareerGoal:
+    goal = (await db.execute(
+        select(CareerGoal).where(
+            CareerGoal.id == goal_id,
+            CareerGoal.user_id == user_id
+        )
+    )).scalars().first()
+    if not goal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Career goal not found"
+        )
+    return goal
+
+@router.post("/goals", response_model=CareerGoalResponse, status_code=status.HTTP_201_CREATED)
+async def create_career_goal(
+    goal: CareerGoalCreate,
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new career goal"""
+    db_goal = CareerGoal(
+        user_id=current_user.id,
+        title=goal.title,
+        description=goal.description,
+        target_date=goal.target_date,
+        status="in_progress"
+    )
+    db.add(db_goal)
+    # Recommendations are recomputed by the background worker
+    await db.run_sync(enqueue_recommendations, current_user.id, "career")
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.commit()
+    await db.refresh(db_goal)
+    return db_goal
+
+@router.get("/goals", response_model=List[CareerGoalResponse])
+async def get_career_goals(
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_read_async_db)
+):
+    """Get all career goals for current user"""
+    goals = await db.execute(
+        select(*response_columns(CareerGoal, CareerGoalResponse))
+        .where(CareerGoal.user_id == current_user.id)
+    )
+    return list_response(goals.all(), CareerGoalResponse)
+
+@router.get("/goals/{goal_id}", response_model=CareerGoalResponse)
+async def get_career_goal(
+    goal_id: int,
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_read_async_db)
+):
+    """Get a specific career goal"""
+    return await _get_user_goal(db, goal_id, current_user.id)
+
+@router.put("/goals/{goal_id}", response_model=CareerGoalResponse)
+async def update_career_goal(
+    goal_id: int,
+    goal: CareerGoalCreate,
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update a career goal"""
+    db_goal = await _get_user_goal(db, goal_id, current_user.id)
+    db_goal.title = goal.title
+    db_goal.description = goal.description
+    db_goal.target_date = goal.target_date
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.commit()
+    await db.refresh(db_goal)
+    return db_goal
+
+@router.patch("/goals/{goal_id}/progress")
+async def update_goal_progress(
+    goal_id: int,
+    progress: float,
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Update progress percentage of a career goal"""
+    db_goal = await _get_user_goal(db, goal_id, current_user.id)
+    db_goal.progress_percentage = min(max(progress, 0.0), 100.0)
+    if db_goal.status == "in_progress" and db_goal.progress_percentage >= 100:
+        db_goal.status = "completed"
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.commit()
+    return {"message": "Progress updated", "progress": db_goal.progress_percentage}
+
+@router.get("/recommendations", response_model=List[MLRecommendationResponse])
+async def get_career_recommendations(
+    request: Request,
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_read_async_db)
+):
+    """Get ML-powered career recommendations"""
+    async def build():
+        recommendations = await db.scalars(active_recommendations(current_user.id, "career"))
+        return [MLRecommendationResponse.model_validate(rec) for rec in recommendations.all()]
+    return await conditional_json_async(request, db, current_user.id, build, daily=True)
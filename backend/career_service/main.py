@@ -1,18 +1,36 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 from typing import List
-from shared.database import get_db
-from shared.models import User, CareerGoal, MLRecommendation
+from shared.database import get_db, DB_MODE
+from shared.replicas import get_read_db, start_replica_monitor, stop_replica_monitor
+from shared.routing import use_async_routes
+from shared.models import CareerGoal
 from shared.schemas import CareerGoalCreate, CareerGoalResponse, MLRecommendationResponse
-from shared.auth import get_current_user
-from shared.ml_service import generate_career_recommendations
+from shared.auth import get_current_user, UserPrincipal
+from shared.data_version import bump_data_version, conditional_json
+from shared.ml_model import load_model
+from shared.recommendation_store import active_recommendations
+from shared.recommendation_worker import (
+    enqueue_recommendations, start_worker_thread, stop_worker_thread
+)
+from shared.export import export_response, EXPORT_FORMAT_PATTERN
+from shared.fast_json import list_response, response_columns
+from shared.rate_limit import LoadSheddingMiddleware
+from career_service.async_routes import router as async_router
 
 app = FastAPI(title="ThriveMentor Career Service", version="1.0.0")
+app.add_middleware(LoadSheddingMiddleware)
+
+app.add_event_handler("startup", load_model)
+app.add_event_handler("startup", start_worker_thread)
+app.add_event_handler("shutdown", stop_worker_thread)
+app.add_event_handler("startup", start_replica_monitor)
+app.add_event_handler("shutdown", stop_replica_monitor)
 
 @app.post("/goals", response_model=CareerGoalResponse, status_code=status.HTTP_201_CREATED)
 def create_career_goal(
     goal: CareerGoalCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new career goal"""
@@ -24,30 +42,30 @@ def create_career_goal(
         status="in_progress"
     )
     db.add(db_goal)
+    # Recommendations are recomputed by the background worker
+    enqueue_recommendations(db, current_user.id, "career")
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(db_goal)
     
-    # Trigger ML recommendations after goal creation
-    generate_career_recommendations(current_user.id, db)
-    
     return db_goal
 
 @app.get("/goals", response_model=List[CareerGoalResponse])
 def get_career_goals(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get all career goals for current user"""
-    goals = db.query(CareerGoal).filter(
+    goals = db.query(*response_columns(CareerGoal, CareerGoalResponse)).filter(
         CareerGoal.user_id == current_user.id
     ).all()
-    return goals
+    return list_response(goals, CareerGoalResponse)
 
 @app.get("/goals/{goal_id}", response_model=CareerGoalResponse)
 def get_career_goal(
     goal_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific career goal"""
     goal = db.query(CareerGoal).filter(
@@ -65,7 +83,7 @@ def get_career_goal(
 def update_career_goal(
     goal_id: int,
     goal: CareerGoalCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update a career goal"""
@@ -82,6 +100,7 @@ def update_career_goal(
     db_goal.title = goal.title
     db_goal.description = goal.description
     db_goal.target_date = goal.target_date
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(db_goal)
     return db_goal
@@ -90,7 +109,7 @@ def update_career_goal(
 def update_goal_progress(
     goal_id: int,
     progress: float,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Update progress percentage of a career goal"""
@@ -107,23 +126,35 @@ def update_goal_progress(
     db_goal.progress_percentage = min(max(progress, 0.0), 100.0)
     if db_goal.status == "in_progress" and db_goal.progress_percentage >= 100:
         db_goal.status = "completed"
+    bump_data_version(db, current_user.id)
     db.commit()
     return {"message": "Progress updated", "progress": db_goal.progress_percentage}
 
+@app.get("/export")
+def export_career_goals(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Stream every career goal of the current user as CSV or NDJSON"""
+    return export_response(CareerGoal, current_user.id, format, "career_goals")
+
 @app.get("/recommendations", response_model=List[MLRecommendationResponse])
 def get_career_recommendations(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get ML-powered career recommendations"""
-    recommendations = db.query(MLRecommendation).filter(
-        MLRecommendation.user_id == current_user.id,
-        MLRecommendation.recommendation_type == "career"
-    ).order_by(MLRecommendation.created_at.desc()).limit(10).all()
-    return recommendations
+    def build():
+        recommendations = db.scalars(active_recommendations(current_user.id, "career")).all()
+        return [MLRecommendationResponse.model_validate(rec) for rec in recommendations]
+    return conditional_json(request, db, current_user.id, build, daily=True)
 
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "career_service"}
 
+# DB_MODE=async: serve the AsyncSession endpoints on the same paths
+if DB_MODE == "async":
+    use_async_routes(app, async_router)
@@ -0,0 +1,161 @@
+"""
+Async endpoints for the finance service (DB_MODE=async)
+Mirrors the sync endpoints in main.py on an AsyncSession.
+"""
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Optional
+from shared.database import get_async_db
+from shared.replicas import get_read_async_db
+from shared.models import FinancialTransaction
+from shared.schemas import (
+    FinancialTransactionCreate, FinancialTransactionResponse, MLRecommendationResponse,
+    BulkResult
+)
+from shared.auth import get_current_user_async, UserPrincipal
+from shared.data_version import bump_data_version, conditional_json_async
+from shared.recommendation_store import active_recommendations
+from shared.recommendation_worker import enqueue_recommendations
+from shared.finance_rollups import apply_to_rollups, get_rollup_summary
+from shared.pagination import KeysetPage, next_page_headers
+from shared.fast_json import list_response, response_columns
+from shared.bulk import validate_items, insert_rows, bulk_result
+from shared.finance_import import fingerprint_fields
+
+router = APIRouter()
+
+@router.post("/transactions", response_model=FinancialTransactionResponse, status_code=status.HTTP_201_CREATED)
+async def create_transaction(
+    transaction: FinancialTransactionCreate,
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new financial transaction"""
+    db_transaction = FinancialTransaction(
+        user_id=current_user.id,
+        transaction_type=transaction.transaction_type,
+        category=transaction.category,
+        amount=transaction.amount,
+        description=transaction.description,
+        **fingerprint_fields(
+            transaction.transaction_type, transaction.amount, transaction.description
+        )
+    )
+    db.add(db_transaction)
+    await db.flush()
+    # Same transaction as the insert, so the rollups never drift
+    await db.run_sync(apply_to_rollups, [db_transaction])
+    # Recommendations are recomputed by the background worker
+    await db.run_sync(enqueue_recommendations, current_user.id, "finance")
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.commit()
+    await db.refresh(db_transaction)
+    return db_transaction
+
+@router.post("/transactions/bulk", response_model=BulkResult)
+async def create_transactions_bulk(
+    items: List[Any] = Body(...),
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create up to BULK_MAX_ITEMS transactions in one request"""
+    valid, results = validate_items(items, FinancialTransactionCreate)
+    created = await db.run_sync(insert_rows, FinancialTransaction, [
+        {
+            "user_id": current_user.id,
+            **transaction.model_dump(),
+            **fingerprint_fields(
+                transaction.transaction_type, transaction.amount, transaction.description
+            ),
+        }
+        for _, transaction in valid
+    ])
+    if created:
+        await db.run_sync(apply_to_rollups, created)
+        await db.run_sync(enqueue_recommendations, current_user.id, "finance")
+        await db.run_sync(bump_data_version, current_user.id)
+    result = bulk_result(results, valid, created)
+    await db.commit()
+    return result
+
+@router.get("/transactions", response_model=List[FinancialTransactionResponse])
+async def get_transactions(
+    transaction_type: str = None,
+    category: str = None,
+    days: int = Query(30, ge=1),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_read_async_db)
+):
+    """Get financial transactions for current user, newest first (keyset paginated)"""
+    page = KeysetPage(
+        cursor, limit, days, transaction_type=transaction_type, category=category
+    )
+    stmt = select(
+        *response_columns(FinancialTransaction, FinancialTransactionResponse)
+    ).where(
+        FinancialTransaction.user_id == current_user.id,
+        FinancialTransaction.transaction_date >= page.since
+    )
+    if page.filters["transaction_type"]:
+        stmt = stmt.where(
+            FinancialTransaction.transaction_type == page.filters["transaction_type"]
+        )
+    if page.filters["category"]:
+        stmt = stmt.where(FinancialTransaction.category == page.filters["category"])
+
+    stmt = page.apply(
+        db, stmt, FinancialTransaction.transaction_date, FinancialTransaction.id
+    )
+    transactions, next_cursor = page.finish(
+        (await db.execute(stmt)).all(), "transaction_date"
+    )
+    return list_response(transactions, FinancialTransactionResponse, next_page_headers(next_cursor))
+
+@router.get("/transactions/{transaction_id}", response_model=FinancialTransactionResponse)
+async def get_transaction(
+    transaction_id: int,
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_read_async_db)
+):
+    """Get a specific financial transaction"""
+    transaction = (await db.execute(
+        select(FinancialTransaction).where(
+            FinancialTransaction.id == transaction_id,
+            FinancialTransaction.user_id == current_user.id
+        )
+    )).scalars().first()
+    if not transaction:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Transaction not found"
+        )
+    return transaction
+
+@router.get("/analytics/summary")
+async def get_financial_summary(
+    request: Request,
+    days: int = Query(30, ge=1),
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_read_async_db)
+):
+    """Get financial analytics summary from the daily rollups"""
+    return await conditional_json_async(
+        request, db, current_user.id,
+        lambda: db.run_sync(get_rollup_summary, current_user.id, days),
+        daily=True
+    )
+
+@router.get("/recommendations", response_model=List[MLRecommendationResponse])
+async def get_finance_recommendations(
+    request: Request,
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_read_async_db)
+):
+    """Get ML-powered financial recommendations"""
+    async def build():
+        recommendations = await db.scalars(active_recommendations(current_user.id, "finance"))
+        return [MLRecommendationResponse.model_validate(rec) for rec in recommendations.all()]
+    return await conditional_json_async(request, db, current_user.id, build, daily=True)
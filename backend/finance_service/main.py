@@ -1,19 +1,49 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import (
+    FastAPI, Body, Depends, File, Form, HTTPException, Query, Request, UploadFile,
+    status
+)
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, timedelta
-from shared.database import get_db
-from shared.models import User, FinancialTransaction, MLRecommendation
-from shared.schemas import FinancialTransactionCreate, FinancialTransactionResponse, MLRecommendationResponse
-from shared.auth import get_current_user
-from shared.ml_service import generate_finance_recommendations
+from typing import Any, List, Optional
+from shared.database import get_db, DB_MODE
+from shared.replicas import get_read_db, start_replica_monitor, stop_replica_monitor
+from shared.routing import use_async_routes
+from shared.models import FinancialTransaction
+from shared.schemas import (
+    FinancialTransactionCreate, FinancialTransactionResponse, MLRecommendationResponse,
+    BulkResult, ImportResult
+)
+from shared.auth import get_current_user, UserPrincipal
+from shared.data_version import bump_data_version, conditional_json
+from shared.ml_model import load_model
+from shared.partitioning import start_maintenance_thread, stop_maintenance_thread
+from shared.recommendation_store import active_recommendations
+from shared.recommendation_worker import (
+    enqueue_recommendations, start_worker_thread, stop_worker_thread
+)
+from shared.finance_rollups import apply_to_rollups, get_rollup_summary
+from shared.pagination import KeysetPage, next_page_headers
+from shared.fast_json import list_response, response_columns
+from shared.bulk import validate_items, insert_rows, bulk_result
+from shared.export import export_response, EXPORT_FORMAT_PATTERN
+from shared.finance_import import ColumnMapping, fingerprint_fields, import_statement
+from shared.rate_limit import LoadSheddingMiddleware
+from finance_service.async_routes import router as async_router
 
 app = FastAPI(title="ThriveMentor Finance Service", version="1.0.0")
+app.add_middleware(LoadSheddingMiddleware)
+
+app.add_event_handler("startup", load_model)
+app.add_event_handler("startup", start_worker_thread)
+app.add_event_handler("shutdown", stop_worker_thread)
+app.add_event_handler("startup", start_replica_monitor)
+app.add_event_handler("shutdown", stop_replica_monitor)
+app.add_event_handler("startup", start_maintenance_thread)
+app.add_event_handler("shutdown", stop_maintenance_thread)
 
 @app.post("/transactions", response_model=FinancialTransactionResponse, status_code=status.HTTP_201_CREATED)
 def create_transaction(
     transaction: FinancialTransactionCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new financial transaction"""
@@ -22,47 +52,140 @@ def create_transaction(
         transaction_type=transaction.transaction_type,
         category=transaction.category,
         amount=transaction.amount,
-        description=transaction.description
+        description=transaction.description,
+        **fingerprint_fields(
+            transaction.transaction_type, transaction.amount, transaction.description
+        )
     )
     db.add(db_transaction)
+    db.flush()
+    # Same transaction as the insert, so the rollups never drift
+    apply_to_rollups(db, [db_transaction])
+    # Recommendations are recomputed by the background worker
+    enqueue_recommendations(db, current_user.id, "finance")
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(db_transaction)
     
-    # Trigger ML recommendations after transaction creation
-    generate_finance_recommendations(current_user.id, db)
-    
     return db_transaction
 
+@app.post("/transactions/bulk", response_model=BulkResult)
+def create_transactions_bulk(
+    items: List[Any] = Body(...),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create up to BULK_MAX_ITEMS transactions in one request.
+    Items are validated individually; valid ones are inserted together
+    and the response reports the outcome of every item.
+    """
+    valid, results = validate_items(items, FinancialTransactionCreate)
+    created = insert_rows(db, FinancialTransaction, [
+        {
+            "user_id": current_user.id,
+            **transaction.model_dump(),
+            **fingerprint_fields(
+                transaction.transaction_type, transaction.amount, transaction.description
+            ),
+        }
+        for _, transaction in valid
+    ])
+    if created:
+        apply_to_rollups(db, created)
+        # One recomputation for the whole batch
+        enqueue_recommendations(db, current_user.id, "finance")
+        bump_data_version(db, current_user.id)
+    # Read the new ids before commit expires the objects
+    result = bulk_result(results, valid, created)
+    db.commit()
+    return result
+
+@app.post("/transactions/import", response_model=ImportResult)
+def import_transactions(
+    file: UploadFile = File(...),
+    date_column: str = Form("date"),
+    amount_column: str = Form("amount"),
+    description_column: str = Form("description"),
+    category_column: Optional[str] = Form(None),
+    type_column: Optional[str] = Form(None),
+    date_format: Optional[str] = Form(None),
+    default_category: str = Form("uncategorized"),
+    delimiter: str = Form(",", min_length=1, max_length=1),
+    decimal_separator: str = Form(".", pattern=r"^[.,]$"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Import a CSV bank statement. Columns are mapped by name; without a
+    type column, negative amounts are expenses and positive ones income.
+    Rows already present (same day, amount and description) are skipped,
+    as many times as they are stored; repeats within the statement are kept.
+    """
+    try:
+        mapping = ColumnMapping(
+            date=date_column,
+            amount=amount_column,
+            description=description_column,
+            category=category_column,
+            transaction_type=type_column,
+            date_format=date_format,
+            default_category=default_category,
+            decimal_separator=decimal_separator
+        )
+        result = import_statement(db, current_user.id, file.file, mapping, delimiter)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    if result.imported:
+        # One recomputation for the whole statement
+        enqueue_recommendations(db, current_user.id, "finance")
+        bump_data_version(db, current_user.id)
+    db.commit()
+    return result
+
 @app.get("/transactions", response_model=List[FinancialTransactionResponse])
 def get_transactions(
     transaction_type: str = None,
     category: str = None,
-    days: int = 30,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    days: int = Query(30, ge=1),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    """Get financial transactions for current user"""
-    query = db.query(FinancialTransaction).filter(
-        FinancialTransaction.user_id == current_user.id
+    """
+    Get financial transactions for current user, newest first.
+    Pages are capped at PAGE_SIZE_MAX; when more transactions exist the
+    X-Next-Cursor header carries the cursor for the next page.
+    """
+    page = KeysetPage(
+        cursor, limit, days, transaction_type=transaction_type, category=category
+    )
+    query = db.query(
+        *response_columns(FinancialTransaction, FinancialTransactionResponse)
+    ).filter(
+        FinancialTransaction.user_id == current_user.id,
+        FinancialTransaction.transaction_date >= page.since
     )
     
-    if transaction_type:
-        query = query.filter(FinancialTransaction.transaction_type == transaction_type)
-    if category:
-        query = query.filter(FinancialTransaction.category == category)
-    
-    # Filter by date range
-    start_date = datetime.utcnow() - timedelta(days=days)
-    query = query.filter(FinancialTransaction.transaction_date >= start_date)
+    if page.filters["transaction_type"]:
+        query = query.filter(
+            FinancialTransaction.transaction_type == page.filters["transaction_type"]
+        )
+    if page.filters["category"]:
+        query = query.filter(FinancialTransaction.category == page.filters["category"])
     
-    transactions = query.order_by(FinancialTransaction.transaction_date.desc()).all()
-    return transactions
+    query = page.apply(
+        db, query, FinancialTransaction.transaction_date, FinancialTransaction.id
+    )
+    transactions, next_cursor = page.finish(query.all(), "transaction_date")
+    return list_response(transactions, FinancialTransactionResponse, next_page_headers(next_cursor))
 
 @app.get("/transactions/{transaction_id}", response_model=FinancialTransactionResponse)
 def get_transaction(
     transaction_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific financial transaction"""
     transaction = db.query(FinancialTransaction).filter(
@@ -76,62 +199,45 @@ def get_transaction(
         )
     return transaction
 
+@app.get("/export")
+def export_transactions(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Stream every transaction of the current user as CSV or NDJSON"""
+    return export_response(FinancialTransaction, current_user.id, format, "transactions")
+
 @app.get("/analytics/summary")
 def get_financial_summary(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    days: int = Query(30, ge=1),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    """Get financial analytics summary"""
-    # Get transactions from last 30 days
-    start_date = datetime.utcnow() - timedelta(days=30)
-    transactions = db.query(FinancialTransaction).filter(
-        FinancialTransaction.user_id == current_user.id,
-        FinancialTransaction.transaction_date >= start_date
-    ).all()
-    
-    # Calculate summary
-    total_income = sum(
-        t.amount for t in transactions if t.transaction_type == "income"
-    )
-    total_expenses = sum(
-        t.amount for t in transactions if t.transaction_type == "expense"
-    )
-    total_investments = sum(
-        t.amount for t in transactions if t.transaction_type == "investment"
+    """Get financial analytics summary from the daily rollups"""
+    return conditional_json(
+        request, db, current_user.id,
+        lambda: get_rollup_summary(db, current_user.id, days),
+        daily=True
     )
-    net_balance = total_income - total_expenses - total_investments
-    
-    # Category breakdown
-    category_breakdown = {}
-    for transaction in transactions:
-        if transaction.transaction_type == "expense":
-            if transaction.category not in category_breakdown:
-                category_breakdown[transaction.category] = 0
-            category_breakdown[transaction.category] += transaction.amount
-    
-    return {
-        "total_income": total_income,
-        "total_expenses": total_expenses,
-        "total_investments": total_investments,
-        "net_balance": net_balance,
-        "category_breakdown": category_breakdown,
-        "period_days": 30
-    }
 
 @app.get("/recommendations", response_model=List[MLRecommendationResponse])
 def get_finance_recommendations(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get ML-powered financial recommendations"""
-    recommendations = db.query(MLRecommendation).filter(
-        MLRecommendation.user_id == current_user.id,
-        MLRecommendation.recommendation_type == "finance"
-    ).order_by(MLRecommendation.created_at.desc()).limit(10).all()
-    return recommendations
+    def build():
+        recommendations = db.scalars(active_recommendations(current_user.id, "finance")).all()
+        return [MLRecommendationResponse.model_validate(rec) for rec in recommendations]
+    return conditional_json(request, db, current_user.id, build, daily=True)
 
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "finance_service"}
 
+# DB_MODE=async: serve the AsyncSession endpoints on the same paths
+if DB_MODE == "async":
+    use_async_routes(app, async_router)
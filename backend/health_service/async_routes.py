@@ -0,0 +1,157 @@
+"""
+Async endpoints for the health service (DB_MODE=async)
+Mirrors the sync endpoints in main.py on an AsyncSession.
+"""
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, List, Optional
+from shared.database import get_async_db
+from shared.replicas import get_read_async_db
+from shared.models import HealthRecord
+from shared.schemas import (
+    HealthRecordCreate, HealthRecordResponse, MLRecommendationResponse, BulkResult
+)
+from shared.auth import get_current_user_async, UserPrincipal
+from shared.data_version import bump_data_version, conditional_json_async
+from shared.recommendation_store import active_recommendations
+from shared.recommendation_worker import enqueue_recommendations
+from shared.health_stats import get_health_stats
+from shared.health_series import BUCKET_PATTERN, SERIES_MAX_POINTS, get_health_series
+from shared.pagination import KeysetPage, next_page_headers
+from shared.fast_json import list_response, response_columns
+from shared.bulk import validate_items, insert_rows, bulk_result
+
+router = APIRouter()
+
+@router.post("/records", response_model=HealthRecordResponse, status_code=status.HTTP_201_CREATED)
+async def create_health_record(
+    record: HealthRecordCreate,
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a new health record"""
+    db_record = HealthRecord(
+        user_id=current_user.id,
+        record_type=record.record_type,
+        value=record.value,
+        unit=record.unit,
+        notes=record.notes
+    )
+    db.add(db_record)
+    # Recommendations are recomputed by the background worker
+    await db.run_sync(enqueue_recommendations, current_user.id, "health")
+    await db.run_sync(bump_data_version, current_user.id)
+    await db.commit()
+    await db.refresh(db_record)
+    return db_record
+
+@router.post("/records/bulk", response_model=BulkResult)
+async def create_health_records_bulk(
+    items: List[Any] = Body(...),
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create up to BULK_MAX_ITEMS health records in one request"""
+    valid, results = validate_items(items, HealthRecordCreate)
+    created = await db.run_sync(insert_rows, HealthRecord, [
+        {"user_id": current_user.id, **record.model_dump()}
+        for _, record in valid
+    ])
+    if created:
+        await db.run_sync(enqueue_recommendations, current_user.id, "health")
+        await db.run_sync(bump_data_version, current_user.id)
+    result = bulk_result(results, valid, created)
+    await db.commit()
+    return result
+
+@router.get("/records", response_model=List[HealthRecordResponse])
+async def get_health_records(
+    record_type: str = None,
+    days: int = Query(30, ge=1),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_read_async_db)
+):
+    """Get health records for current user, newest first (keyset paginated)"""
+    page = KeysetPage(cursor, limit, days, record_type=record_type)
+    stmt = select(*response_columns(HealthRecord, HealthRecordResponse)).where(
+        HealthRecord.user_id == current_user.id,
+        HealthRecord.recorded_at >= page.since
+    )
+    if page.filters["record_type"]:
+        stmt = stmt.where(HealthRecord.record_type == page.filters["record_type"])
+
+    stmt = page.apply(db, stmt, HealthRecord.recorded_at, HealthRecord.id)
+    records, next_cursor = page.finish((await db.execute(stmt)).all(), "recorded_at")
+    return list_response(records, HealthRecordResponse, next_page_headers(next_cursor))
+
+# Declared before /records/{record_id} so "series" is not taken for an id
+@router.get("/records/series")
+async def get_health_record_series(
+    request: Request,
+    record_type: str,
+    days: int = Query(30, ge=1),
+    bucket: Optional[str] = Query(None, pattern=BUCKET_PATTERN),
+    points: Optional[int] = Query(None, ge=3, le=SERIES_MAX_POINTS),
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_read_async_db)
+):
+    """Chart series for one record type (bucketed and/or LTTB-downsampled)"""
+    if bucket is None and points is None:
+        bucket = "day"
+    return await conditional_json_async(
+        request, db, current_user.id,
+        lambda: db.run_sync(
+            get_health_series, current_user.id, record_type, days, bucket, points
+        ),
+        daily=True
+    )
+
+@router.get("/records/{record_id}", response_model=HealthRecordResponse)
+async def get_health_record(
+    record_id: int,
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_read_async_db)
+):
+    """Get a specific health record"""
+    record = (await db.execute(
+        select(HealthRecord).where(
+            HealthRecord.id == record_id,
+            HealthRecord.user_id == current_user.id
+        )
+    )).scalars().first()
+    if not record:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Health record not found"
+        )
+    return record
+
+@router.get("/analytics/summary")
+async def get_health_summary(
+    request: Request,
+    days: int = Query(30, ge=1),
+    record_type: Optional[str] = None,
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_read_async_db)
+):
+    """Get health analytics summary"""
+    return await conditional_json_async(
+        request, db, current_user.id,
+        lambda: db.run_sync(get_health_stats, current_user.id, days, record_type),
+        daily=True
+    )
+
+@router.get("/recommendations", response_model=List[MLRecommendationResponse])
+async def get_health_recommendations(
+    request: Request,
+    current_user: UserPrincipal = Depends(get_current_user_async),
+    db: AsyncSession = Depends(get_read_async_db)
+):
+    """Get ML-powered health recommendations"""
+    async def build():
+        recommendations = await db.scalars(active_recommendations(current_user.id, "health"))
+        return [MLRecommendationResponse.model_validate(rec) for rec in recommendations.all()]
+    return await conditional_json_async(request, db, current_user.id, build, daily=True)
@@ -1,19 +1,45 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Body, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, timedelta
-from shared.database import get_db
-from shared.models import User, HealthRecord, MLRecommendation
-from shared.schemas import HealthRecordCreate, HealthRecordResponse, MLRecommendationResponse
-from shared.auth import get_current_user
-from shared.ml_service import generate_health_recommendations
+from typing import Any, List, Optional
+from shared.database import get_db, DB_MODE
+from shared.replicas import get_read_db, start_replica_monitor, stop_replica_monitor
+from shared.routing import use_async_routes
+from shared.models import HealthRecord
+from shared.schemas import (
+    HealthRecordCreate, HealthRecordResponse, MLRecommendationResponse, BulkResult
+)
+from shared.auth import get_current_user, UserPrincipal
+from shared.data_version import bump_data_version, conditional_json
+from shared.ml_model import load_model
+from shared.partitioning import start_maintenance_thread, stop_maintenance_thread
+from shared.recommendation_store import active_recommendations
+from shared.recommendation_worker import (
+    enqueue_recommendations, start_worker_thread, stop_worker_thread
+)
+from shared.health_stats import get_health_stats
+from shared.health_series import BUCKET_PATTERN, SERIES_MAX_POINTS, get_health_series
+from shared.pagination import KeysetPage, next_page_headers
+from shared.fast_json import list_response, response_columns
+from shared.bulk import validate_items, insert_rows, bulk_result
+from shared.export import export_response, EXPORT_FORMAT_PATTERN
+from shared.rate_limit import LoadSheddingMiddleware
+from health_service.async_routes import router as async_router
 
 app = FastAPI(title="ThriveMentor Health Service", version="1.0.0")
+app.add_middleware(LoadSheddingMiddleware)
+
+app.add_event_handler("startup", load_model)
+app.add_event_handler("startup", start_worker_thread)
+app.add_event_handler("shutdown", stop_worker_thread)
+app.add_event_handler("startup", start_replica_monitor)
+app.add_event_handler("shutdown", stop_replica_monitor)
+app.add_event_handler("startup", start_maintenance_thread)
+app.add_event_handler("shutdown", stop_maintenance_thread)
 
 @app.post("/records", response_model=HealthRecordResponse, status_code=status.HTTP_201_CREATED)
 def create_health_record(
     record: HealthRecordCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: UserPrincipal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Create a new health record"""
@@ -25,41 +51,95 @@ def create_health_record(
         notes=record.notes
     )
     db.add(db_record)
+    # Recommendations are recomputed by the background worker
+    enqueue_recommendations(db, current_user.id, "health")
+    bump_data_version(db, current_user.id)
     db.commit()
     db.refresh(db_record)
     
-    # Trigger ML recommendations after record creation
-    generate_health_recommendations(current_user.id, db)
-    
     return db_record
 
+@app.post("/records/bulk", response_model=BulkResult)
+def create_health_records_bulk(
+    items: List[Any] = Body(...),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Create up to BULK_MAX_ITEMS health records in one request.
+    Items are validated individually; valid ones are inserted together
+    and the response reports the outcome of every item.
+    """
+    valid, results = validate_items(items, HealthRecordCreate)
+    created = insert_rows(db, HealthRecord, [
+        {"user_id": current_user.id, **record.model_dump()}
+        for _, record in valid
+    ])
+    if created:
+        # One recomputation for the whole batch
+        enqueue_recommendations(db, current_user.id, "health")
+        bump_data_version(db, current_user.id)
+    # Read the new ids before commit expires the objects
+    result = bulk_result(results, valid, created)
+    db.commit()
+    return result
+
 @app.get("/records", response_model=List[HealthRecordResponse])
 def get_health_records(
     record_type: str = None,
-    days: int = 30,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    days: int = Query(30, ge=1),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
-    """Get health records for current user"""
-    query = db.query(HealthRecord).filter(
-        HealthRecord.user_id == current_user.id
+    """
+    Get health records for current user, newest first.
+    Pages are capped at PAGE_SIZE_MAX; when more records exist the
+    X-Next-Cursor header carries the cursor for the next page.
+    """
+    page = KeysetPage(cursor, limit, days, record_type=record_type)
+    query = db.query(*response_columns(HealthRecord, HealthRecordResponse)).filter(
+        HealthRecord.user_id == current_user.id,
+        HealthRecord.recorded_at >= page.since
     )
     
-    if record_type:
-        query = query.filter(HealthRecord.record_type == record_type)
+    if page.filters["record_type"]:
+        query = query.filter(HealthRecord.record_type == page.filters["record_type"])
     
-    # Filter by date range
-    start_date = datetime.utcnow() - timedelta(days=days)
-    query = query.filter(HealthRecord.recorded_at >= start_date)
-    
-    records = query.order_by(HealthRecord.recorded_at.desc()).all()
-    return records
+    query = page.apply(db, query, HealthRecord.recorded_at, HealthRecord.id)
+    records, next_cursor = page.finish(query.all(), "recorded_at")
+    return list_response(records, HealthRecordResponse, next_page_headers(next_cursor))
+
+# Declared before /records/{record_id} so "series" is not taken for an id
+@app.get("/records/series")
+def get_health_record_series(
+    request: Request,
+    record_type: str,
+    days: int = Query(30, ge=1),
+    bucket: Optional[str] = Query(None, pattern=BUCKET_PATTERN),
+    points: Optional[int] = Query(None, ge=3, le=SERIES_MAX_POINTS),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Chart series for one record type: min/mean/max per hour, day or week,
+    and/or at most `points` LTTB-downsampled points. Buckets by day when
+    neither is given.
+    """
+    if bucket is None and points is None:
+        bucket = "day"
+    return conditional_json(
+        request, db, current_user.id,
+        lambda: get_health_series(db, current_user.id, record_type, days, bucket, points),
+        daily=True
+    )
 
 @app.get("/records/{record_id}", response_model=HealthRecordResponse)
 def get_health_record(
     record_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get a specific health record"""
     record = db.query(HealthRecord).filter(
@@ -73,56 +153,46 @@ def get_health_record(
         )
     return record
 
+@app.get("/export")
+def export_health_records(
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Stream every health record of the current user as CSV or NDJSON"""
+    return export_response(HealthRecord, current_user.id, format, "health_records")
+
 @app.get("/analytics/summary")
 def get_health_summary(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    days: int = Query(30, ge=1),
+    record_type: Optional[str] = None,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get health analytics summary"""
-    # Get records from last 30 days
-    start_date = datetime.utcnow() - timedelta(days=30)
-    records = db.query(HealthRecord).filter(
-        HealthRecord.user_id == current_user.id,
-        HealthRecord.recorded_at >= start_date
-    ).all()
-    
-    # Calculate basic statistics
-    summary = {}
-    for record in records:
-        if record.record_type not in summary:
-            summary[record.record_type] = {
-                "count": 0,
-                "total": 0,
-                "average": 0,
-                "unit": record.unit
-            }
-        summary[record.record_type]["count"] += 1
-        if record.value:
-            summary[record.record_type]["total"] += record.value
-    
-    # Calculate averages
-    for record_type in summary:
-        if summary[record_type]["count"] > 0:
-            summary[record_type]["average"] = (
-                summary[record_type]["total"] / summary[record_type]["count"]
-            )
-    
-    return summary
+    return conditional_json(
+        request, db, current_user.id,
+        lambda: get_health_stats(db, current_user.id, days, record_type),
+        daily=True
+    )
 
 @app.get("/recommendations", response_model=List[MLRecommendationResponse])
 def get_health_recommendations(
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
 ):
     """Get ML-powered health recommendations"""
-    recommendations = db.query(MLRecommendation).filter(
-        MLRecommendation.user_id == current_user.id,
-        MLRecommendation.recommendation_type == "health"
-    ).order_by(MLRecommendation.created_at.desc()).limit(10).all()
-    return recommendations
+    def build():
+        recommendations = db.scalars(active_recommendations(current_user.id, "health")).all()
+        return [MLRecommendationResponse.model_validate(rec) for rec in recommendations]
+    return conditional_json(request, db, current_user.id, build, daily=True)
 
 @app.get("/health")
 def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "health_service"}
 
+# DB_MODE=async: serve the AsyncSession endpoints on the same paths
+if DB_MODE == "async":
+    use_async_routes(app, async_router)
@@ -2,17 +2,33 @@
 Initialize the database with tables
 Run this script to create all database tables
 """
+import os
+from alembic import command
+from alembic.config import Config
 from shared.database import engine, Base
+from shared.partitioning import partition_all
 from shared.models import (
     User, CareerGoal, HealthRecord, FinancialTransaction, MLRecommendation
 )
 
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def alembic_config() -> Config:
+    """Alembic config that works regardless of the current directory"""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
 def init_db():
     """Create all database tables"""
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
+    # PostgreSQL: monthly partitions for the time-series tables
+    with engine.begin() as conn:
+        partition_all(conn)
+    # The tables now match the latest models, so mark every migration as applied
+    command.stamp(alembic_config(), "head")
     print("Database tables created successfully!")
 
 if __name__ == "__main__":
     init_db()
-
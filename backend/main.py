@@ -2,12 +2,23 @@
 Main API Gateway for ThriveMentor
 This serves as the entry point and routes requests to appropriate microservices
 """
-from fastapi import FastAPI
+from typing import Optional
+from fastapi import FastAPI, Depends, HTTPException, Query, status
 from fastapi.middleware.cors import CORSMiddleware
-from auth_service.main import app as auth_app
-from career_service.main import app as career_app
-from health_service.main import app as health_app
-from finance_service.main import app as finance_app
+from fastapi.responses import PlainTextResponse
+from shared.proxy import (
+    GATEWAY_MODE, service_proxies, start_proxy_client, close_proxy_client
+)
+from shared.recommendation_worker import start_worker_thread, stop_worker_thread
+from shared.hashing import shutdown_pool
+from shared.partitioning import start_maintenance_thread, stop_maintenance_thread
+from shared.pool_metrics import pool_snapshot
+from shared.replicas import replica_status, start_replica_monitor, stop_replica_monitor
+from shared.instrumentation import InstrumentationMiddleware, prometheus_text
+from shared.rate_limit import LoadSheddingMiddleware, RateLimitMiddleware
+from shared.ml_model import load_model
+from shared.auth import get_current_user, UserPrincipal
+from shared.dashboard import SECTIONS, load_sections
 
 app = FastAPI(
     title="ThriveMentor API Gateway",
@@ -15,20 +26,58 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# CORS middleware for Flutter frontend
+# Shedding runs first: a rejected request should not spend a bucket token
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(LoadSheddingMiddleware)
+# CORS middleware for Flutter frontend; outside the limits so 429/503 carry
+# CORS headers and preflights are never limited
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # In production, specify your Flutter app's origin
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "Retry-After"],
 )
+# Outermost, so Server-Timing and /metrics cover everything below it
+app.add_middleware(InstrumentationMiddleware)
+
+# Read replica health checks; /dashboard reads from the replicas in both modes
+app.add_event_handler("startup", start_replica_monitor)
+app.add_event_handler("shutdown", stop_replica_monitor)
+
+if GATEWAY_MODE == "proxy":
+    # Services run in their own processes (run_services.py), each with its
+    # own recommendation worker and hashing pool
+    app.add_event_handler("startup", start_proxy_client)
+    app.add_event_handler("shutdown", close_proxy_client)
+    for path, proxy in service_proxies().items():
+        app.mount(path, proxy)
+else:
+    from auth_service.main import app as auth_app
+    from career_service.main import app as career_app
+    from health_service.main import app as health_app
+    from finance_service.main import app as finance_app
+
+    # Startup/shutdown handlers of mounted apps never run: each service
+    # registers its own for when it runs standalone, and the gateway
+    # registers them once here for all of them
 
-# Mount sub-applications
-app.mount("/auth", auth_app)
-app.mount("/career", career_app)
-app.mount("/health", health_app)
-app.mount("/finance", finance_app)
+    # Recommendation model is loaded once per process, before the worker uses it
+    app.add_event_handler("startup", load_model)
+    # Background recommendation worker (see RECOMMENDATION_WORKER)
+    app.add_event_handler("startup", start_worker_thread)
+    app.add_event_handler("shutdown", stop_worker_thread)
+    app.add_event_handler("shutdown", shutdown_pool)
+    # Upcoming monthly partitions (PostgreSQL)
+    app.add_event_handler("startup", start_maintenance_thread)
+    app.add_event_handler("shutdown", stop_maintenance_thread)
+
+    # Mount sub-applications
+    app.mount("/auth", auth_app)
+    app.mount("/career", career_app)
+    app.mount("/health", health_app)
+    app.mount("/finance", finance_app)
 
 @app.get("/")
 def root():
@@ -40,7 +89,8 @@ def root():
             "auth": "/auth",
             "career": "/career",
             "health": "/health",
-            "finance": "/finance"
+            "finance": "/finance",
+            "dashboard": "/dashboard"
         },
         "docs": "/docs"
     }
@@ -50,8 +100,46 @@ def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "api_gateway"}
 
-# Note: In a production microservices architecture, you would use
-# service discovery, API gateway patterns, or reverse proxy (nginx/traefik)
-# to route requests. For simplicity, we're using a single FastAPI app.
-# You can split these into separate services and use HTTP calls between them.
+@app.get("/dashboard")
+async def dashboard(
+    fields: Optional[str] = Query(
+        None, description="Comma-separated sections to include (default: all)"
+    ),
+    days: int = Query(30, ge=1),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """
+    Goals, summaries and recommendations in one response.
+    Authenticates once, then runs the sections' queries in the threadpool,
+    each on its own session, DASHBOARD_MAX_CONNECTIONS at a time.
+    """
+    names = list(SECTIONS)
+    if fields:
+        names = list(dict.fromkeys(
+            name.strip() for name in fields.split(",") if name.strip()
+        ))
+        unknown = [name for name in names if name not in SECTIONS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}"
+            )
+    return await load_sections(names, current_user.id, days)
+
+@app.get("/internal/db/pool", include_in_schema=False)
+def db_pool_metrics():
+    """Connection pool saturation for this process (internal use)"""
+    return pool_snapshot()
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Per-route latency, DB time and query counts in Prometheus format"""
+    return PlainTextResponse(
+        prometheus_text(pool_snapshot(), replica_status()),
+        media_type="text/plain; version=0.0.4"
+    )
+
+# Note: GATEWAY_MODE=proxy runs each service as its own process behind this
+# gateway; in production a reverse proxy (nginx/traefik) can route to the
+# services directly instead.
 
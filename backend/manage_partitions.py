@@ -0,0 +1,69 @@
+"""
+Manage the monthly partitions of health_records and financial_transactions
+PostgreSQL only. Run from the backend directory, e.g. from cron:
+
+    python manage_partitions.py status
+    python manage_partitions.py ensure --months-ahead 6
+    python manage_partitions.py archive --retention-months 24
+
+archive detaches each month partition older than the retention period,
+writes it to <archive-dir>/<partition>.csv.gz and drops it.
+"""
+import argparse
+from sqlalchemy import text
+from shared.database import engine
+from shared.partitioning import (
+    PARTITIONED_TABLES, PARTITION_MONTHS_AHEAD, PARTITION_RETENTION_MONTHS,
+    PARTITION_ARCHIVE_DIR, archive_partitions, ensure_partitions, is_partitioned,
+    list_partitions
+)
+
+def status():
+    with engine.connect() as conn:
+        for table in PARTITIONED_TABLES:
+            if not is_partitioned(conn, table):
+                print(f"{table}: not partitioned")
+                continue
+            print(f"{table}:")
+            for name, _ in list_partitions(conn, table):
+                rows = conn.scalar(text(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:t)"
+                ), {"t": name})
+                print(f"  {name:<40} ~{max(rows, 0)} rows")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="list partitions with estimated row counts")
+    ensure = commands.add_parser("ensure", help="create upcoming month partitions")
+    ensure.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    archive = commands.add_parser("archive", help="archive and drop old partitions")
+    archive.add_argument(
+        "--retention-months", type=int, default=PARTITION_RETENTION_MONTHS,
+        help="months kept attached, the current one included"
+    )
+    archive.add_argument("--archive-dir", default=PARTITION_ARCHIVE_DIR)
+    archive.add_argument("--dry-run", action="store_true", help="only list what would go")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        parser.error("partitioning is only used on PostgreSQL")
+    if args.command == "status":
+        status()
+    elif args.command == "ensure":
+        with engine.begin() as conn:
+            created = ensure_partitions(conn, args.months_ahead)
+        print(f"Created {', '.join(created)}" if created else "All partitions exist")
+    else:
+        if args.retention_months <= 0:
+            parser.error("--retention-months (or PARTITION_RETENTION_MONTHS) must be positive")
+        archived = archive_partitions(
+            engine, args.retention_months, args.archive_dir, args.dry_run
+        )
+        for name, rows, path in archived:
+            print(f"{name}: {rows} rows" + (f" -> {path}" if path else " (dry run)"))
+        if not archived:
+            print("Nothing to archive")
+
+if __name__ == "__main__":
+    main()
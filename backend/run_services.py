@@ -0,0 +1,82 @@
+"""
+Run each service as its own uvicorn process behind the gateway
+Starts auth, career, health and finance on their own ports plus the
+gateway in GATEWAY_MODE=proxy, so every service scales on its own:
+
+    python run_services.py --workers auth=4 --workers finance=2
+
+Stops all processes when one of them exits or on Ctrl+C.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+from shared.proxy import SERVICE_PORTS, SERVICE_URLS
+
+def worker_counts(values) -> dict:
+    counts = {name: 1 for name in list(SERVICE_PORTS) + ["gateway"]}
+    for value in values:
+        name, _, count = value.partition("=")
+        if name not in counts or not count.isdigit() or int(count) < 1:
+            raise ValueError(f"Invalid --workers value: {value}")
+        counts[name] = int(count)
+    return counts
+
+def uvicorn_command(app: str, host: str, port: int, workers: int) -> list:
+    return [
+        sys.executable, "-m", "uvicorn", app,
+        "--host", host, "--port", str(port), "--workers", str(workers),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0", help="gateway host")
+    parser.add_argument("--port", type=int, default=8000, help="gateway port")
+    parser.add_argument(
+        "--workers", action="append", default=[], metavar="NAME=N",
+        help="uvicorn workers for a service or the gateway (default 1 each)"
+    )
+    args = parser.parse_args()
+    try:
+        counts = worker_counts(args.workers)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    commands = {}
+    for name in SERVICE_PORTS:
+        url = urlsplit(SERVICE_URLS[name])
+        commands[name] = uvicorn_command(
+            f"{name}_service.main:app", url.hostname, url.port, counts[name]
+        )
+    commands["gateway"] = uvicorn_command("main:app", args.host, args.port, counts["gateway"])
+    env = dict(os.environ, GATEWAY_MODE="proxy")
+
+    processes = {}
+    for name, command in commands.items():
+        print(f"Starting {name}: {' '.join(command[2:])}")
+        processes[name] = subprocess.Popen(command, cwd=backend_dir, env=env)
+
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        while all(process.poll() is None for process in processes.values()):
+            time.sleep(0.5)
+        exited = [name for name, process in processes.items() if process.poll() is not None]
+        print(f"{', '.join(exited)} exited; stopping the other services")
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for process in processes.values():
+            if process.poll() is None:
+                process.terminate()
+        for process in processes.values():
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+if __name__ == "__main__":
+    main()
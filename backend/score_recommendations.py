@@ -0,0 +1,36 @@
+"""
+Refresh health and finance recommendations for every user
+Run this script from the backend directory, e.g. nightly:
+
+    python score_recommendations.py --workers 8
+"""
+import argparse
+import time
+from shared.recommendation_batch import RECOMMENDATION_TYPES, score_all
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--types", nargs="+", choices=RECOMMENDATION_TYPES, default=list(RECOMMENDATION_TYPES),
+        help="recommendation types to score"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="scoring processes (default: CPU count, 1 = no pool)"
+    )
+    parser.add_argument(
+        "--range-size", type=int, default=50000,
+        help="user ids per task"
+    )
+    args = parser.parse_args()
+
+    print("Scoring recommendations...")
+    start = time.perf_counter()
+    totals = score_all(args.types, args.workers, args.range_size)
+    elapsed = time.perf_counter() - start
+    for recommendation_type, count in totals.items():
+        print(f"  {recommendation_type}: {count} recommendations written")
+    print(f"Done in {elapsed:.1f}s")
+
+if __name__ == "__main__":
+    main()
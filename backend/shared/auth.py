@@ -1,41 +1,148 @@
 """
 Shared authentication dependencies for all services
 """
+import os
+from dataclasses import dataclass
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from shared.database import get_db
+from dotenv import load_dotenv
+from shared.cache import LRUTTLCache
+from shared.database import get_db, get_async_db
 from shared.models import User
 from shared.security import decode_access_token
 
+load_dotenv()
+
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+# The cache is per process and invalidate_user only clears this process's
+# copy, so a change made through another worker (e.g. deactivation) takes
+# up to this long to apply here
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 
-def get_current_user(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-):
-    """Get current authenticated user"""
+@dataclass(frozen=True)
+class UserPrincipal:
+    """The authenticated user as seen by request handlers"""
+    id: int
+    username: str
+    is_active: bool
+    revision: int
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            is_active=bool(user.is_active),
+            revision=user.revision
+        )
+
+# user id -> UserPrincipal
+_principal_cache = LRUTTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL_SECONDS)
+
+def invalidate_user(user_id: int):
+    """Forget the cached principal for a user"""
+    _principal_cache.delete(user_id)
+
+def update_user(user_id: int, **values):
+    """
+    UPDATE of one user that also bumps its revision, returning the new one.
+    The increment happens in SQL, so concurrent updates never conflict.
+    Every change to a user goes through this; call invalidate_user after
+    the commit. Other processes drop their copy once a token carries the
+    new revision, or after AUTH_CACHE_TTL_SECONDS.
+    """
+    return update(User).where(User.id == user_id).values(
+        revision=User.revision + 1, **values
+    ).returning(User.revision)
+
+def _credentials_exception(detail: str = "Could not validate credentials"):
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _decode_token(token: str):
+    """Return (user_id, username, token_revision) from a valid token"""
     payload = decode_access_token(token)
     if payload is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_exception()
     username: str = payload.get("sub")
     if username is None:
+        raise _credentials_exception()
+    return payload.get("uid"), username, payload.get("ver", 0)
+
+def _cached_principal(
+    user_id: Optional[int], username: str, token_revision: int
+) -> Optional[UserPrincipal]:
+    """Cached principal, unless missing or older than the token"""
+    if user_id is None:
+        return None
+    principal = _principal_cache.get(user_id)
+    if (
+        principal is None
+        or principal.username != username
+        or principal.revision < token_revision
+    ):
+        return None
+    return principal
+
+def _remember(user: Optional[User], username: str) -> Optional[UserPrincipal]:
+    if user is None or user.username != username:
+        return None
+    principal = UserPrincipal.from_user(user)
+    _principal_cache.set(principal.id, principal)
+    return principal
+
+def _check_principal(principal: Optional[UserPrincipal]) -> UserPrincipal:
+    if principal is None:
+        raise _credentials_exception("User not found")
+    if not principal.is_active:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    user = db.query(User).filter(User.username == username).first()
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Inactive user"
         )
-    return user
+    return principal
+
+def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> UserPrincipal:
+    """
+    Get current authenticated user.
+    Served from the principal cache when the token's "ver" claim is not
+    newer than the cached revision, so most requests skip the users query.
+    """
+    user_id, username, token_revision = _decode_token(token)
+    principal = _cached_principal(user_id, username, token_revision)
+    if principal is None:
+        if user_id is not None:
+            user = db.get(User, user_id)
+        else:
+            # Tokens issued before the uid claim existed
+            user = db.query(User).filter(User.username == username).first()
+        principal = _remember(user, username)
+    return _check_principal(principal)
 
+async def get_current_user_async(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
+    """get_current_user for DB_MODE=async"""
+    user_id, username, token_revision = _decode_token(token)
+    principal = _cached_principal(user_id, username, token_revision)
+    if principal is None:
+        if user_id is not None:
+            user = await db.get(User, user_id)
+        else:
+            user = (await db.execute(
+                select(User).where(User.username == username)
+            )).scalars().first()
+        principal = _remember(user, username)
+    return _check_principal(principal)
@@ -0,0 +1,68 @@
+"""
+Bulk ingest helpers
+Validates each item of a bulk request on its own so one bad item does not
+reject the batch, and inserts the valid ones with a single multi-row
+INSERT ... RETURNING.
+"""
+import os
+from typing import Any, List, Type
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from shared.schemas import BulkItemResult, BulkResult
+
+load_dotenv()
+
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", "1000"))
+
+def validate_items(items: List[Any], schema: Type[BaseModel]):
+    """
+    Validate raw items against a create schema.
+    Returns (valid, results): valid is a list of (index, model) and
+    results holds an entry per item, errors filled in for invalid ones.
+    """
+    if len(items) > BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {BULK_MAX_ITEMS} items per request"
+        )
+    valid = []
+    results = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, schema.model_validate(item)))
+            results.append(BulkItemResult(index=index, status="created"))
+        except ValidationError as exc:
+            results.append(BulkItemResult(
+                index=index,
+                status="invalid",
+                errors=exc.errors(
+                    include_url=False, include_context=False, include_input=False
+                )
+            ))
+    return valid, results
+
+def insert_rows(db: Session, model, rows: List[dict]) -> list:
+    """
+    Insert rows in one multi-row statement and return the ORM objects,
+    in the same order as `rows`. Runs in the caller's transaction.
+    (PostgreSQL batches ordered RETURNING; SQLite falls back to one
+    INSERT per row.)
+    """
+    if not rows:
+        return []
+    return db.scalars(
+        insert(model).returning(model, sort_by_parameter_order=True), rows
+    ).all()
+
+def bulk_result(results: List[BulkItemResult], valid: list, created: list) -> BulkResult:
+    """Fill in created ids and summarise"""
+    for (index, _), obj in zip(valid, created):
+        results[index].id = obj.id
+    return BulkResult(
+        created=len(created),
+        failed=len(results) - len(created),
+        results=results
+    )
@@ -0,0 +1,63 @@
+"""
+Sections of the gateway's /dashboard payload
+Each section is one query against its own session, so the gateway can run
+them side by side in the threadpool. At most DASHBOARD_MAX_CONNECTIONS
+sections of one request run at once, so a single dashboard cannot hold a
+large share of the connection pool.
+"""
+import asyncio
+import os
+from typing import Callable, Dict, List
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from dotenv import load_dotenv
+from shared.models import CareerGoal
+from shared.schemas import CareerGoalResponse, MLRecommendationResponse
+from shared.health_stats import get_health_stats
+from shared.finance_rollups import get_rollup_summary
+from shared.recommendation_store import active_recommendations
+from shared.replicas import read_session
+
+load_dotenv()
+
+# Sections (and so pooled connections) one /dashboard request uses at once
+DASHBOARD_MAX_CONNECTIONS = int(os.getenv("DASHBOARD_MAX_CONNECTIONS", "2"))
+
+def _goals(db: Session, user_id: int, days: int) -> List[CareerGoalResponse]:
+    goals = db.query(CareerGoal).filter(CareerGoal.user_id == user_id).all()
+    return [CareerGoalResponse.model_validate(goal) for goal in goals]
+
+def _recommendations(recommendation_type: str) -> Callable:
+    def section(db: Session, user_id: int, days: int) -> List[MLRecommendationResponse]:
+        recommendations = db.scalars(active_recommendations(user_id, recommendation_type)).all()
+        return [MLRecommendationResponse.model_validate(rec) for rec in recommendations]
+    return section
+
+# Field name -> section(db, user_id, days); same data as the service endpoints
+SECTIONS: Dict[str, Callable] = {
+    "goals": _goals,
+    "health_summary": lambda db, user_id, days: get_health_stats(db, user_id, days),
+    "finance_summary": get_rollup_summary,
+    "career_recommendations": _recommendations("career"),
+    "health_recommendations": _recommendations("health"),
+    "finance_recommendations": _recommendations("finance"),
+}
+
+def load_section(name: str, user_id: int, days: int):
+    """Run one section on a (read replica) session of its own; sessions are not thread-safe"""
+    db = read_session(user_id)
+    try:
+        return SECTIONS[name](db, user_id, days)
+    finally:
+        db.close()
+
+async def load_sections(names: List[str], user_id: int, days: int) -> dict:
+    """load_section for each name, DASHBOARD_MAX_CONNECTIONS at a time"""
+    semaphore = asyncio.Semaphore(max(1, DASHBOARD_MAX_CONNECTIONS))
+
+    async def load(name: str):
+        async with semaphore:
+            return await run_in_threadpool(load_section, name, user_id, days)
+
+    results = await asyncio.gather(*(load(name) for name in names))
+    return dict(zip(names, results))
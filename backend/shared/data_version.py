@@ -0,0 +1,124 @@
+"""
+Per-user data version and conditional GETs
+users.data_version is bumped in the same transaction as every write to a
+user's goals, records, transactions or recommendations. Read endpoints
+derive a strong ETag from it, answer If-None-Match with 304 after a
+single primary-key lookup, and can serve the serialized body from an
+in-process cache keyed on that ETag. Bumping also pins the user's reads
+to the primary for a moment (shared.replicas).
+"""
+import hashlib
+import os
+from datetime import datetime
+from typing import Awaitable, Callable, Iterable
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from shared.cache import LRUTTLCache
+from shared.instrumentation import timed
+from shared.models import User
+from shared.replicas import record_write
+
+load_dotenv()
+
+# Serialized bodies kept per ETag; 0 disables the body cache
+ETAG_BODY_CACHE_SIZE = int(os.getenv("ETAG_BODY_CACHE_SIZE", "0"))
+ETAG_BODY_CACHE_TTL_SECONDS = float(os.getenv("ETAG_BODY_CACHE_TTL_SECONDS", "300"))
+
+# Clients must revalidate, but may keep the body
+CACHE_CONTROL = "private, no-cache"
+
+_body_cache = LRUTTLCache(ETAG_BODY_CACHE_SIZE, ETAG_BODY_CACHE_TTL_SECONDS)
+
+def _bump(condition):
+    return (
+        update(User)
+        .where(condition)
+        # Not a profile change: keep updated_at out of it
+        .values(data_version=User.data_version + 1, updated_at=User.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+def bump_data_version(db: Session, user_id: int):
+    """Mark a user's data as changed; runs in the caller's transaction"""
+    db.execute(_bump(User.id == user_id))
+    record_write(user_id)
+
+def bump_data_versions(db: Session, user_ids: Iterable[int]):
+    """bump_data_version for many users in one statement"""
+    user_ids = list(user_ids)
+    if user_ids:
+        db.execute(_bump(User.id.in_(user_ids)))
+        for user_id in user_ids:
+            record_write(user_id)
+
+def _version_query(user_id: int):
+    return select(User.data_version).where(User.id == user_id)
+
+def make_etag(request: Request, user_id: int, version: int, daily: bool) -> str:
+    """
+    Strong ETag for this URL and data version, plus the UTC date for
+    `daily` responses (see conditional_json).
+    """
+    parts = [
+        request.url.path,
+        str(sorted(request.query_params.multi_items())),
+        str(user_id),
+        str(version),
+    ]
+    if daily:
+        parts.append(datetime.utcnow().date().isoformat())
+    return '"' + hashlib.sha1("|".join(parts).encode()).hexdigest() + '"'
+
+def _not_modified(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in [tag.strip() for tag in header.split(",")]
+
+def _headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+def _from_cache(request: Request, etag: str):
+    if _not_modified(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_headers(etag))
+    body = _body_cache.get(etag)
+    if body is not None:
+        return Response(content=body, media_type="application/json", headers=_headers(etag))
+    return None
+
+def _render(etag: str, data) -> Response:
+    with timed("serialize"):
+        response = JSONResponse(content=jsonable_encoder(data), headers=_headers(etag))
+    _body_cache.set(etag, response.body)
+    return response
+
+def conditional_json(request: Request, db: Session, user_id: int,
+                     build: Callable[[], object], daily: bool = False) -> Response:
+    """
+    JSON response for build() with ETag support. build() only runs when
+    the client's copy is stale and the body is not cached.
+    Pass `daily` when the response changes with the UTC date even if the
+    data does not: windows of whole UTC days, and recommendations, whose
+    expiry lands on UTC midnight. A response that changes at any other time
+    of day cannot be conditional.
+    """
+    etag = make_etag(request, user_id, db.scalar(_version_query(user_id)) or 0, daily)
+    response = _from_cache(request, etag)
+    if response is None:
+        response = _render(etag, build())
+    return response
+
+async def conditional_json_async(request: Request, db: AsyncSession, user_id: int,
+                                 build: Callable[[], Awaitable[object]],
+                                 daily: bool = False) -> Response:
+    """conditional_json for DB_MODE=async"""
+    etag = make_etag(request, user_id, (await db.scalar(_version_query(user_id))) or 0, daily)
+    response = _from_cache(request, etag)
+    if response is None:
+        response = _render(etag, await build())
+    return response
@@ -0,0 +1,214 @@
+"""
+Bank statement import
+Reads a CSV statement row by row, maps its columns onto transactions,
+drops rows already imported (by fingerprint) and inserts the rest in
+chunks of IMPORT_CHUNK_SIZE. Memory is bounded by the chunk size plus a
+counter per distinct fingerprint.
+
+Duplicates are counted per fingerprint: a statement with two identical
+coffees on one day imports both, and importing it again imports neither.
+"""
+import csv
+import hashlib
+import io
+import os
+import re
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import BinaryIO, Optional
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from shared.models import FinancialTransaction
+from shared.finance_rollups import apply_to_rollups, rollup_day
+from shared.schemas import ImportResult
+
+load_dotenv()
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+# Row errors reported back; the rest are only counted
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "100"))
+
+TRANSACTION_TYPES = ("income", "expense", "investment")
+DECIMAL_SEPARATORS = (".", ",")
+
+# Digits with an optional sign, thousands grouped by the other separator
+_AMOUNT_PATTERNS = {
+    ".": re.compile(r"[+-]?(\d{1,3}(,\d{3})+|\d+)(\.\d+)?"),
+    ",": re.compile(r"[+-]?(\d{1,3}(\.\d{3})+|\d+)(,\d+)?"),
+}
+
+def parse_amount(raw: str, decimal_separator: str = ".") -> float:
+    """
+    Statement amount such as "-1,234.50" (or "-1.234,50" with a decimal
+    comma); raises ValueError for anything else, so "12,50" is never read
+    as 1250.
+    """
+    text = "".join((raw or "").split())
+    if not _AMOUNT_PATTERNS[decimal_separator].fullmatch(text):
+        raise ValueError(
+            f"invalid amount {raw!r} (decimal separator {decimal_separator!r})"
+        )
+    thousands = "," if decimal_separator == "." else "."
+    return float(text.replace(thousands, "").replace(decimal_separator, "."))
+
+def transaction_fingerprint(transaction_type: str, amount: float,
+                            description: Optional[str], transaction_date: datetime) -> str:
+    """
+    md5 of UTC day, amount signed by type and normalized description.
+    Must stay in step with the backfill in alembic revision 0005.
+    """
+    signed = amount if transaction_type == "income" else -amount
+    # + 0.0 turns -0.0 into 0.0
+    parts = (
+        rollup_day(transaction_date).isoformat(),
+        f"{round(signed, 2) + 0.0:.2f}",
+        " ".join((description or "").split()).lower(),
+    )
+    return hashlib.md5("|".join(parts).encode()).hexdigest()
+
+def fingerprint_fields(transaction_type: str, amount: float,
+                       description: Optional[str]) -> dict:
+    """transaction_date (now) and fingerprint for a transaction created via the API"""
+    transaction_date = datetime.now(timezone.utc)
+    return {
+        "transaction_date": transaction_date,
+        "fingerprint": transaction_fingerprint(
+            transaction_type, amount, description, transaction_date
+        ),
+    }
+
+class ColumnMapping:
+    """Which statement columns hold which transaction fields"""
+
+    def __init__(self, date: str = "date", amount: str = "amount",
+                 description: str = "description", category: Optional[str] = None,
+                 transaction_type: Optional[str] = None, date_format: Optional[str] = None,
+                 default_category: str = "uncategorized", decimal_separator: str = "."):
+        if decimal_separator not in DECIMAL_SEPARATORS:
+            raise ValueError(f"Decimal separator must be one of: {', '.join(DECIMAL_SEPARATORS)}")
+        self.date = date
+        self.amount = amount
+        self.description = description
+        self.category = category
+        self.transaction_type = transaction_type
+        self.date_format = date_format
+        self.default_category = default_category
+        self.decimal_separator = decimal_separator
+
+    def missing(self, fieldnames) -> list:
+        required = [self.date, self.amount, self.description, self.category, self.transaction_type]
+        return [name for name in required if name and name not in fieldnames]
+
+    def parse(self, user_id: int, row: dict) -> dict:
+        """Transaction values for one statement row; raises ValueError"""
+        raw_date = (row[self.date] or "").strip()
+        if self.date_format:
+            transaction_date = datetime.strptime(raw_date, self.date_format)
+        else:
+            transaction_date = datetime.fromisoformat(raw_date)
+        if transaction_date.tzinfo is None:
+            transaction_date = transaction_date.replace(tzinfo=timezone.utc)
+
+        amount = parse_amount(row[self.amount], self.decimal_separator)
+        if self.transaction_type:
+            transaction_type = (row[self.transaction_type] or "").strip().lower()
+            if transaction_type not in TRANSACTION_TYPES:
+                raise ValueError(
+                    f"transaction type must be one of {', '.join(TRANSACTION_TYPES)}, "
+                    f"not {transaction_type!r}"
+                )
+        else:
+            # Signed statement amounts: money out is an expense
+            transaction_type = "expense" if amount < 0 else "income"
+        amount = abs(amount)
+
+        description = (row[self.description] or "").strip() or None
+        category = self.default_category
+        if self.category:
+            category = (row[self.category] or "").strip() or self.default_category
+        return {
+            "user_id": user_id,
+            "transaction_type": transaction_type,
+            "category": category,
+            "amount": amount,
+            "description": description,
+            "transaction_date": transaction_date,
+            "fingerprint": transaction_fingerprint(
+                transaction_type, amount, description, transaction_date
+            ),
+        }
+
+def _insert_chunk(db: Session, user_id: int, rows: list, unmatched: dict) -> int:
+    """
+    Insert the rows not already stored; returns how many. `unmatched`
+    carries, across chunks, how many rows stored before the import are
+    still unmatched per fingerprint: each stored row absorbs one
+    statement row, the rest are new.
+    """
+    first_seen = {row["fingerprint"] for row in rows} - unmatched.keys()
+    if first_seen:
+        stored = Counter(dict(db.execute(
+            select(FinancialTransaction.fingerprint, func.count()).where(
+                FinancialTransaction.user_id == user_id,
+                FinancialTransaction.fingerprint.in_(first_seen)
+            ).group_by(FinancialTransaction.fingerprint)
+        ).all()))
+        for fingerprint in first_seen:
+            unmatched[fingerprint] = stored[fingerprint]
+    new_rows = []
+    for row in rows:
+        if unmatched[row["fingerprint"]] > 0:
+            unmatched[row["fingerprint"]] -= 1
+        else:
+            new_rows.append(row)
+    if new_rows:
+        db.execute(insert(FinancialTransaction), new_rows)
+        apply_to_rollups(db, [SimpleNamespace(**row) for row in new_rows])
+    return len(new_rows)
+
+def import_statement(db: Session, user_id: int, file: BinaryIO,
+                     mapping: ColumnMapping, delimiter: str = ",") -> ImportResult:
+    """
+    Import a CSV statement in the caller's transaction; the caller commits.
+    Rows that fail to parse are skipped and reported by line number; a
+    file that is not readable CSV raises ValueError.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.DictReader(text, delimiter=delimiter)
+        missing = mapping.missing(reader.fieldnames or [])
+        if missing:
+            raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+        imported = duplicates = failed = 0
+        errors = []
+        chunk = []
+        unmatched = {}
+        for row in reader:
+            try:
+                chunk.append(mapping.parse(user_id, row))
+            except (ValueError, TypeError) as exc:
+                failed += 1
+                if len(errors) < IMPORT_MAX_ERRORS:
+                    errors.append({"line": reader.line_num, "error": str(exc)})
+                continue
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                inserted = _insert_chunk(db, user_id, chunk, unmatched)
+                imported += inserted
+                duplicates += len(chunk) - inserted
+                chunk = []
+        if chunk:
+            inserted = _insert_chunk(db, user_id, chunk, unmatched)
+            imported += inserted
+            duplicates += len(chunk) - inserted
+    except (csv.Error, UnicodeDecodeError) as exc:
+        raise ValueError(f"Unreadable CSV: {exc}")
+    finally:
+        # Leave the upload's file object open for its owner
+        text.detach()
+
+    return ImportResult(
+        imported=imported, duplicates=duplicates, failed=failed, errors=errors
+    )
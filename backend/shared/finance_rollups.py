@@ -0,0 +1,91 @@
+"""
+Daily finance rollups
+Keeps financial_daily_rollups in step with financial_transactions so that
+summaries sum a handful of rollup rows instead of every transaction.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone, date
+from typing import Iterable
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from shared.database import upsert_insert
+from shared.models import FinancialDailyRollup, FinancialTransaction
+
+def rollup_day(transaction_date: datetime) -> date:
+    """UTC calendar day a transaction is rolled up under"""
+    if transaction_date.tzinfo is not None:
+        transaction_date = transaction_date.astimezone(timezone.utc)
+    return transaction_date.date()
+
+def apply_to_rollups(db: Session, transactions: Iterable[FinancialTransaction]):
+    """
+    Add flushed transactions to their daily rollup rows.
+    Runs in the caller's transaction; the caller commits.
+    """
+    deltas = defaultdict(lambda: [0.0, 0])
+    for t in transactions:
+        key = (t.user_id, rollup_day(t.transaction_date), t.transaction_type, t.category)
+        deltas[key][0] += t.amount
+        deltas[key][1] += 1
+    if not deltas:
+        return
+
+    stmt = upsert_insert(db, FinancialDailyRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "day", "transaction_type", "category"],
+        set_={
+            "total_amount": FinancialDailyRollup.total_amount + stmt.excluded.total_amount,
+            "transaction_count": (
+                FinancialDailyRollup.transaction_count + stmt.excluded.transaction_count
+            ),
+        },
+    )
+    # executemany: compiled once, batched into multi-row VALUES by the driver
+    db.execute(stmt, [
+        {
+            "user_id": user_id,
+            "day": day,
+            "transaction_type": transaction_type,
+            "category": category,
+            "total_amount": amount,
+            "transaction_count": count,
+        }
+        for (user_id, day, transaction_type, category), (amount, count) in deltas.items()
+    ])
+
+def get_rollup_summary(db: Session, user_id: int, days: int) -> dict:
+    """
+    Financial summary for the last `days` UTC days (today included).
+    Reads at most one row per day, type and category.
+    """
+    start_day = datetime.utcnow().date() - timedelta(days=days - 1)
+    rows = db.query(
+        FinancialDailyRollup.transaction_type,
+        FinancialDailyRollup.category,
+        func.sum(FinancialDailyRollup.total_amount),
+    ).filter(
+        FinancialDailyRollup.user_id == user_id,
+        FinancialDailyRollup.day >= start_day
+    ).group_by(
+        FinancialDailyRollup.transaction_type,
+        FinancialDailyRollup.category
+    ).all()
+
+    totals = defaultdict(float)
+    category_breakdown = {}
+    for transaction_type, category, amount in rows:
+        totals[transaction_type] += amount
+        if transaction_type == "expense":
+            category_breakdown[category] = amount
+
+    total_income = totals["income"]
+    total_expenses = totals["expense"]
+    total_investments = totals["investment"]
+    return {
+        "total_income": total_income,
+        "total_expenses": total_expenses,
+        "total_investments": total_investments,
+        "net_balance": total_income - total_expenses - total_investments,
+        "category_breakdown": category_breakdown,
+        "period_days": days
+    }
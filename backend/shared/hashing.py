@@ -0,0 +1,130 @@
+"""
+Password hashing off the request threads
+bcrypt/argon2 are CPU-bound and hold the GIL, so hashing runs on a small
+dedicated process pool. Admission control caps queued plus running jobs;
+beyond HASH_QUEUE_LIMIT callers get HashingOverloaded right away instead
+of tying up a request thread.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from dotenv import load_dotenv
+from shared.security import get_password_hash, verify_and_update_password
+from shared.instrumentation import timed
+
+load_dotenv()
+
+# 0 hashes inline on the calling thread (development)
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", str(max(1, (os.cpu_count() or 2) // 2))))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", "32"))
+HASH_RETRY_AFTER_SECONDS = int(os.getenv("HASH_RETRY_AFTER_SECONDS", "1"))
+
+class HashingOverloaded(Exception):
+    """Raised when the hashing queue is full"""
+
+def hashing_busy_exception() -> HTTPException:
+    """503 response for requests turned away by admission control"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly",
+        headers={"Retry-After": str(HASH_RETRY_AFTER_SECONDS)},
+    )
+
+_executor = None
+_executor_lock = threading.Lock()
+_depth = 0
+_depth_lock = threading.Lock()
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                # spawn: forking a threaded server process is not safe
+                _executor = ProcessPoolExecutor(
+                    max_workers=HASH_POOL_SIZE,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+    return _executor
+
+def _release(future: Optional[Future] = None):
+    global _depth, _executor
+    with _depth_lock:
+        _depth -= 1
+    # A crashed worker breaks the whole pool; start a fresh one next time
+    if (
+        future is not None
+        and not future.cancelled()
+        and isinstance(future.exception(), BrokenProcessPool)
+    ):
+        with _executor_lock:
+            _executor = None
+
+def queue_depth() -> int:
+    """Hashing jobs currently queued or running"""
+    return _depth
+
+def submit(fn, *args) -> Future:
+    """Run fn(*args) on the hashing pool, or raise HashingOverloaded"""
+    global _depth
+    with _depth_lock:
+        if _depth >= HASH_QUEUE_LIMIT:
+            raise HashingOverloaded()
+        _depth += 1
+
+    if HASH_POOL_SIZE <= 0:
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as exc:
+            future.set_exception(exc)
+        finally:
+            _release()
+        return future
+
+    try:
+        future = _get_executor().submit(fn, *args)
+    except Exception:
+        _release()
+        raise
+    future.add_done_callback(_release)
+    return future
+
+def hash_password(password: str) -> str:
+    """Hash a password on the pool (blocking the caller, not the GIL)"""
+    with timed("hash"):
+        return submit(get_password_hash, password).result()
+
+def verify_password_with_rehash(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """verify_and_update_password on the pool"""
+    with timed("hash"):
+        return submit(verify_and_update_password, plain_password, hashed_password).result()
+
+async def hash_password_async(password: str) -> str:
+    """hash_password without blocking the event loop"""
+    with timed("hash"):
+        return await asyncio.wrap_future(submit(get_password_hash, password))
+
+async def verify_password_with_rehash_async(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """verify_password_with_rehash without blocking the event loop"""
+    with timed("hash"):
+        return await asyncio.wrap_future(
+            submit(verify_and_update_password, plain_password, hashed_password)
+        )
+
+def shutdown_pool():
+    """Stop the worker processes"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,202 @@
+"""
+Health time series for charts
+Buckets one record_type's values by hour, day or week in SQL
+(date_trunc on PostgreSQL, strftime/date on SQLite), returning min, mean
+and max per bucket, so a chart gets one row per bucket however dense the
+underlying data is.
+
+With `points`, the series is reduced to at most that many points with
+Largest-Triangle-Three-Buckets (LTTB), which keeps the peaks and troughs
+a line chart needs; the payload is then bounded by the chart's width
+rather than by the amount of data. When there are more raw values than
+PREAGGREGATE_FACTOR * points, SQL first reduces them to the min and max
+of PREAGGREGATE_FACTOR * points equal time slices, so the rows read (and
+held for LTTB) are bounded too.
+
+The window is whole UTC days and the slices end at the end of today, so
+the series only changes with the data or the UTC date (its ETag is daily).
+"""
+import os
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
+from sqlalchemy import Integer, cast, func
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from shared.health_stats import window_start
+from shared.models import HealthRecord
+
+load_dotenv()
+
+BUCKETS = ("hour", "day", "week")
+BUCKET_PATTERN = "^(" + "|".join(BUCKETS) + ")$"
+# Upper bound for the `points` query parameter
+SERIES_MAX_POINTS = int(os.getenv("SERIES_MAX_POINTS", "2000"))
+# Raw values are read as is up to this many per requested point; denser
+# data is pre-aggregated into this many time slices per point
+PREAGGREGATE_FACTOR = 4
+
+_SQLITE_BUCKETS = {
+    "hour": lambda column: func.strftime("%Y-%m-%d %H:00:00", column),
+    "day": lambda column: func.date(column),
+    # Monday on or before the date, matching date_trunc('week', ...)
+    "week": lambda column: func.date(column, "weekday 0", "-6 days"),
+}
+
+def _bucket_start(db: Session, bucket: str):
+    """SQL expression for the UTC start of each record's bucket"""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc(bucket, func.timezone("UTC", HealthRecord.recorded_at))
+    return _SQLITE_BUCKETS[bucket](HealthRecord.recorded_at)
+
+def _epoch_seconds(db: Session):
+    """SQL expression for recorded_at as Unix seconds"""
+    if db.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", HealthRecord.recorded_at)
+    return (func.julianday(HealthRecord.recorded_at) - 2440587.5) * 86400.0
+
+def _slice_extremes(db: Session, filters: tuple, since: datetime, until: datetime,
+                    slices: int) -> list:
+    """
+    (recorded_at, value) pairs: the min and max of each of `slices` equal
+    time slices from `since` to `until`, placed at the slice's midpoint
+    """
+    start = _seconds(since)
+    width = (_seconds(until) - start) / slices
+    offset = (_epoch_seconds(db) - start) / width
+    if db.get_bind().dialect.name == "postgresql":
+        index = func.floor(offset)
+    else:
+        # Offsets are never negative, so truncation is floor
+        index = cast(offset, Integer)
+    index = index.label("slice")
+    rows = db.query(
+        index, func.min(HealthRecord.value), func.max(HealthRecord.value)
+    ).filter(*filters).group_by(index).order_by(index).all()
+    pairs = []
+    for slice_index, minimum, maximum in rows:
+        middle = datetime.fromtimestamp(start + (int(slice_index) + 0.5) * width, timezone.utc)
+        pairs.append((middle, minimum))
+        if maximum != minimum:
+            pairs.append((middle, maximum))
+    return pairs
+
+def _seconds(value: datetime) -> float:
+    """x coordinate for LTTB; naive datetimes are UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def _as_datetime(value) -> datetime:
+    # SQLite returns the bucket start as text
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+def lttb(points: Sequence, threshold: int, x=lambda p: p[0], y=lambda p: p[1]) -> List:
+    """
+    Largest-Triangle-Three-Buckets: at most `threshold` of `points` (sorted
+    by x) that best preserve the line's shape. The first and last points
+    are always kept.
+    """
+    count = len(points)
+    if threshold >= count or threshold < 3:
+        return list(points)
+    xs = [x(p) for p in points]
+    ys = [y(p) for p in points]
+    sampled = [points[0]]
+    # Points between the first and last are split into threshold - 2 buckets
+    every = (count - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # Average of the next bucket is the third vertex of the triangle
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, count)
+        span = next_end - next_start
+        avg_x = sum(xs[next_start:next_end]) / span
+        avg_y = sum(ys[next_start:next_end]) / span
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs(
+                (xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a])
+            )
+            if area > best_area:
+                best, best_area = j, area
+        sampled.append(points[best])
+        a = best
+    sampled.append(points[-1])
+    return sampled
+
+def get_health_series(
+    db: Session,
+    user_id: int,
+    record_type: str,
+    days: int,
+    bucket: Optional[str] = None,
+    points: Optional[int] = None
+) -> dict:
+    """
+    Values of `record_type` over the last `days` UTC days (today
+    included), oldest first.
+    With a bucket, one {start, min, mean, max, count} per bucket; without
+    one, the raw {recorded_at, value} points, so callers should pass a
+    bucket or `points`. `points` downsamples either with LTTB (on the
+    bucket means). Dense raw data is pre-aggregated first, and its points
+    then carry the middle of their time slice as recorded_at. Records
+    without a value are skipped.
+    """
+    since = window_start(days)
+    filters = (
+        HealthRecord.user_id == user_id,
+        HealthRecord.record_type == record_type,
+        HealthRecord.recorded_at >= since,
+        HealthRecord.value.isnot(None),
+    )
+    unit = db.query(HealthRecord.unit).filter(*filters).limit(1).scalar()
+
+    if bucket:
+        start = _bucket_start(db, bucket).label("start")
+        rows = db.query(
+            start,
+            func.min(HealthRecord.value),
+            func.avg(HealthRecord.value),
+            func.max(HealthRecord.value),
+            func.count(),
+        ).filter(*filters).group_by(start).order_by(start).all()
+        series = [
+            {
+                "start": _as_datetime(row_start),
+                "min": minimum,
+                "mean": mean,
+                "max": maximum,
+                "count": count,
+            }
+            for row_start, minimum, mean, maximum, count in rows
+        ]
+        if points:
+            series = lttb(
+                series, points,
+                x=lambda p: _seconds(p["start"]), y=lambda p: p["mean"]
+            )
+    else:
+        rows = None
+        if points:
+            limit = PREAGGREGATE_FACTOR * points
+            if db.query(HealthRecord.id).filter(*filters).limit(limit + 1).count() > limit:
+                # The end of today, i.e. the start of a zero-day window
+                until = window_start(0)
+                rows = _slice_extremes(db, filters, since, until, limit)
+        if rows is None:
+            rows = db.query(HealthRecord.recorded_at, HealthRecord.value).filter(
+                *filters
+            ).order_by(HealthRecord.recorded_at).all()
+        if points:
+            rows = lttb(rows, points, x=lambda p: _seconds(p[0]))
+        series = [{"recorded_at": recorded_at, "value": value} for recorded_at, value in rows]
+
+    return {
+        "record_type": record_type,
+        "unit": unit,
+        "bucket": bucket,
+        "points": series,
+    }
@@ -0,0 +1,73 @@
+"""
+Health statistics
+Aggregates health_records per record_type in a single GROUP BY so only
+one row per type comes back from the database.
+Windows are whole UTC days, so a summary only changes when the data or
+the UTC date does (its ETag is daily; see shared.data_version).
+"""
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import func, literal, Float
+from sqlalchemy.orm import Session
+from shared.models import HealthRecord
+
+def window_start(days: int) -> datetime:
+    """00:00 UTC (naive) on the first of the last `days` UTC days, today included"""
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=days - 1)
+
+def get_health_stats(
+    db: Session,
+    user_id: int,
+    days: int,
+    record_type: Optional[str] = None
+) -> dict:
+    """
+    Per record_type count, total, average, min, max, stddev, p50 and p90
+    over the last `days` UTC days (today included). NULL values are counted but excluded from
+    the value statistics. stddev and percentiles need PostgreSQL and are
+    None on other databases.
+    """
+    value = HealthRecord.value
+    if db.get_bind().dialect.name == "postgresql":
+        stddev = func.stddev_samp(value)
+        p50 = func.percentile_cont(0.5).within_group(value)
+        p90 = func.percentile_cont(0.9).within_group(value)
+    else:
+        stddev = p50 = p90 = literal(None, Float)
+
+    start_date = window_start(days)
+    query = db.query(
+        HealthRecord.record_type,
+        func.max(HealthRecord.unit),
+        func.count(),
+        func.sum(value),
+        func.avg(value),
+        func.min(value),
+        func.max(value),
+        stddev,
+        p50,
+        p90,
+    ).filter(
+        HealthRecord.user_id == user_id,
+        HealthRecord.recorded_at >= start_date
+    )
+    if record_type:
+        query = query.filter(HealthRecord.record_type == record_type)
+
+    summary = {}
+    for row in query.group_by(HealthRecord.record_type).all():
+        (row_type, unit, count, total, average,
+         minimum, maximum, row_stddev, row_p50, row_p90) = row
+        summary[row_type] = {
+            "count": count,
+            "total": total or 0,
+            "average": average or 0,
+            "min": minimum,
+            "max": maximum,
+            "stddev": row_stddev,
+            "p50": row_p50,
+            "p90": row_p90,
+            "unit": unit
+        }
+    return summary
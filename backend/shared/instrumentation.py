@@ -0,0 +1,249 @@
+"""
+Per-request performance instrumentation
+InstrumentationMiddleware keeps a RequestStats in a context variable for
+the duration of each request. Cursor events on the engines add every SQL
+statement's count and time to it, and timed() blocks add named segments
+(password hashing, serialization). Each response carries the totals in a
+Server-Timing header, and per-route histograms are served in Prometheus
+text format by the gateway's /metrics.
+
+Requests running more than N_PLUS_ONE_THRESHOLD statements are logged
+with the statement they repeated most.
+"""
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from dotenv import load_dotenv
+from shared.metrics import Histogram
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "true").lower() in ("1", "true", "yes")
+# Statements per request above which the request is logged (0 = never)
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "20"))
+
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+class RequestStats:
+    """What one request spent its time on"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        # segment name -> seconds
+        self.segments = {}
+        self.statements = Counter()
+        # Threadpool and request task can both record
+        self._lock = threading.Lock()
+
+    def add_query(self, statement: str, seconds: float):
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += seconds
+            self.statements[statement] += 1
+
+    def add_segment(self, name: str, seconds: float):
+        with self._lock:
+            self.segments[name] = self.segments.get(name, 0.0) + seconds
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+@contextmanager
+def timed(name: str):
+    """Add the time spent in the block to the current request's `name` segment"""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.add_segment(name, time.perf_counter() - start)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is not None and conn.info.get("query_start"):
+        stats.add_query(statement, time.perf_counter() - conn.info["query_start"].pop())
+
+def instrument_engine(engine):
+    """Count statements and DB time per request on an engine (sync or async)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+class RouteMetrics:
+    """Latency, DB time and statement count histograms for one route"""
+
+    def __init__(self):
+        self.duration_seconds = Histogram()
+        self.db_seconds = Histogram()
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.statuses = Counter()
+        self._lock = threading.Lock()
+
+    def observe(self, status: int, seconds: float, stats: RequestStats):
+        self.duration_seconds.observe(seconds)
+        self.db_seconds.observe(stats.db_seconds)
+        self.queries.observe(stats.queries)
+        with self._lock:
+            self.statuses[status] += 1
+
+# (method, route template) -> RouteMetrics
+routes = {}
+_routes_lock = threading.Lock()
+
+def route_template(scope) -> str:
+    """Route path with placeholders, e.g. /finance/transactions/{transaction_id}"""
+    route = scope.get("route")
+    root_path = scope.get("root_path", "")
+    if route is not None:
+        return root_path + route.path
+    if root_path:
+        # Mounted app without FastAPI routes (the proxy in GATEWAY_MODE=proxy)
+        return root_path + "/{path}"
+    return "unmatched"
+
+def _route_metrics(method: str, template: str) -> RouteMetrics:
+    key = (method, template)
+    metrics = routes.get(key)
+    if metrics is None:
+        with _routes_lock:
+            metrics = routes.setdefault(key, RouteMetrics())
+    return metrics
+
+def server_timing(stats: RequestStats, total_seconds: float) -> str:
+    queries = f"{stats.queries} quer{'y' if stats.queries == 1 else 'ies'}"
+    entries = [f'db;dur={stats.db_seconds * 1000:.1f};desc="{queries}"']
+    entries += [
+        f"{name};dur={seconds * 1000:.1f}" for name, seconds in sorted(stats.segments.items())
+    ]
+    entries.append(f"total;dur={total_seconds * 1000:.1f}")
+    return ", ".join(entries)
+
+def _check_n_plus_one(method: str, template: str, stats: RequestStats):
+    if N_PLUS_ONE_THRESHOLD <= 0 or stats.queries <= N_PLUS_ONE_THRESHOLD:
+        return
+    statement, count = stats.statements.most_common(1)[0]
+    logger.warning(
+        "%s %s ran %d queries (%.1f ms); most repeated (%dx): %s",
+        method, template, stats.queries, stats.db_seconds * 1000, count,
+        " ".join(statement.split())[:200]
+    )
+
+class InstrumentationMiddleware:
+    """Pure ASGI middleware: streaming responses pass through untouched"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if SERVER_TIMING_HEADER:
+                    header = server_timing(stats, time.perf_counter() - start)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", header.encode("latin-1"))
+                    ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            template = route_template(scope)
+            _route_metrics(scope["method"], template).observe(
+                status_code, time.perf_counter() - start, stats
+            )
+            _check_n_plus_one(scope["method"], template, stats)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _histogram_lines(name: str, labels: str, snapshot: dict) -> list:
+    lines = [
+        f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+        for bound, count in snapshot["buckets"].items()
+    ]
+    lines.append(f"{name}_sum{{{labels}}} {snapshot['sum']}")
+    lines.append(f"{name}_count{{{labels}}} {snapshot['count']}")
+    return lines
+
+def prometheus_text(pools: dict, replicas: Optional[dict] = None) -> str:
+    """Route, pool and read replica metrics in the Prometheus text exposition format"""
+    histograms = {
+        "http_request_duration_seconds": ("Request latency", "duration_seconds"),
+        "http_request_db_seconds": ("Time spent in SQL per request", "db_seconds"),
+        "http_request_db_queries": ("SQL statements per request", "queries"),
+    }
+    items = sorted(routes.items())
+    lines = [
+        "# HELP http_requests_total Requests by route and status",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, template), metrics in items:
+        with metrics._lock:
+            statuses = sorted(metrics.statuses.items())
+        for status, count in statuses:
+            lines.append(
+                f'http_requests_total{{method="{method}",route="{_escape(template)}",'
+                f'status="{status}"}} {count}'
+            )
+    for name, (help_text, attribute) in histograms.items():
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (method, template), metrics in items:
+            labels = f'method="{method}",route="{_escape(template)}"'
+            lines += _histogram_lines(name, labels, getattr(metrics, attribute).snapshot())
+
+    gauges = {
+        "db_pool_checked_out": "checked_out",
+        "db_pool_overflow": "overflow",
+        "db_pool_waiting": "waiting",
+        "db_pool_timeouts_total": "timeouts",
+        "db_pool_connections_created_total": "connections_created",
+    }
+    for name, key in gauges.items():
+        kind = "counter" if name.endswith("_total") else "gauge"
+        lines += [f"# TYPE {name} {kind}"]
+        for engine_name, snapshot in pools.items():
+            if snapshot[key] is not None:
+                lines.append(f'{name}{{engine="{engine_name}"}} {snapshot[key]}')
+    lines += ["# TYPE db_pool_wait_seconds histogram"]
+    for engine_name, snapshot in pools.items():
+        lines += _histogram_lines(
+            "db_pool_wait_seconds", f'engine="{engine_name}"', snapshot["wait_seconds"]
+        )
+    if replicas:
+        lines += ["# TYPE db_replica_healthy gauge"]
+        lines += [
+            f'db_replica_healthy{{replica="{name}"}} {int(status["healthy"])}'
+            for name, status in replicas.items()
+        ]
+        lines += ["# TYPE db_replica_lag_seconds gauge"]
+        lines += [
+            f'db_replica_lag_seconds{{replica="{name}"}} {status["lag_seconds"]}'
+            for name, status in replicas.items() if status["lag_seconds"] is not None
+        ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,127 @@
+"""
+Feature extraction for the recommendation model
+Per-user features over a user id range, computed with grouped queries
+and pandas. Used by the batch scorer, the training command and (one user
+at a time) the per-user generators.
+"""
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+from shared.models import CareerGoal, HealthRecord, FinancialTransaction
+
+# Look-back windows of the health and finance generators
+HEALTH_WINDOW_DAYS = 7
+FINANCE_WINDOW_DAYS = 30
+
+# Record types with their own count feature; others only add to record_count
+HEALTH_RECORD_TYPES = ("weight", "exercise", "mood", "sleep")
+
+# Model input columns per recommendation type, in order
+FEATURES = {
+    "career": [
+        "goal_count", "in_progress_count", "completed_count", "average_progress",
+    ],
+    "health": ["record_count", *HEALTH_RECORD_TYPES],
+    "finance": [
+        "income_total", "expense_total", "investment_total",
+        "income_count", "expense_count", "investment_count", "transaction_count",
+        "expense_ratio", "investment_ratio",
+    ],
+}
+
+# Ratios are inf without income; the model sees this value instead
+RATIO_CAP = 10.0
+
+WINDOW_DAYS = {
+    "health": HEALTH_WINDOW_DAYS,
+    "finance": FINANCE_WINDOW_DAYS,
+}
+
+def window_start(recommendation_type: str):
+    """Start of the feature window, None for all-time features"""
+    days = WINDOW_DAYS.get(recommendation_type)
+    return None if days is None else datetime.utcnow() - timedelta(days=days)
+
+def _frame(db: Session, stmt, columns) -> pd.DataFrame:
+    return pd.DataFrame(db.execute(stmt).all(), columns=columns)
+
+def career_features(db: Session, start_date: datetime, low: int, high: int) -> pd.DataFrame:
+    """Per-user goal counts by status and average progress (all time)"""
+    features = _frame(db, select(
+        CareerGoal.user_id,
+        func.count(),
+        func.sum(case((CareerGoal.status == "in_progress", 1), else_=0)),
+        func.sum(case((CareerGoal.status == "completed", 1), else_=0)),
+        func.avg(func.coalesce(CareerGoal.progress_percentage, 0.0)),
+    ).where(
+        CareerGoal.user_id >= low,
+        CareerGoal.user_id < high
+    ).group_by(CareerGoal.user_id),
+        ["user_id", *FEATURES["career"]])
+    return features.set_index("user_id")
+
+def health_features(db: Session, start_date: datetime, low: int, high: int) -> pd.DataFrame:
+    """Per-user record counts in the window, overall and by record type"""
+    counts = _frame(db, select(
+        HealthRecord.user_id, HealthRecord.record_type, func.count()
+    ).where(
+        HealthRecord.user_id >= low,
+        HealthRecord.user_id < high,
+        HealthRecord.recorded_at >= start_date
+    ).group_by(HealthRecord.user_id, HealthRecord.record_type),
+        ["user_id", "record_type", "count"])
+    if counts.empty:
+        return pd.DataFrame(columns=FEATURES["health"], index=pd.Index([], name="user_id"))
+    features = counts.pivot_table(
+        index="user_id", columns="record_type", values="count", aggfunc="sum", fill_value=0
+    )
+    features["record_count"] = features.sum(axis=1)
+    return features
+
+def finance_features(db: Session, start_date: datetime, low: int, high: int) -> pd.DataFrame:
+    """Per-user totals and counts by transaction type, plus ratios to income"""
+    totals = _frame(db, select(
+        FinancialTransaction.user_id,
+        FinancialTransaction.transaction_type,
+        func.sum(FinancialTransaction.amount),
+        func.count()
+    ).where(
+        FinancialTransaction.user_id >= low,
+        FinancialTransaction.user_id < high,
+        FinancialTransaction.transaction_date >= start_date
+    ).group_by(FinancialTransaction.user_id, FinancialTransaction.transaction_type),
+        ["user_id", "transaction_type", "total", "count"])
+    features = pd.DataFrame(index=pd.Index(totals["user_id"].unique(), name="user_id"))
+    for transaction_type in ("income", "expense", "investment"):
+        rows = totals[totals["transaction_type"] == transaction_type].set_index("user_id")
+        features[f"{transaction_type}_total"] = rows["total"].reindex(features.index, fill_value=0.0)
+        features[f"{transaction_type}_count"] = rows["count"].reindex(features.index, fill_value=0)
+    features["transaction_count"] = totals.groupby("user_id")["count"].sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        income = features["income_total"].to_numpy(dtype=float)
+        features["expense_ratio"] = features["expense_total"].to_numpy(dtype=float) / income
+        features["investment_ratio"] = features["investment_total"].to_numpy(dtype=float) / income
+    return features
+
+FEATURE_FRAMES = {
+    "career": career_features,
+    "health": health_features,
+    "finance": finance_features,
+}
+
+def range_features(db: Session, recommendation_type: str, low: int, high: int) -> pd.DataFrame:
+    """Raw feature frame for users with low <= id < high (users without data are absent)"""
+    return FEATURE_FRAMES[recommendation_type](db, window_start(recommendation_type), low, high)
+
+def feature_matrix(recommendation_type: str, features: pd.DataFrame, user_ids) -> np.ndarray:
+    """Model input rows for user_ids, zeros for users without data"""
+    frame = features.reindex(index=user_ids, columns=FEATURES[recommendation_type], fill_value=0)
+    matrix = frame.to_numpy(dtype=np.float64)
+    return np.nan_to_num(matrix, nan=0.0, posinf=RATIO_CAP, neginf=0.0)
+
+def user_features(db: Session, recommendation_type: str, user_id: int) -> np.ndarray:
+    """Model input row for one user"""
+    features = range_features(db, recommendation_type, user_id, user_id + 1)
+    return feature_matrix(recommendation_type, features, [user_id])[0]
@@ -0,0 +1,172 @@
+"""
+Recommendation model registry
+Loads the artifact written by train_recommender.py once per process
+(memory-mapped by joblib) and scores (user features, candidate
+recommendation) pairs with it. Concurrent single-user requests are
+micro-batched into one predict_proba call per model.
+
+Without an artifact, or for a type the artifact has no model for,
+scoring returns None and callers keep their fixed confidence scores.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+import numpy as np
+from dotenv import load_dotenv
+from shared.ml_features import FEATURES
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_DIR = os.getenv("RECOMMENDER_MODEL_DIR", os.path.join(BACKEND_DIR, "models"))
+# Explicit artifact; defaults to the one named in MODEL_DIR/LATEST
+MODEL_PATH = os.getenv("RECOMMENDER_MODEL_PATH", "")
+LATEST_FILE = "LATEST"
+# Rows per predict_proba call, and how long to wait for a batch to fill
+BATCH_MAX_ROWS = int(os.getenv("RECOMMENDER_BATCH_MAX_ROWS", "256"))
+BATCH_WAIT_MS = float(os.getenv("RECOMMENDER_BATCH_WAIT_MS", "0"))
+
+def candidate_matrix(features: np.ndarray, candidates: List[str], titles: List[str]) -> np.ndarray:
+    """
+    Model input: user features followed by a one-hot of the candidate
+    title. features is one row per title; unknown titles get all zeros.
+    """
+    features = np.atleast_2d(features)
+    one_hot = np.zeros((len(titles), len(candidates)))
+    positions = {title: i for i, title in enumerate(candidates)}
+    for row, title in enumerate(titles):
+        if title in positions:
+            one_hot[row, positions[title]] = 1.0
+    return np.hstack([features, one_hot])
+
+class MicroBatcher:
+    """
+    Runs predict on rows submitted from many threads, a batch at a time.
+    A lone request is predicted right away; requests that arrive while a
+    batch is running are stacked into the next one.
+    """
+
+    def __init__(self, predict, max_rows: int = BATCH_MAX_ROWS, wait_ms: float = BATCH_WAIT_MS):
+        self.predict = predict
+        self.max_rows = max_rows
+        self.wait_seconds = wait_ms / 1000
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, rows: np.ndarray) -> Future:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="recommender-batcher", daemon=True
+                )
+                self._thread.start()
+        future = Future()
+        self._queue.put((rows, future))
+        return future
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.wait_seconds
+        while size < self.max_rows:
+            try:
+                timeout = deadline - time.monotonic()
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                scores = self.predict(np.vstack([rows for rows, _ in batch]))
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            offset = 0
+            for rows, future in batch:
+                future.set_result(scores[offset:offset + len(rows)])
+                offset += len(rows)
+
+class RecommenderModel:
+    """One recommendation type's pipeline and its input layout"""
+
+    def __init__(self, recommendation_type: str, entry: dict):
+        self.recommendation_type = recommendation_type
+        self.pipeline = entry["pipeline"]
+        self.candidates = list(entry["candidates"])
+        self.batcher = MicroBatcher(self.predict)
+
+    def predict(self, matrix: np.ndarray) -> np.ndarray:
+        """Probability the user acts on each (features, candidate) row"""
+        return self.pipeline.predict_proba(matrix)[:, 1]
+
+    def score_users(self, features: np.ndarray, title: str) -> np.ndarray:
+        """Scores for one candidate across many users (batch path)"""
+        return self.predict(candidate_matrix(features, self.candidates, [title] * len(features)))
+
+    def score(self, features: np.ndarray, titles: List[str]) -> List[float]:
+        """Scores for one user's candidates (request path, micro-batched)"""
+        rows = candidate_matrix(np.tile(features, (len(titles), 1)), self.candidates, titles)
+        return [float(score) for score in self.batcher.submit(rows).result()]
+
+# Process-wide registry, filled once by load_model
+_models = None
+_version = None
+_load_lock = threading.Lock()
+
+def _artifact_path() -> Optional[str]:
+    if MODEL_PATH:
+        return MODEL_PATH
+    latest = os.path.join(MODEL_DIR, LATEST_FILE)
+    if not os.path.exists(latest):
+        return None
+    with open(latest) as f:
+        return os.path.join(MODEL_DIR, f.read().strip())
+
+def load_model():
+    """Load the current artifact into the registry (idempotent)"""
+    global _models, _version
+    with _load_lock:
+        if _models is not None:
+            return
+        models = {}
+        path = _artifact_path()
+        if path is None or not os.path.exists(path):
+            logger.info("No recommender model artifact found, using fixed confidence scores")
+        else:
+            import joblib
+            # Uncompressed artifact: numpy arrays are mapped, not copied
+            artifact = joblib.load(path, mmap_mode="r")
+            for recommendation_type, entry in artifact["models"].items():
+                if list(entry["features"]) != FEATURES.get(recommendation_type):
+                    logger.warning(
+                        "Recommender model for %s was trained on other features; ignoring it",
+                        recommendation_type
+                    )
+                    continue
+                models[recommendation_type] = RecommenderModel(recommendation_type, entry)
+            _version = artifact["version"]
+            logger.info("Loaded recommender model %s from %s", _version, path)
+        _models = models
+
+def get_model(recommendation_type: str) -> Optional[RecommenderModel]:
+    if _models is None:
+        load_model()
+    return _models.get(recommendation_type)
+
+def model_version() -> Optional[str]:
+    if _models is None:
+        load_model()
+    return _version
@@ -5,10 +5,66 @@ with more sophisticated ML models (TensorFlow, PyTorch, etc.)
 """
 from sqlalchemy.orm import Session
 from shared.models import (
-    User, CareerGoal, HealthRecord, FinancialTransaction, MLRecommendation
+    User, CareerGoal, HealthRecord, FinancialTransaction
 )
 from datetime import datetime, timedelta
 import random
+from shared.ml_features import HEALTH_WINDOW_DAYS, FINANCE_WINDOW_DAYS, user_features
+from shared.ml_model import get_model
+from shared.recommendation_store import store_recommendations
+
+START_TRACKING_HEALTH = {
+    "title": "Start Tracking Your Health",
+    "description": "Begin logging your daily activities to get personalized health insights.",
+    "confidence_score": 0.90
+}
+MAINTAIN_EXERCISE = {
+    "title": "Maintain Consistent Exercise",
+    "description": "You've been tracking your exercise. Keep up the consistency for better results!",
+    "confidence_score": 0.82
+}
+MONITOR_SLEEP = {
+    "title": "Monitor Your Sleep Patterns",
+    "description": "Tracking your sleep can help identify patterns and improve your rest quality.",
+    "confidence_score": 0.75
+}
+START_TRACKING_EXPENSES = {
+    "title": "Start Tracking Your Expenses",
+    "description": "Begin logging your financial transactions to get insights into your spending habits.",
+    "confidence_score": 0.90
+}
+CONSIDER_BUDGETING = {
+    "title": "Consider Budgeting",
+    "description": "Your expenses are high relative to income. Consider creating a budget to manage spending better.",
+    "confidence_score": 0.88
+}
+START_INVESTING = {
+    "title": "Start Investing",
+    "description": "Consider allocating a portion of your income to investments for long-term growth.",
+    "confidence_score": 0.80
+}
+REVIEW_FINANCIAL_GOALS = {
+    "title": "Review Your Financial Goals",
+    "description": "Regularly review your financial transactions to stay on track with your goals.",
+    "confidence_score": 0.70
+}
+# Budgeting is suggested once expenses exceed this share of income
+BUDGET_EXPENSE_RATIO = 0.8
+
+def score_recommendations(db: Session, recommendation_type: str, user_id: int,
+                          recommendations: list) -> list:
+    """Replace the fixed confidence scores with the model's, if one is loaded"""
+    model = get_model(recommendation_type)
+    if model is None:
+        return recommendations
+    scores = model.score(
+        user_features(db, recommendation_type, user_id),
+        [rec["title"] for rec in recommendations]
+    )
+    return [
+        {**rec, "confidence_score": score}
+        for rec, score in zip(recommendations, scores)
+    ]
 
 def generate_career_recommendations(user_id: int, db: Session):
     """Generate career recommendations based on user goals"""
@@ -34,92 +90,38 @@ def generate_career_recommendations(user_id: int, db: Session):
         }
     ]
     
-    # Check if recommendation already exists
-    existing = db.query(MLRecommendation).filter(
-        MLRecommendation.user_id == user_id,
-        MLRecommendation.recommendation_type == "career"
-    ).first()
-    
-    if not existing:
-        for rec in recommendations:
-            db_rec = MLRecommendation(
-                user_id=user_id,
-                recommendation_type="career",
-                title=rec["title"],
-                description=rec["description"],
-                confidence_score=rec["confidence_score"]
-            )
-            db.add(db_rec)
-        db.commit()
+    recommendations = score_recommendations(db, "career", user_id, recommendations)
+    store_recommendations(db, user_id, "career", recommendations)
 
 def generate_health_recommendations(user_id: int, db: Session):
     """Generate health recommendations based on user records"""
     # Get recent health records
-    start_date = datetime.utcnow() - timedelta(days=7)
+    start_date = datetime.utcnow() - timedelta(days=HEALTH_WINDOW_DAYS)
     records = db.query(HealthRecord).filter(
         HealthRecord.user_id == user_id,
         HealthRecord.recorded_at >= start_date
     ).all()
     
     if not records:
-        recommendations = [
-            {
-                "title": "Start Tracking Your Health",
-                "description": "Begin logging your daily activities to get personalized health insights.",
-                "confidence_score": 0.90
-            }
-        ]
+        recommendations = [START_TRACKING_HEALTH]
     else:
         # Analyze records and generate recommendations
-        recommendations = [
-            {
-                "title": "Maintain Consistent Exercise",
-                "description": "You've been tracking your exercise. Keep up the consistency for better results!",
-                "confidence_score": 0.82
-            },
-            {
-                "title": "Monitor Your Sleep Patterns",
-                "description": "Tracking your sleep can help identify patterns and improve your rest quality.",
-                "confidence_score": 0.75
-            }
-        ]
-    
-    # Check if recommendation already exists
-    existing = db.query(MLRecommendation).filter(
-        MLRecommendation.user_id == user_id,
-        MLRecommendation.recommendation_type == "health",
-        MLRecommendation.created_at >= start_date
-    ).first()
+        recommendations = [MAINTAIN_EXERCISE, MONITOR_SLEEP]
     
-    if not existing:
-        for rec in recommendations:
-            db_rec = MLRecommendation(
-                user_id=user_id,
-                recommendation_type="health",
-                title=rec["title"],
-                description=rec["description"],
-                confidence_score=rec["confidence_score"]
-            )
-            db.add(db_rec)
-        db.commit()
+    recommendations = score_recommendations(db, "health", user_id, recommendations)
+    store_recommendations(db, user_id, "health", recommendations)
 
 def generate_finance_recommendations(user_id: int, db: Session):
     """Generate financial recommendations based on user transactions"""
     # Get recent transactions
-    start_date = datetime.utcnow() - timedelta(days=30)
+    start_date = datetime.utcnow() - timedelta(days=FINANCE_WINDOW_DAYS)
     transactions = db.query(FinancialTransaction).filter(
         FinancialTransaction.user_id == user_id,
         FinancialTransaction.transaction_date >= start_date
     ).all()
     
     if not transactions:
-        recommendations = [
-            {
-                "title": "Start Tracking Your Expenses",
-                "description": "Begin logging your financial transactions to get insights into your spending habits.",
-                "confidence_score": 0.90
-            }
-        ]
+        recommendations = [START_TRACKING_EXPENSES]
     else:
         # Calculate spending patterns
         total_expenses = sum(
@@ -130,43 +132,15 @@ def generate_finance_recommendations(user_id: int, db: Session):
         )
         
         recommendations = []
-        if total_expenses > total_income * 0.8:
-            recommendations.append({
-                "title": "Consider Budgeting",
-                "description": "Your expenses are high relative to income. Consider creating a budget to manage spending better.",
-                "confidence_score": 0.88
-            })
+        if total_expenses > total_income * BUDGET_EXPENSE_RATIO:
+            recommendations.append(CONSIDER_BUDGETING)
         
         if total_income > 0 and len([t for t in transactions if t.transaction_type == "investment"]) == 0:
-            recommendations.append({
-                "title": "Start Investing",
-                "description": "Consider allocating a portion of your income to investments for long-term growth.",
-                "confidence_score": 0.80
-            })
+            recommendations.append(START_INVESTING)
         
         if not recommendations:
-            recommendations.append({
-                "title": "Review Your Financial Goals",
-                "description": "Regularly review your financial transactions to stay on track with your goals.",
-                "confidence_score": 0.70
-            })
-    
-    # Check if recommendation already exists
-    existing = db.query(MLRecommendation).filter(
-        MLRecommendation.user_id == user_id,
-        MLRecommendation.recommendation_type == "finance",
-        MLRecommendation.created_at >= start_date
-    ).first()
+            recommendations.append(REVIEW_FINANCIAL_GOALS)
     
-    if not existing:
-        for rec in recommendations:
-            db_rec = MLRecommendation(
-                user_id=user_id,
-                recommendation_type="finance",
-                title=rec["title"],
-                description=rec["description"],
-                confidence_score=rec["confidence_score"]
-            )
-            db.add(db_rec)
-        db.commit()
+    recommendations = score_recommendations(db, "finance", user_id, recommendations)
+    store_recommendations(db, user_id, "finance", recommendations)
 
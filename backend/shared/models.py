@@ -1,6 +1,9 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import (
+    Column, Integer, String, Float, Date, DateTime, Text, ForeignKey, Boolean, Index,
+    UniqueConstraint
+)
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import false, func, text
 from shared.database import Base
 
 class User(Base):
@@ -14,6 +17,10 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    # Bumped by shared.auth.update_user; carried in tokens as the "ver" claim
+    revision = Column(Integer, nullable=False, server_default="1")
+    # Bumped on every change to the user's data; see shared.data_version
+    data_version = Column(Integer, nullable=False, server_default="0")
     
     # Relationships
     career_goals = relationship("CareerGoal", back_populates="user")
@@ -34,6 +41,10 @@ class CareerGoal(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
     user = relationship("User", back_populates="career_goals")
+    
+    __table_args__ = (
+        Index("ix_career_goals_user_id_status", "user_id", "status"),
+    )
 
 class HealthRecord(Base):
     __tablename__ = "health_records"
@@ -48,6 +59,17 @@ class HealthRecord(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     user = relationship("User", back_populates="health_records")
+    
+    # On PostgreSQL partitioned by month on recorded_at, with primary key
+    # (id, recorded_at); see shared.partitioning
+    # Per-user time-window reads (lists, summary, recommendations)
+    __table_args__ = (
+        Index("ix_health_records_user_id_recorded_at", "user_id", "recorded_at"),
+        Index(
+            "ix_health_records_user_id_record_type_recorded_at",
+            "user_id", "record_type", "recorded_at"
+        ),
+    )
 
 class FinancialTransaction(Base):
     __tablename__ = "financial_transactions"
@@ -60,10 +82,48 @@ class FinancialTransaction(Base):
     description = Column(Text, nullable=True)
     transaction_date = Column(DateTime(timezone=True), server_default=func.now())
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # md5 of day|signed amount|description, see shared.finance_import
+    fingerprint = Column(String(32), nullable=True)
     
     user = relationship("User", back_populates="financial_transactions")
+    
+    # On PostgreSQL partitioned by month on transaction_date, with primary
+    # key (id, transaction_date); see shared.partitioning
+    # Per-user time-window reads (lists, summary, recommendations)
+    __table_args__ = (
+        Index(
+            "ix_financial_transactions_user_id_transaction_date",
+            "user_id", "transaction_date"
+        ),
+        # Duplicate detection on statement import
+        Index(
+            "ix_financial_transactions_user_id_fingerprint",
+            "user_id", "fingerprint"
+        ),
+    )
+
+class FinancialDailyRollup(Base):
+    """Per-user, per-day totals maintained alongside financial_transactions"""
+    __tablename__ = "financial_daily_rollups"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    day = Column(Date, nullable=False)  # UTC day of transaction_date
+    transaction_type = Column(String, nullable=False)
+    category = Column(String, nullable=False)
+    total_amount = Column(Float, nullable=False, default=0.0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    
+    # Doubles as the (user_id, day) range index for summaries
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "day", "transaction_type", "category",
+            name="uq_financial_daily_rollups_user_day_type_category"
+        ),
+    )
 
 class MLRecommendation(Base):
+    """Written only through shared.recommendation_store (upserts on the fingerprint)"""
     __tablename__ = "ml_recommendations"
     
     id = Column(Integer, primary_key=True, index=True)
@@ -72,6 +132,42 @@ class MLRecommendation(Base):
     title = Column(String, nullable=False)
     description = Column(Text, nullable=False)
     confidence_score = Column(Float, nullable=True)
-    is_read = Column(Boolean, default=False)
+    is_read = Column(Boolean, nullable=False, default=False, server_default=false())
+    # md5 of title and description, see recommendation_store.recommendation_fingerprint
+    fingerprint = Column(String(32), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "recommendation_type", "fingerprint",
+            name="uq_ml_recommendations_user_type_fingerprint"
+        ),
+        # Backs the /recommendations endpoints, which only list unread rows
+        Index(
+            "ix_ml_recommendations_unread",
+            "user_id", "recommendation_type", "created_at",
+            postgresql_where=text("NOT is_read"),
+            sqlite_where=text("is_read = 0")
+        ),
+        # Backs the expiry sweeper
+        Index("ix_ml_recommendations_expires_at", "expires_at"),
+    )
 
+class RecommendationQueue(Base):
+    """Dirty set of (user, recommendation type) pairs awaiting recomputation"""
+    __tablename__ = "recommendation_queue"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    recommendation_type = Column(String, nullable=False)  # career, health, finance
+    first_enqueued_at = Column(DateTime(timezone=True), nullable=False)
+    enqueued_at = Column(DateTime(timezone=True), nullable=False)  # latest write
+    
+    __table_args__ = (
+        UniqueConstraint(
+            "user_id", "recommendation_type",
+            name="uq_recommendation_queue_user_type"
+        ),
+        Index("ix_recommendation_queue_enqueued_at", "enqueued_at"),
+    )
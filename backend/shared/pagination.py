@@ -0,0 +1,100 @@
+"""
+Keyset (cursor) pagination for time-ordered per-user lists
+Pages are ordered newest first on (timestamp, id) and continue strictly
+after the last row of the previous page, so every page costs an index
+range scan of `limit` rows no matter how deep the caller has paged.
+"""
+import base64
+import binascii
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+from fastapi import HTTPException, status
+from sqlalchemy import func, literal, tuple_
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def next_page_headers(next_cursor: Optional[str]) -> Optional[dict]:
+    """Response headers pointing at the next page, if there is one"""
+    return {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+
+def _invalid_cursor(detail: str = "Invalid cursor"):
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+def encode_cursor(state: dict) -> str:
+    raw = json.dumps(state, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        state = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        # Validate the fields we rely on
+        datetime.fromisoformat(state["since"])
+        datetime.fromisoformat(state["ts"])
+        int(state["id"])
+        dict(state["filters"])
+    except (ValueError, KeyError, TypeError, binascii.Error):
+        raise _invalid_cursor()
+    return state
+
+class KeysetPage:
+    """
+    Resolves filters, window and position for one page request.
+    A cursor pins the filters and the window start of the first page;
+    explicitly passing different filters alongside it is an error.
+    """
+
+    def __init__(self, cursor: Optional[str], limit: Optional[int], days: int, **filters):
+        self.limit = min(max(limit or PAGE_SIZE_DEFAULT, 1), PAGE_SIZE_MAX)
+        self.after = None
+        if cursor:
+            state = decode_cursor(cursor)
+            for name, value in filters.items():
+                if value is not None and state["filters"].get(name) != value:
+                    raise _invalid_cursor("Cursor does not match the current filters")
+            self.filters = state["filters"]
+            self.since = datetime.fromisoformat(state["since"])
+            self.after = (datetime.fromisoformat(state["ts"]), int(state["id"]))
+        else:
+            self.filters = filters
+            self.since = datetime.utcnow() - timedelta(days=days)
+
+    def apply(self, db, query, time_column, id_column):
+        """Add the keyset condition, ordering and limit to a Query or Select"""
+        sort_key = time_column
+        if db.get_bind().dialect.name == "sqlite":
+            # SQLite keeps timestamps as text in more than one format
+            # (CURRENT_TIMESTAMP vs. SQLAlchemy binds); compare them as numbers
+            sort_key = func.julianday(time_column)
+        if self.after is not None:
+            after_time, after_id = self.after
+            after_key = literal(after_time, time_column.type)
+            if sort_key is not time_column:
+                after_key = func.julianday(after_key)
+            query = query.filter(
+                tuple_(sort_key, id_column) < tuple_(after_key, literal(after_id, id_column.type))
+            )
+        # One extra row tells us whether another page exists
+        return query.order_by(sort_key.desc(), id_column.desc()).limit(self.limit + 1)
+
+    def finish(self, rows: list, time_attr: str):
+        """Trim the look-ahead row; return (rows, next_cursor or None)"""
+        if len(rows) <= self.limit:
+            return rows, None
+        rows = rows[:self.limit]
+        last = rows[-1]
+        next_cursor = encode_cursor({
+            "since": self.since.isoformat(),
+            "ts": getattr(last, time_attr).isoformat(),
+            "id": last.id,
+            "filters": self.filters,
+        })
+        return rows, next_cursor
@@ -0,0 +1,311 @@
+"""
+Monthly partitions for health_records and financial_transactions
+On PostgreSQL both tables are range-partitioned by UTC month on their time
+column, so the recent-window reads (lists, summaries, recommendations)
+only scan the latest partitions. A DEFAULT partition takes rows no month
+partition covers yet (e.g. statements imported from years back); they
+move into their month when that partition is created.
+
+Partitions are created ahead of time on startup and then daily by a
+maintenance thread, and manage_partitions.py archives old ones. Other
+databases keep plain tables and every function here is a no-op there.
+"""
+import gzip
+import logging
+import os
+import re
+import threading
+from datetime import date, datetime, timezone
+from typing import List, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# table -> partition key
+PARTITIONED_TABLES = {
+    "health_records": "recorded_at",
+    "financial_transactions": "transaction_date",
+}
+
+# Months of partitions kept ready past the current one
+PARTITION_MONTHS_AHEAD = int(os.getenv("PARTITION_MONTHS_AHEAD", "3"))
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = float(
+    os.getenv("PARTITION_MAINTENANCE_INTERVAL_SECONDS", "86400")
+)
+# Months kept attached by `manage_partitions.py archive` (0 = keep everything)
+PARTITION_RETENTION_MONTHS = int(os.getenv("PARTITION_RETENTION_MONTHS", "0"))
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PARTITION_ARCHIVE_DIR = os.getenv(
+    "PARTITION_ARCHIVE_DIR", os.path.join(BACKEND_DIR, "archive")
+)
+
+_PARTITION_NAME = re.compile(r"_p(\d{4})(\d{2})$")
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def current_month() -> date:
+    return month_start(datetime.now(timezone.utc).date())
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+def _bound(month: date) -> str:
+    # Partition bounds are literals; months are always UTC midnights
+    return f"'{month.isoformat()} 00:00:00+00'"
+
+def is_postgresql(conn: Connection) -> bool:
+    return conn.dialect.name == "postgresql"
+
+def is_partitioned(conn: Connection, table: str) -> bool:
+    return bool(conn.scalar(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t))"),
+        {"t": table},
+    ))
+
+def list_partitions(conn: Connection, table: str) -> List[Tuple[str, Optional[date]]]:
+    """(name, month) of each attached partition, oldest first; month is None for DEFAULT"""
+    names = conn.scalars(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:t)"
+    ), {"t": table}).all()
+    partitions = []
+    for name in names:
+        match = _PARTITION_NAME.search(name)
+        month = date(int(match.group(1)), int(match.group(2)), 1) if match else None
+        partitions.append((name, month))
+    return sorted(partitions, key=lambda item: (item[1] is None, item[1] or date.min))
+
+def create_partition(conn: Connection, table: str, month: date):
+    """
+    Add the partition for one month, moving in any of its rows that were
+    parked in the DEFAULT partition.
+    """
+    column = PARTITIONED_TABLES[table]
+    name = partition_name(table, month)
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    conn.execute(text(
+        f"WITH moved AS (DELETE FROM {default_partition_name(table)} "
+        f"WHERE {column} >= {_bound(month)} AND {column} < {_bound(add_months(month, 1))} "
+        f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+    ))
+    # Indexes, primary key and foreign key are created from the parent's
+    conn.execute(text(
+        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ({_bound(month)}) TO ({_bound(add_months(month, 1))})"
+    ))
+
+def _lock(conn: Connection):
+    # Several processes run maintenance on startup; one at a time
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('thrivementor_partitions'))"))
+
+def ensure_partitions(conn: Connection, months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Create missing partitions from this month to `months_ahead` months out"""
+    if not is_postgresql(conn):
+        return []
+    _lock(conn)
+    created = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(conn, table):
+            continue
+        existing = {name for name, _ in list_partitions(conn, table)}
+        for offset in range(months_ahead + 1):
+            month = add_months(current_month(), offset)
+            if partition_name(table, month) not in existing:
+                create_partition(conn, table, month)
+                created.append(partition_name(table, month))
+    return created
+
+def _drop_indexes_and_constraints(conn: Connection, table: str):
+    """Free the index and constraint names of a table about to be replaced"""
+    for name in conn.scalars(text(
+        "SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(:t)"
+    ), {"t": table}).all():
+        conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+    for name in conn.scalars(text(
+        "SELECT indexname FROM pg_indexes WHERE tablename = :t AND schemaname = current_schema()"
+    ), {"t": table}).all():
+        conn.execute(text(f'DROP INDEX "{name}"'))
+
+def _create_indexes(conn: Connection, table: str):
+    from shared.database import Base
+    import shared.models  # noqa: F401  (registers tables on Base.metadata)
+    for index in Base.metadata.tables[table].indexes:
+        index.create(conn)
+
+def _move_rows(conn: Connection, source: str, table: str):
+    """Copy every row into the replacement table, hand over the id sequence, drop the source"""
+    sequence = conn.scalar(text("SELECT pg_get_serial_sequence(:t, 'id')"), {"t": source})
+    conn.execute(text(f"INSERT INTO {table} SELECT * FROM {source}"))
+    if sequence:
+        # The sequence belongs to the old table and would be dropped with it
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+    conn.execute(text(f"DROP TABLE {source}"))
+    conn.execute(text(f"ANALYZE {table}"))
+
+def partition_table(conn: Connection, table: str, months_ahead: int = PARTITION_MONTHS_AHEAD):
+    """
+    Convert a plain table into a monthly partitioned one, keeping its rows
+    and ids. The primary key becomes (id, <time column>), as PostgreSQL
+    requires the partition key in every unique constraint.
+    """
+    column = PARTITIONED_TABLES[table]
+    source = f"{table}_unpartitioned"
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {source}"))
+    _drop_indexes_and_constraints(conn, source)
+    # The partition key can't be NULL
+    conn.execute(text(
+        f"UPDATE {source} SET {column} = coalesce(created_at, now()) WHERE {column} IS NULL"
+    ))
+    conn.execute(text(
+        f"CREATE TABLE {table} (LIKE {source} INCLUDING DEFAULTS) PARTITION BY RANGE ({column})"
+    ))
+    conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+    conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {column})"))
+    conn.execute(text(
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_user_id_fkey "
+        f"FOREIGN KEY (user_id) REFERENCES users (id)"
+    ))
+    _create_indexes(conn, table)
+    conn.execute(text(f"CREATE TABLE {default_partition_name(table)} PARTITION OF {table} DEFAULT"))
+
+    months = {
+        month_start(value) for value in conn.scalars(text(
+            f"SELECT DISTINCT CAST(date_trunc('month', {column} AT TIME ZONE 'UTC') AS date) "
+            f"FROM {source}"
+        ))
+    }
+    months.update(add_months(current_month(), offset) for offset in range(months_ahead + 1))
+    for month in sorted(months):
+        create_partition(conn, table, month)
+    _move_rows(conn, source, table)
+
+def unpartition_table(conn: Connection, table: str):
+    """Turn a partitioned table back into a plain one (migration downgrade)"""
+    source = f"{table}_partitioned"
+    conn.execute(text(f"ALTER TABLE {table} RENAME TO {source}"))
+    for name, _ in list_partitions(conn, source):
+        conn.execute(text(f"ALTER TABLE {source} DETACH PARTITION {name}"))
+        conn.execute(text(f"ALTER TABLE {name} RENAME TO {name}_old"))
+    _drop_indexes_and_constraints(conn, source)
+    conn.execute(text(f"CREATE TABLE {table} (LIKE {source} INCLUDING DEFAULTS)"))
+    conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)"))
+    conn.execute(text(
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_user_id_fkey "
+        f"FOREIGN KEY (user_id) REFERENCES users (id)"
+    ))
+    _create_indexes(conn, table)
+    for name in conn.scalars(text(
+        "SELECT tablename FROM pg_tables WHERE schemaname = current_schema() "
+        "AND tablename LIKE :pattern"
+    ), {"pattern": f"{table}\\_%\\_old"}).all():
+        conn.execute(text(f"INSERT INTO {table} SELECT * FROM {name}"))
+        conn.execute(text(f"DROP TABLE {name}"))
+    _move_rows(conn, source, table)
+
+def partition_all(conn: Connection, months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """partition_table for every table not partitioned yet (PostgreSQL only)"""
+    if not is_postgresql(conn):
+        return []
+    _lock(conn)
+    converted = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(conn, table):
+            partition_table(conn, table, months_ahead)
+            converted.append(table)
+    return converted
+
+def archive_partitions(engine, retention_months: int, archive_dir: str = PARTITION_ARCHIVE_DIR,
+                       dry_run: bool = False) -> List[Tuple[str, int, Optional[str]]]:
+    """
+    Detach month partitions older than `retention_months`, write each to
+    <archive_dir>/<partition>.csv.gz and drop it. Each partition is handled
+    in its own transaction: if writing the archive fails it stays attached.
+    Returns (partition, rows, path) per partition.
+    """
+    cutoff = add_months(current_month(), -retention_months)
+    with engine.connect() as conn:
+        if not is_postgresql(conn):
+            return []
+        candidates = [
+            (table, name) for table in PARTITIONED_TABLES if is_partitioned(conn, table)
+            for name, month in list_partitions(conn, table)
+            if month is not None and add_months(month, 1) <= cutoff
+        ]
+    archived = []
+    if not dry_run:
+        os.makedirs(archive_dir, exist_ok=True)
+    for table, name in candidates:
+        if dry_run:
+            with engine.connect() as conn:
+                archived.append((name, conn.scalar(text(f"SELECT count(*) FROM {name}")), None))
+            continue
+        path = os.path.join(archive_dir, f"{name}.csv.gz")
+        with engine.begin() as conn:
+            _lock(conn)
+            conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+            rows = conn.scalar(text(f"SELECT count(*) FROM {name}"))
+            cursor = conn.connection.driver_connection.cursor()
+            try:
+                with gzip.open(path + ".tmp", "wb") as f:
+                    cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(path + ".tmp", path)
+            except BaseException:
+                if os.path.exists(path + ".tmp"):
+                    os.remove(path + ".tmp")
+                raise
+            finally:
+                cursor.close()
+            conn.execute(text(f"DROP TABLE {name}"))
+        archived.append((name, rows, path))
+    return archived
+
+def run_maintenance(engine):
+    """ensure_partitions in its own transaction; failures are logged, not raised"""
+    try:
+        with engine.begin() as conn:
+            created = ensure_partitions(conn)
+        if created:
+            logger.info("Created partitions %s", ", ".join(created))
+    except Exception:
+        logger.exception("Partition maintenance failed")
+
+_maintenance_thread = None
+_stop_event = threading.Event()
+
+def start_maintenance_thread():
+    """Create upcoming partitions now and then once per interval (PostgreSQL only)"""
+    global _maintenance_thread
+    from shared.database import engine
+    if engine.dialect.name != "postgresql" or _maintenance_thread is not None:
+        return
+    _stop_event.clear()
+
+    def run():
+        while not _stop_event.is_set():
+            run_maintenance(engine)
+            _stop_event.wait(PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+
+    _maintenance_thread = threading.Thread(target=run, name="partition-maintenance", daemon=True)
+    _maintenance_thread.start()
+
+def stop_maintenance_thread():
+    global _maintenance_thread
+    if _maintenance_thread is None:
+        return
+    _stop_event.set()
+    _maintenance_thread.join(timeout=5)
+    _maintenance_thread = None
@@ -0,0 +1,116 @@
+"""
+Connection pool instrumentation
+Pool classes that time how long callers wait for a connection, plus the
+per-engine counters served by the gateway's /internal/db/pool endpoint.
+"""
+import threading
+import time
+from collections import deque
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from shared.metrics import Histogram
+
+# Window for the connection creation rate
+RATE_WINDOW_SECONDS = 60
+
+class PoolMetrics:
+    """Counters for one engine's pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self.wait_seconds = Histogram()
+        self.timeouts = 0
+        self.connections_created = 0
+        # Callers in checkout right now; they queue here once the pool is exhausted
+        self.waiting = 0
+        self._created_at = deque()
+        self._lock = threading.Lock()
+
+    def record_connect(self):
+        now = time.monotonic()
+        with self._lock:
+            self.connections_created += 1
+            self._created_at.append(now)
+            while self._created_at and self._created_at[0] < now - RATE_WINDOW_SECONDS:
+                self._created_at.popleft()
+
+    def record_wait(self, delta: int):
+        with self._lock:
+            self.waiting += delta
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            recent = sum(1 for t in self._created_at if t >= now - RATE_WINDOW_SECONDS)
+            created, timeouts, waiting = self.connections_created, self.timeouts, self.waiting
+        pool = self.pool
+        sized = isinstance(pool, QueuePool)
+        return {
+            "pool_size": pool.size() if sized else None,
+            "checked_out": pool.checkedout() if sized else None,
+            "checked_in": pool.checkedin() if sized else None,
+            "overflow": max(pool.overflow(), 0) if sized else None,
+            "waiting": waiting,
+            "timeouts": timeouts,
+            "connections_created": created,
+            "connections_created_per_second": recent / RATE_WINDOW_SECONDS,
+            "wait_seconds": self.wait_seconds.snapshot(),
+        }
+
+# engine name -> PoolMetrics
+registry = {}
+
+class _InstrumentedPoolMixin:
+    metrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        if self.metrics is not None:
+            self.metrics.record_wait(1)
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.record_wait(-1)
+                self.metrics.wait_seconds.observe(time.perf_counter() - start)
+
+    def recreate(self):
+        # Event listeners are carried over by recreate(); only relink metrics
+        pool = super().recreate()
+        if self.metrics is not None:
+            pool.metrics = self.metrics
+            self.metrics.pool = pool
+        return pool
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    """QueuePool that reports checkout wait times"""
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that reports checkout wait times"""
+
+def instrument_pool(pool, metrics: PoolMetrics):
+    """Attach metrics to a pool (and its connect events)"""
+    pool.metrics = metrics
+    metrics.pool = pool
+    event.listen(pool, "connect", lambda dbapi_conn, record: metrics.record_connect())
+
+def register_engine(name: str, engine):
+    """Start collecting pool metrics for an engine (sync or async)"""
+    sync_engine = getattr(engine, "sync_engine", engine)
+    metrics = PoolMetrics(name)
+    instrument_pool(sync_engine.pool, metrics)
+    registry[name] = metrics
+    return metrics
+
+def pool_snapshot() -> dict:
+    """Current metrics for every registered engine"""
+    return {name: metrics.snapshot() for name, metrics in registry.items()}
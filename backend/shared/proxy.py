@@ -0,0 +1,119 @@
+"""
+Gateway proxy to separately running services (GATEWAY_MODE=proxy)
+Each service is an ASGI app mounted on the gateway that forwards requests
+over one shared keep-alive httpx.AsyncClient. Request and response bodies
+are streamed through rather than buffered, so exports and imports keep
+their memory profile.
+"""
+import logging
+import os
+from typing import Dict, Optional
+import httpx
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "mount" serves every service in the gateway process; "proxy" forwards to
+# services started separately (see run_services.py)
+GATEWAY_MODE = os.getenv("GATEWAY_MODE", "mount").lower()
+
+# Default port of each service when run on its own
+SERVICE_PORTS = {"auth": 8001, "career": 8002, "health": 8003, "finance": 8004}
+SERVICE_URLS: Dict[str, str] = {
+    name: os.getenv(f"{name.upper()}_SERVICE_URL", f"http://127.0.0.1:{port}").rstrip("/")
+    for name, port in SERVICE_PORTS.items()
+}
+
+PROXY_MAX_CONNECTIONS = int(os.getenv("GATEWAY_PROXY_MAX_CONNECTIONS", "100"))
+PROXY_MAX_KEEPALIVE = int(os.getenv("GATEWAY_PROXY_MAX_KEEPALIVE", "20"))
+PROXY_TIMEOUT_SECONDS = float(os.getenv("GATEWAY_PROXY_TIMEOUT_SECONDS", "30"))
+
+# Connection-level headers are not forwarded in either direction
+HOP_BY_HOP_HEADERS = {
+    b"connection", b"keep-alive", b"proxy-authenticate", b"proxy-authorization",
+    b"te", b"trailer", b"transfer-encoding", b"upgrade", b"host",
+}
+
+_client: Optional[httpx.AsyncClient] = None
+
+def start_proxy_client():
+    """Open the shared upstream connection pool (gateway startup)"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=PROXY_MAX_CONNECTIONS,
+                max_keepalive_connections=PROXY_MAX_KEEPALIVE,
+            ),
+            timeout=httpx.Timeout(PROXY_TIMEOUT_SECONDS),
+        )
+
+async def close_proxy_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+def _forward_headers(request: Request) -> list:
+    headers = [
+        (name, value) for name, value in request.headers.raw
+        if name not in HOP_BY_HOP_HEADERS and name != b"x-forwarded-for"
+    ]
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if request.client:
+        forwarded_for = f"{forwarded_for}, {request.client.host}" if forwarded_for else request.client.host
+    if forwarded_for:
+        headers.append((b"x-forwarded-for", forwarded_for.encode("latin-1")))
+    if b"x-forwarded-proto" not in {name for name, _ in headers}:
+        headers.append((b"x-forwarded-proto", request.url.scheme.encode("latin-1")))
+    return headers
+
+class ServiceProxy:
+    """ASGI app forwarding everything under its mount point to one service"""
+
+    def __init__(self, name: str, base_url: str):
+        self.name = name
+        self.base_url = httpx.URL(base_url)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        request = Request(scope, receive)
+        has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+        upstream_request = _client.build_request(
+            request.method,
+            self.base_url.copy_with(path=scope["path"], query=scope["query_string"] or None),
+            headers=_forward_headers(request),
+            content=request.stream() if has_body else None,
+        )
+        try:
+            upstream = await _client.send(upstream_request, stream=True)
+        except httpx.TransportError as exc:
+            logger.warning("Proxy to %s service failed: %s", self.name, exc)
+            response = JSONResponse(
+                {"detail": f"{self.name.capitalize()} service unavailable"},
+                status_code=504 if isinstance(exc, httpx.TimeoutException) else 502,
+            )
+            await response(scope, receive, send)
+            return
+
+        # aiter_raw: bytes go through as sent, still compressed if they were
+        response = StreamingResponse(
+            upstream.aiter_raw(),
+            status_code=upstream.status_code,
+            background=BackgroundTask(upstream.aclose),
+        )
+        response.raw_headers = [
+            (name.lower(), value) for name, value in upstream.headers.raw
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        ]
+        await response(scope, receive, send)
+
+def service_proxies() -> Dict[str, ServiceProxy]:
+    """Mount point -> proxy app for every service"""
+    return {f"/{name}": ServiceProxy(name, url) for name, url in SERVICE_URLS.items()}
@@ -0,0 +1,280 @@
+"""
+Rate limiting and load shedding
+RateLimitMiddleware (gateway) applies token-bucket limits per route, keyed
+by the bearer token's user id or, for anonymous requests and invalid
+tokens, the client IP. Buckets live in a RateLimitStore: in-process by
+default, or Redis (RATE_LIMIT_STORE=redis://...) so every gateway process
+shares them; set_store() plugs in any other backend.
+
+LoadSheddingMiddleware answers 503 before any work is done when this
+process is saturated: too many callers queued for a primary DB connection,
+or, on the password routes, a full hashing queue. Rejecting early keeps a
+flood from holding threads, pool slots and bcrypt time that the requests
+already admitted need.
+"""
+import abc
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from starlette.responses import JSONResponse
+from dotenv import load_dotenv
+from shared.database import DB_MAX_OVERFLOW, DB_POOL_SIZE
+from shared.hashing import HASH_QUEUE_LIMIT, HASH_RETRY_AFTER_SECONDS, queue_depth
+from shared.pool_metrics import registry
+from shared.proxy import SERVICE_PORTS
+from shared.security import decode_access_token
+
+load_dotenv()
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+# "METHOD /path-prefix=requests/seconds", comma-separated; the first
+# matching rule applies, "*" matches any method and 0 requests means unlimited
+RATE_LIMITS = os.getenv(
+    "RATE_LIMITS",
+    "POST /auth/token=10/60, POST /auth/register=5/3600, GET /metrics=0, * /=600/60"
+)
+# "memory" or a redis:// URL
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "memory")
+# Buckets kept by the in-process store (least recently used are dropped)
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Take the client IP from the last X-Forwarded-For entry (behind a reverse proxy)
+RATE_LIMIT_TRUST_FORWARDED_FOR = os.getenv(
+    "RATE_LIMIT_TRUST_FORWARDED_FOR", "false"
+).lower() in ("1", "true", "yes")
+
+# Shed once this many callers wait for a primary DB connection (0 = never)
+SHED_DB_POOL_WAITING = int(os.getenv("SHED_DB_POOL_WAITING", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+# Shed password requests once this many hashing jobs are queued or running
+SHED_HASH_QUEUE_DEPTH = int(os.getenv("SHED_HASH_QUEUE_DEPTH", str(HASH_QUEUE_LIMIT)))
+SHED_RETRY_AFTER_SECONDS = int(os.getenv("SHED_RETRY_AFTER_SECONDS", "1"))
+# Routes that hash passwords (suffixes, so they match in the auth service's
+# own process too, where the /auth prefix is gone)
+HASHING_PATHS = ("/token", "/register")
+# Never shed: liveness and monitoring
+SHED_EXEMPT_PATHS = ("/", "/metrics", "/internal/db/pool")
+
+# Liveness probes of the gateway and of each service, as the gateway sees
+# them (/auth/health, /health/health...) and as a service run on its own does
+LIVENESS_PATHS = frozenset(["/health"] + [f"/{name}/health" for name in SERVICE_PORTS])
+
+def is_liveness_path(path: str) -> bool:
+    return path in LIVENESS_PATHS
+
+class RateLimitRule:
+    """`limit` requests per `period` seconds for matching requests"""
+
+    def __init__(self, method: str, prefix: str, limit: int, period: float):
+        self.method = method.upper()
+        self.prefix = prefix
+        self.limit = limit
+        self.period = period
+        self.name = f"{self.method} {prefix}"
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second"""
+        return self.limit / self.period
+
+    def matches(self, method: str, path: str) -> bool:
+        return self.method in ("*", method) and path.startswith(self.prefix)
+
+def parse_rules(spec: str) -> List[RateLimitRule]:
+    """RateLimitRules from a RATE_LIMITS string"""
+    rules = []
+    for entry in spec.split(","):
+        if not entry.strip():
+            continue
+        route, _, quota = entry.partition("=")
+        method, _, prefix = route.strip().partition(" ")
+        limit, _, period = quota.strip().partition("/")
+        if not prefix.strip() or not limit:
+            raise ValueError(f"Invalid RATE_LIMITS entry: {entry.strip()!r}")
+        rules.append(RateLimitRule(method, prefix.strip(), int(limit), float(period or 1)))
+    return rules
+
+class RateLimitStore(abc.ABC):
+    """Token buckets by key; implementations decide where they live"""
+
+    @abc.abstractmethod
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        """
+        Take one token from the bucket. Returns 0 when the request may go
+        ahead, otherwise the seconds until a token is available.
+        """
+
+class MemoryStore(RateLimitStore):
+    """Buckets in this process only (each gateway worker counts on its own)"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        # key -> (tokens, updated_at)
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+# Same bucket arithmetic as MemoryStore, atomic on the Redis server
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(bucket[1]) or capacity
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated_at) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return tostring(wait)
+"""
+
+class RedisStore(RateLimitStore):
+    """Buckets shared by every process using the same Redis (needs `pip install redis`)"""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis.asyncio as redis
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._take = self.client.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, rate: float, capacity: int) -> float:
+        return float(await self._take(keys=[self.prefix + key], args=[rate, capacity]))
+
+_store: Optional[RateLimitStore] = None
+
+def get_store() -> RateLimitStore:
+    """The configured store, created on first use"""
+    global _store
+    if _store is None:
+        if RATE_LIMIT_STORE.startswith(("redis://", "rediss://", "unix://")):
+            _store = RedisStore(RATE_LIMIT_STORE)
+        else:
+            _store = MemoryStore()
+    return _store
+
+def set_store(store: RateLimitStore):
+    """Use another backend for the buckets"""
+    global _store
+    _store = store
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+def client_identity(scope) -> str:
+    """'user:<id>' for a valid bearer token, otherwise 'ip:<address>'"""
+    authorization = _header(scope, b"authorization")
+    if authorization and authorization[:7].lower() == "bearer ":
+        payload = decode_access_token(authorization[7:].strip())
+        if payload is not None:
+            return f"user:{payload.get('uid') or payload.get('sub')}"
+    forwarded = _header(scope, b"x-forwarded-for") if RATE_LIMIT_TRUST_FORWARDED_FOR else None
+    if forwarded:
+        return "ip:" + forwarded.split(",")[-1].strip()
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+def _reject(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+    return JSONResponse(
+        {"detail": detail},
+        status_code=status_code,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+class RateLimitMiddleware:
+    """
+    Pure ASGI middleware: token buckets per (rule, user or IP). Liveness
+    probes are never limited, whatever the rules say.
+    """
+
+    def __init__(self, app, rules: Optional[List[RateLimitRule]] = None):
+        self.app = app
+        self.rules = parse_rules(RATE_LIMITS) if rules is None else rules
+
+    def rule_for(self, method: str, path: str) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http" or not RATE_LIMIT_ENABLED or scope["method"] == "OPTIONS"
+            or is_liveness_path(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+        rule = self.rule_for(scope["method"], scope["path"])
+        if rule is not None and rule.limit > 0:
+            key = f"{rule.name}|{client_identity(scope)}"
+            wait = await get_store().take(key, rule.rate, rule.limit)
+            if wait > 0:
+                response = _reject(429, "Too many requests, please slow down", wait)
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+def overload_reason(method: str, path: str) -> Optional[Tuple[str, float]]:
+    """(detail, retry_after seconds) when a request should be shed right now, or None"""
+    if path in SHED_EXEMPT_PATHS or is_liveness_path(path):
+        return None
+    if (
+        SHED_HASH_QUEUE_DEPTH > 0 and method == "POST" and path.endswith(HASHING_PATHS)
+        and queue_depth() >= SHED_HASH_QUEUE_DEPTH
+    ):
+        return "Authentication is busy, please retry shortly", HASH_RETRY_AFTER_SECONDS
+    if SHED_DB_POOL_WAITING > 0:
+        waiting = sum(
+            metrics.waiting for name, metrics in list(registry.items()) if name.startswith("primary")
+        )
+        if waiting >= SHED_DB_POOL_WAITING:
+            return "Service is busy, please retry shortly", SHED_RETRY_AFTER_SECONDS
+    return None
+
+class LoadSheddingMiddleware:
+    """
+    Pure ASGI middleware: 503 while this process is saturated. Added to the
+    gateway and to each service app, so a service run on its own sheds too;
+    when the services are mounted in the gateway, only the outermost
+    instance (the gateway's) checks.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("load_shedding_checked"):
+            await self.app(scope, receive, send)
+            return
+        scope["load_shedding_checked"] = True
+        reason = overload_reason(scope["method"], scope["path"])
+        if reason is not None:
+            detail, retry_after = reason
+            response = _reject(503, detail, retry_after)
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
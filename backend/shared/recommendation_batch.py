@@ -0,0 +1,151 @@
+"""
+Batch recommendation scoring
+Computes health and finance recommendations for a whole range of users
+at once: a few grouped queries per range (shared.ml_features), the
+generator rules from shared.ml_service applied column-wise with pandas,
+model scores for a whole candidate column per predict call, and one
+multi-row upsert. Every user in the range gets the set the per-user
+generators' rules select, written the same way as store_recommendations:
+upserted, with the user's other unexpired rows expired. A rerun therefore
+refreshes every user whose data changed, not only users without a
+recommendation yet.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+import pandas as pd
+from sqlalchemy import func, select
+from shared.database import SessionLocal
+from shared.data_version import bump_data_versions
+from shared.models import User
+from shared.ml_features import feature_matrix, range_features
+from shared.ml_model import get_model
+from shared.recommendation_store import (
+    expiry, expire_replaced, recommendation_row, upsert_recommendations
+)
+from shared.ml_service import (
+    BUDGET_EXPENSE_RATIO,
+    START_TRACKING_HEALTH, MAINTAIN_EXERCISE, MONITOR_SLEEP,
+    START_TRACKING_EXPENSES, CONSIDER_BUDGETING, START_INVESTING, REVIEW_FINANCIAL_GOALS
+)
+
+RECOMMENDATION_TYPES = ("health", "finance")
+
+def _users_to_score(db, low: int, high: int) -> pd.Index:
+    """Users in [low, high)"""
+    users = select(User.id).where(User.id >= low, User.id < high).order_by(User.id)
+    return pd.Index(db.scalars(users).all(), name="user_id")
+
+def _rows(user_ids, recommendation_type: str, recommendation: dict, features,
+          expires_at: datetime) -> list:
+    """Recommendation rows for user_ids, scored by the model when one is loaded"""
+    scores = [recommendation["confidence_score"]] * len(user_ids)
+    model = get_model(recommendation_type)
+    if model is not None and len(user_ids):
+        scores = model.score_users(
+            feature_matrix(recommendation_type, features, user_ids), recommendation["title"]
+        ).tolist()
+    return [
+        recommendation_row(
+            int(user_id), recommendation_type,
+            {**recommendation, "confidence_score": score}, expires_at
+        )
+        for user_id, score in zip(user_ids, scores)
+    ]
+
+def score_health(db, low: int, high: int, expires_at: datetime) -> list:
+    users = _users_to_score(db, low, high)
+    if users.empty:
+        return []
+    features = range_features(db, "health", low, high)
+    active = features["record_count"].reindex(users, fill_value=0).to_numpy() > 0
+    return (
+        _rows(users[~active], "health", START_TRACKING_HEALTH, features, expires_at)
+        + _rows(users[active], "health", MAINTAIN_EXERCISE, features, expires_at)
+        + _rows(users[active], "health", MONITOR_SLEEP, features, expires_at)
+    )
+
+def score_finance(db, low: int, high: int, expires_at: datetime) -> list:
+    users = _users_to_score(db, low, high)
+    if users.empty:
+        return []
+    all_features = range_features(db, "finance", low, high)
+    features = all_features.reindex(users, fill_value=0)
+    has_transactions = features["transaction_count"].to_numpy() > 0
+    income = features["income_total"].to_numpy(dtype=float)
+    # Same rules as generate_finance_recommendations; the ratio is inf
+    # without income and NaN (never above the threshold) without either
+    budget = has_transactions & (features["expense_ratio"].to_numpy() > BUDGET_EXPENSE_RATIO)
+    invest = has_transactions & (income > 0) & (features["investment_count"].to_numpy() == 0)
+    review = has_transactions & ~budget & ~invest
+    return (
+        _rows(users[~has_transactions], "finance", START_TRACKING_EXPENSES, all_features, expires_at)
+        + _rows(users[budget], "finance", CONSIDER_BUDGETING, all_features, expires_at)
+        + _rows(users[invest], "finance", START_INVESTING, all_features, expires_at)
+        + _rows(users[review], "finance", REVIEW_FINANCIAL_GOALS, all_features, expires_at)
+    )
+
+SCORERS = {
+    "health": score_health,
+    "finance": score_finance,
+}
+
+def score_range(low: int, high: int, recommendation_types=RECOMMENDATION_TYPES) -> dict:
+    """Score users with low <= id < high; returns rows written per type"""
+    inserted = {}
+    changed = set()
+    expires_at = expiry()
+    db = SessionLocal()
+    try:
+        for recommendation_type in recommendation_types:
+            rows = SCORERS[recommendation_type](db, low, high, expires_at)
+            if rows:
+                upsert_recommendations(db, rows)
+                expire_replaced(db, recommendation_type, rows)
+                changed.update(row["user_id"] for row in rows)
+            inserted[recommendation_type] = len(rows)
+        bump_data_versions(db, changed)
+        db.commit()
+    finally:
+        db.close()
+    return inserted
+
+def user_id_ranges(range_size: int) -> list:
+    """[low, high) user id ranges covering every user"""
+    db = SessionLocal()
+    try:
+        low, high = db.execute(select(func.min(User.id), func.max(User.id))).one()
+    finally:
+        db.close()
+    if low is None:
+        return []
+    return [(start, start + range_size) for start in range(low, high + 1, range_size)]
+
+def score_all(recommendation_types=RECOMMENDATION_TYPES, workers: int = None,
+              range_size: int = 50000) -> dict:
+    """
+    Score every user, one user id range per task on a process pool.
+    workers=1 scores in this process. Each range commits on its own.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = user_id_ranges(range_size)
+    totals = dict.fromkeys(recommendation_types, 0)
+
+    def add(inserted):
+        for recommendation_type, count in inserted.items():
+            totals[recommendation_type] += count
+
+    if workers == 1 or len(ranges) <= 1:
+        for low, high in ranges:
+            add(score_range(low, high, recommendation_types))
+        return totals
+    # spawn: children open their own connections instead of sharing the parent's
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as pool:
+        futures = [
+            pool.submit(score_range, low, high, tuple(recommendation_types))
+            for low, high in ranges
+        ]
+        for future in futures:
+            add(future.result())
+    return totals
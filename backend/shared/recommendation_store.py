@@ -0,0 +1,156 @@
+"""
+Recommendation store
+Recommendations are identified by (user, type, fingerprint of title and
+description), which ml_recommendations enforces with a unique
+constraint. Writes are single INSERT ... ON CONFLICT DO UPDATE
+statements, so regenerating a recommendation refreshes its score and
+expiry instead of adding a duplicate, and concurrent writers cannot race.
+
+Every row expires RECOMMENDATION_TTL_DAYS after it was last generated,
+rounded up to UTC midnight so the visible set only changes with a data
+version bump or at the day boundary (the reads use daily ETags). Reads
+only return unread, unexpired rows, served by a partial index on unread
+rows; sweep_expired() deletes expired rows and runs in the
+recommendation worker.
+"""
+import hashlib
+import os
+from datetime import datetime, time, timedelta
+from typing import Optional
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from shared.database import upsert_insert
+from shared.models import MLRecommendation
+
+load_dotenv()
+
+RECOMMENDATION_TTL_DAYS = int(os.getenv("RECOMMENDATION_TTL_DAYS", "30"))
+# Rows deleted per statement by the sweeper
+SWEEP_BATCH_SIZE = int(os.getenv("RECOMMENDATION_SWEEP_BATCH_SIZE", "1000"))
+# Recommendations returned per /recommendations request
+PAGE_SIZE = 10
+
+def recommendation_fingerprint(title: str, description: str) -> str:
+    """
+    md5 of title and description.
+    Must stay in step with the backfill in alembic revision 0008.
+    """
+    return hashlib.md5(f"{title}|{description}".encode()).hexdigest()
+
+def expiry(now: Optional[datetime] = None) -> datetime:
+    """UTC midnight ending the day RECOMMENDATION_TTL_DAYS from now"""
+    end = (now or datetime.utcnow()) + timedelta(days=RECOMMENDATION_TTL_DAYS)
+    return datetime.combine(end.date() + timedelta(days=1), time.min)
+
+def recommendation_row(user_id: int, recommendation_type: str, recommendation: dict,
+                       expires_at: datetime) -> dict:
+    """ml_recommendations row for a generator's {title, description, confidence_score}"""
+    return {
+        "user_id": user_id,
+        "recommendation_type": recommendation_type,
+        "title": recommendation["title"],
+        "description": recommendation["description"],
+        "confidence_score": recommendation["confidence_score"],
+        "fingerprint": recommendation_fingerprint(
+            recommendation["title"], recommendation["description"]
+        ),
+        "expires_at": expires_at,
+    }
+
+def upsert_recommendations(db: Session, rows: list):
+    """
+    Insert rows; existing ones get the new score and expiry (read state
+    is kept). Runs in the caller's transaction.
+    """
+    if not rows:
+        return
+    stmt = upsert_insert(db, MLRecommendation)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "recommendation_type", "fingerprint"],
+        set_={
+            "confidence_score": stmt.excluded.confidence_score,
+            "expires_at": stmt.excluded.expires_at,
+        },
+    )
+    db.execute(stmt, rows)
+
+def store_recommendations(db: Session, user_id: int, recommendation_type: str,
+                          recommendations: list):
+    """
+    Make `recommendations` the user's current set for this type: upsert
+    them and expire the ones they replace. Runs in the caller's transaction.
+    """
+    now = datetime.utcnow()
+    expires_at = expiry(now)
+    rows = [
+        recommendation_row(user_id, recommendation_type, rec, expires_at)
+        for rec in recommendations
+    ]
+    upsert_recommendations(db, rows)
+    db.execute(
+        update(MLRecommendation)
+        .where(
+            MLRecommendation.user_id == user_id,
+            MLRecommendation.recommendation_type == recommendation_type,
+            MLRecommendation.expires_at > now,
+            MLRecommendation.fingerprint.not_in([row["fingerprint"] for row in rows])
+        )
+        .values(expires_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+def expire_replaced(db: Session, recommendation_type: str, rows: list):
+    """
+    store_recommendations' expiry step for many users at once, after
+    `rows` (their new sets) were upserted: any other unexpired row of
+    theirs was replaced. One UPDATE per distinct set of fingerprints.
+    """
+    fingerprints = {}
+    for row in rows:
+        fingerprints.setdefault(row["user_id"], set()).add(row["fingerprint"])
+    users_by_set = {}
+    for user_id, kept in fingerprints.items():
+        users_by_set.setdefault(frozenset(kept), []).append(user_id)
+    now = datetime.utcnow()
+    for kept, user_ids in users_by_set.items():
+        db.execute(
+            update(MLRecommendation)
+            .where(
+                MLRecommendation.user_id.in_(user_ids),
+                MLRecommendation.recommendation_type == recommendation_type,
+                MLRecommendation.expires_at > now,
+                MLRecommendation.fingerprint.not_in(sorted(kept))
+            )
+            .values(expires_at=now)
+            .execution_options(synchronize_session=False)
+        )
+
+def active_recommendations(user_id: int, recommendation_type: str, limit: int = PAGE_SIZE):
+    """Newest unread, unexpired recommendations (uses the partial index on unread rows)"""
+    return select(MLRecommendation).where(
+        MLRecommendation.user_id == user_id,
+        MLRecommendation.recommendation_type == recommendation_type,
+        ~MLRecommendation.is_read,
+        MLRecommendation.expires_at > datetime.utcnow()
+    ).order_by(MLRecommendation.created_at.desc()).limit(limit)
+
+def sweep_expired(db: Session, batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    """
+    Delete expired recommendations, committing every batch_size rows so
+    locks stay short. Returns the number of rows deleted.
+    """
+    deleted = 0
+    while True:
+        expired = select(MLRecommendation.id).where(
+            MLRecommendation.expires_at <= datetime.utcnow()
+        ).limit(batch_size)
+        count = db.execute(
+            delete(MLRecommendation)
+            .where(MLRecommendation.id.in_(expired.scalar_subquery()))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        deleted += count
+        if count < batch_size:
+            return deleted
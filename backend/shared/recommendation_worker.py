@@ -0,0 +1,181 @@
+"""
+Background recommendation worker
+Write endpoints only mark (user, recommendation type) as dirty in the
+recommendation_queue table; this worker recomputes recommendations off
+the request path. Repeated writes from one user collapse into a single
+queue row, so a burst of writes triggers one recomputation. It also
+sweeps expired recommendations every RECOMMENDATION_SWEEP_INTERVAL_SECONDS.
+
+Run it in-process (started by the API on startup, see
+RECOMMENDATION_WORKER) or as its own process:
+
+    python -m shared.recommendation_worker
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from dotenv import load_dotenv
+from shared.database import SessionLocal, upsert_insert
+from shared.models import RecommendationQueue
+from shared.data_version import bump_data_version
+from shared.ml_model import load_model
+from shared.recommendation_store import sweep_expired
+from shared.ml_service import (
+    generate_career_recommendations,
+    generate_health_recommendations,
+    generate_finance_recommendations
+)
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# "inprocess" starts a worker thread inside the API; "external" expects a
+# separately running `python -m shared.recommendation_worker`
+RECOMMENDATION_WORKER = os.getenv("RECOMMENDATION_WORKER", "inprocess")
+POLL_INTERVAL_SECONDS = float(os.getenv("RECOMMENDATION_WORKER_POLL_SECONDS", "1"))
+# Wait for a user's writes to go quiet before recomputing...
+SETTLE_SECONDS = float(os.getenv("RECOMMENDATION_SETTLE_SECONDS", "2"))
+# ...but never delay a recomputation longer than this
+MAX_DELAY_SECONDS = float(os.getenv("RECOMMENDATION_MAX_DELAY_SECONDS", "30"))
+BATCH_SIZE = int(os.getenv("RECOMMENDATION_WORKER_BATCH_SIZE", "100"))
+SWEEP_INTERVAL_SECONDS = float(os.getenv("RECOMMENDATION_SWEEP_INTERVAL_SECONDS", "3600"))
+
+GENERATORS = {
+    "career": generate_career_recommendations,
+    "health": generate_health_recommendations,
+    "finance": generate_finance_recommendations,
+}
+
+def enqueue_recommendations(db: Session, user_id: int, recommendation_type: str):
+    """
+    Mark a user's recommendations of one type as dirty.
+    Runs in the caller's transaction; the caller commits.
+    """
+    now = datetime.utcnow()
+    stmt = upsert_insert(db, RecommendationQueue).values(
+        user_id=user_id,
+        recommendation_type=recommendation_type,
+        first_enqueued_at=now,
+        enqueued_at=now
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "recommendation_type"],
+        set_={"enqueued_at": stmt.excluded.enqueued_at},
+    )
+    db.execute(stmt)
+
+def process_pending(batch_size: int = BATCH_SIZE) -> int:
+    """
+    Recompute recommendations for settled queue rows.
+    Each row is claimed with SKIP LOCKED and deleted in the same
+    transaction as the recommendations it produces, so several workers
+    can run side by side and a crash leaves the row queued.
+    Returns the number of rows processed.
+    """
+    processed = 0
+    db = SessionLocal()
+    try:
+        while processed < batch_size:
+            now = datetime.utcnow()
+            entry = db.query(RecommendationQueue).filter(or_(
+                RecommendationQueue.enqueued_at <= now - timedelta(seconds=SETTLE_SECONDS),
+                RecommendationQueue.first_enqueued_at <= now - timedelta(seconds=MAX_DELAY_SECONDS)
+            )).order_by(
+                RecommendationQueue.first_enqueued_at
+            ).with_for_update(skip_locked=True).first()
+            if entry is None:
+                break
+
+            user_id = entry.user_id
+            recommendation_type = entry.recommendation_type
+            db.delete(entry)
+            try:
+                GENERATORS[recommendation_type](user_id, db)
+                # Recommendation lists may have changed; invalidate ETags
+                bump_data_version(db, user_id)
+                db.commit()
+            except Exception:
+                db.rollback()
+                logger.exception(
+                    "Recommendation refresh failed for user %s (%s)",
+                    user_id, recommendation_type
+                )
+                # Drop the entry so it cannot block the queue; the user's
+                # next write enqueues it again
+                db.query(RecommendationQueue).filter(
+                    RecommendationQueue.user_id == user_id,
+                    RecommendationQueue.recommendation_type == recommendation_type
+                ).delete(synchronize_session=False)
+                db.commit()
+            processed += 1
+    finally:
+        db.close()
+    return processed
+
+def sweep() -> int:
+    """Delete expired recommendations; returns how many"""
+    db = SessionLocal()
+    try:
+        deleted = sweep_expired(db)
+    finally:
+        db.close()
+    if deleted:
+        logger.info("Swept %d expired recommendations", deleted)
+    return deleted
+
+def run_worker(stop_event: threading.Event):
+    """Poll the queue until stop_event is set"""
+    next_sweep = 0.0
+    while not stop_event.is_set():
+        if time.monotonic() >= next_sweep:
+            try:
+                sweep()
+            except Exception:
+                logger.exception("Recommendation sweep failed")
+            next_sweep = time.monotonic() + SWEEP_INTERVAL_SECONDS
+        try:
+            processed = process_pending()
+        except Exception:
+            logger.exception("Recommendation worker iteration failed")
+            processed = 0
+        # Drain quickly while there is a backlog, otherwise poll
+        if processed < BATCH_SIZE:
+            stop_event.wait(POLL_INTERVAL_SECONDS)
+
+_worker_thread = None
+_stop_event = threading.Event()
+
+def start_worker_thread():
+    """Start the in-process worker (no-op unless RECOMMENDATION_WORKER=inprocess)"""
+    global _worker_thread
+    if RECOMMENDATION_WORKER != "inprocess" or _worker_thread is not None:
+        return
+    _stop_event.clear()
+    _worker_thread = threading.Thread(
+        target=run_worker, args=(_stop_event,),
+        name="recommendation-worker", daemon=True
+    )
+    _worker_thread.start()
+
+def stop_worker_thread():
+    """Stop the in-process worker started by start_worker_thread"""
+    global _worker_thread
+    if _worker_thread is None:
+        return
+    _stop_event.set()
+    _worker_thread.join(timeout=POLL_INTERVAL_SECONDS + 5)
+    _worker_thread = None
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    load_model()
+    logger.info("Recommendation worker started")
+    try:
+        run_worker(threading.Event())
+    except KeyboardInterrupt:
+        pass
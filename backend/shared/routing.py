@@ -0,0 +1,26 @@
+"""
+Route helpers shared by the services
+"""
+from fastapi import APIRouter, FastAPI
+from fastapi.routing import APIRoute
+
+def use_async_routes(app: FastAPI, router: APIRouter):
+    """
+    Serve `router`'s endpoints in place of the app's routes with the same
+    path and method (DB_MODE=async). Routes without an async counterpart
+    keep being served by the sync endpoints.
+    """
+    replaced = {
+        (route.path, method)
+        for route in router.routes
+        if isinstance(route, APIRoute)
+        for method in route.methods
+    }
+    app.router.routes = [
+        route for route in app.router.routes
+        if not (
+            isinstance(route, APIRoute)
+            and any((route.path, method) in replaced for method in route.methods)
+        )
+    ]
+    app.include_router(router)
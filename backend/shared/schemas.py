@@ -99,3 +99,21 @@ class MLRecommendationResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+# Bulk Ingest Schemas
+class BulkItemResult(BaseModel):
+    index: int
+    status: str  # created, invalid
+    id: Optional[int] = None
+    errors: Optional[List[dict]] = None
+
+class BulkResult(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkItemResult]
+
+class ImportResult(BaseModel):
+    imported: int
+    duplicates: int
+    failed: int
+    errors: List[dict]  # {"line", "error"}, first IMPORT_MAX_ERRORS only
@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 import os
@@ -11,12 +11,45 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# First scheme hashes new passwords; the others are still accepted and
+# rehashed with the first one on the next successful login
+PASSWORD_HASH_SCHEMES = [
+    scheme.strip()
+    for scheme in os.getenv("PASSWORD_HASH_SCHEMES", "bcrypt").split(",")
+    if scheme.strip()
+]
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "4"))
+
+def _hash_settings() -> dict:
+    settings = {}
+    if "bcrypt" in PASSWORD_HASH_SCHEMES:
+        settings["bcrypt__rounds"] = BCRYPT_ROUNDS
+    if "argon2" in PASSWORD_HASH_SCHEMES:
+        settings["argon2__time_cost"] = ARGON2_TIME_COST
+        settings["argon2__memory_cost"] = ARGON2_MEMORY_COST
+        settings["argon2__parallelism"] = ARGON2_PARALLELISM
+    return settings
+
+pwd_context = CryptContext(
+    schemes=PASSWORD_HASH_SCHEMES, deprecated="auto", **_hash_settings()
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return (valid, new_hash).
+    new_hash is set when the stored hash uses a deprecated scheme or cost.
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
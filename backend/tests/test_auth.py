@@ -0,0 +1,71 @@
+"""Token revisions and the principal cache"""
+from passlib.hash import bcrypt
+from sqlalchemy import event, update
+from sqlalchemy.engine import Engine
+from shared.auth import invalidate_user, update_user
+from shared.database import SessionLocal
+from shared.models import User
+
+def login(client, username: str) -> str:
+    response = client.post(
+        "/auth/token", data={"username": username, "password": "test-password"}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["access_token"]
+
+def revision(db, user_id: int) -> int:
+    db.expire_all()
+    return db.get(User, user_id).revision
+
+def queries(client, user, url: str) -> int:
+    """Statements one authenticated GET runs (on any engine, sync or async)"""
+    statements = []
+    count = lambda *args: statements.append(args[2])
+    event.listen(Engine, "before_cursor_execute", count)
+    try:
+        assert client.get(url, headers=user["headers"]).status_code == 200
+    finally:
+        event.remove(Engine, "before_cursor_execute", count)
+    return len(statements)
+
+def test_warm_cache_saves_the_user_query(client, user):
+    for url in ("/career/goals", "/health/records", "/finance/analytics/summary", "/auth/me"):
+        invalidate_user(user["id"])
+        cold = queries(client, user, url)
+        warm = queries(client, user, url)
+        assert warm == cold - 1, url
+
+def test_rehash_on_login_bumps_revision(client, db, user):
+    # A hash made with a cost other than BCRYPT_ROUNDS is upgraded on login
+    db.execute(update(User).where(User.id == user["id"]).values(
+        hashed_password=bcrypt.using(rounds=5).hash("test-password")
+    ))
+    db.commit()
+    before = revision(db, user["id"])
+
+    token = login(client, user["username"])
+    assert revision(db, user["id"]) == before + 1
+    assert db.get(User, user["id"]).hashed_password.startswith("$2b$04$")
+    me = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+    assert me.status_code == 200, me.text
+
+    login(client, user["username"])
+    assert revision(db, user["id"]) == before + 1
+
+def test_concurrent_updates_do_not_conflict(db, user):
+    first, second = SessionLocal(), SessionLocal()
+    try:
+        # Both sessions hold the user at the same revision
+        first.get(User, user["id"])
+        second.get(User, user["id"])
+        before = revision(db, user["id"])
+
+        first.execute(update_user(user["id"], full_name="First"))
+        first.commit()
+        second.execute(update_user(user["id"], full_name="Second"))
+        second.commit()
+    finally:
+        first.close()
+        second.close()
+    assert revision(db, user["id"]) == before + 2
+    assert db.get(User, user["id"]).full_name == "Second"
@@ -0,0 +1,62 @@
+"""Bulk ingest: invalid items are reported without rejecting the batch"""
+from sqlalchemy import select
+from shared import bulk
+from shared.models import FinancialTransaction, HealthRecord
+
+def test_partial_results(client, db, user):
+    response = client.post("/health/records/bulk", headers=user["headers"], json=[
+        {"record_type": "weight", "value": 70.5, "unit": "kg"},
+        {"value": 3},
+        "not an object",
+        {"record_type": "mood", "value": 8},
+    ])
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 2)
+    assert [item["index"] for item in body["results"]] == [0, 1, 2, 3]
+    assert [item["status"] for item in body["results"]] == [
+        "created", "invalid", "invalid", "created"
+    ]
+    assert body["results"][1]["errors"][0]["loc"] == ["record_type"]
+    assert body["results"][2]["errors"]
+
+    # Ids map back to their items
+    ids = [item["id"] for item in body["results"]]
+    assert ids[1] is None and ids[2] is None
+    types = dict(db.execute(
+        select(HealthRecord.id, HealthRecord.record_type).where(HealthRecord.id.in_(ids[::3]))
+    ).all())
+    assert (types[ids[0]], types[ids[3]]) == ("weight", "mood")
+
+def test_all_invalid_writes_nothing(client, db, user):
+    response = client.post("/finance/transactions/bulk", headers=user["headers"], json=[
+        {"transaction_type": "expense", "category": "food", "amount": "lots"},
+    ])
+    assert response.status_code == 200
+    assert (response.json()["created"], response.json()["failed"]) == (0, 1)
+    assert db.scalars(
+        select(FinancialTransaction).where(FinancialTransaction.user_id == user["id"])
+    ).all() == []
+
+def test_transactions_bulk(client, db, user):
+    items = [
+        {"transaction_type": "expense", "category": "food", "amount": float(i + 1)}
+        for i in range(5)
+    ]
+    response = client.post("/finance/transactions/bulk", headers=user["headers"], json=items)
+    body = response.json()
+    assert body["created"] == 5
+    amounts = {
+        transaction.id: transaction.amount
+        for transaction in db.scalars(
+            select(FinancialTransaction).where(FinancialTransaction.user_id == user["id"])
+        )
+    }
+    assert [amounts[item["id"]] for item in body["results"]] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+def test_too_many_items(client, user, monkeypatch):
+    monkeypatch.setattr(bulk, "BULK_MAX_ITEMS", 2)
+    response = client.post("/health/records/bulk", headers=user["headers"], json=[
+        {"record_type": "mood", "value": 1} for _ in range(3)
+    ])
+    assert response.status_code == 413
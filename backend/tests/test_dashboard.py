@@ -0,0 +1,31 @@
+"""/dashboard sections and their connection fan-out"""
+import threading
+import time
+from shared import dashboard
+
+def test_all_sections(client, user):
+    response = client.get("/dashboard", headers=user["headers"])
+    assert response.status_code == 200
+    assert set(response.json()) == set(dashboard.SECTIONS)
+    assert client.get(
+        "/dashboard?fields=goals,nope", headers=user["headers"]
+    ).status_code == 400
+
+def test_sections_share_few_connections(client, user, monkeypatch):
+    running, peak = 0, 0
+    lock = threading.Lock()
+
+    def load_section(name, user_id, days):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return name
+
+    monkeypatch.setattr(dashboard, "load_section", load_section)
+    response = client.get("/dashboard", headers=user["headers"])
+    assert response.json() == {name: name for name in dashboard.SECTIONS}
+    assert peak == dashboard.DASHBOARD_MAX_CONNECTIONS
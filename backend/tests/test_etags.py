@@ -0,0 +1,71 @@
+"""ETags and 304s from the per-user data_version"""
+from shared import data_version
+from shared.cache import LRUTTLCache
+
+SUMMARY = "/health/analytics/summary"
+
+def get(client, user, url: str = SUMMARY, etag: str = None):
+    headers = dict(user["headers"])
+    if etag:
+        headers["If-None-Match"] = etag
+    return client.get(url, headers=headers)
+
+def add_record(client, user, value: float = 7):
+    response = client.post("/health/records", headers=user["headers"], json={
+        "record_type": "mood", "value": value
+    })
+    assert response.status_code in (200, 201), response.text
+
+def test_not_modified_until_a_write(client, user):
+    first = get(client, user)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    again = get(client, user, etag=etag)
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["ETag"] == etag
+    assert get(client, user, etag=f'"other", {etag}').status_code == 304
+    assert get(client, user, etag="*").status_code == 304
+
+    add_record(client, user)
+    changed = get(client, user, etag=etag)
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert changed.json() != first.json()
+    assert get(client, user, etag=changed.headers["ETag"]).status_code == 304
+
+def test_etag_depends_on_query_and_user(client, user):
+    etag = get(client, user).headers["ETag"]
+    assert get(client, user, f"{SUMMARY}?days=7", etag=etag).status_code == 200
+    assert get(client, user, "/finance/analytics/summary", etag=etag).status_code == 200
+
+    other = client.post("/auth/register", json={
+        "email": f"{user['username']}-2@example.com", "username": f"{user['username']}-2",
+        "password": "test-password"
+    })
+    assert other.status_code == 201
+    token = client.post("/auth/token", data={
+        "username": f"{user['username']}-2", "password": "test-password"
+    }).json()["access_token"]
+    other_user = {"headers": {"Authorization": f"Bearer {token}"}}
+    assert get(client, other_user, etag=etag).status_code == 200
+
+def test_body_cache_skips_the_build(client, user, monkeypatch):
+    monkeypatch.setattr(data_version, "_body_cache", LRUTTLCache(10, 60))
+    calls = []
+    render = data_version._render
+    # Runs once per build()
+    monkeypatch.setattr(data_version, "_render", lambda *args: calls.append(1) or render(*args))
+
+    first = get(client, user)
+    second = get(client, user)
+    assert second.status_code == 200
+    assert second.content == first.content
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert len(calls) == 1
+
+    add_record(client, user)
+    get(client, user)
+    assert len(calls) == 2
@@ -0,0 +1,101 @@
+"""CSV statement import: amounts, duplicates and unreadable files"""
+import io
+import pytest
+from sqlalchemy import func, select
+from shared import finance_import
+from shared.finance_import import parse_amount
+from shared.models import FinancialTransaction
+
+COFFEE = "2026-03-02T08:00:00,-3.20,Coffee"
+LUNCH = "2026-03-02T12:30:00,-11.00,Lunch"
+
+def upload(client, user, lines, header: str = "date,amount,description", **form):
+    body = "\n".join([header] + list(lines)) + "\n"
+    return client.post(
+        "/finance/transactions/import", headers=user["headers"], data=form,
+        files={"file": ("statement.csv", io.BytesIO(body.encode()), "text/csv")},
+    )
+
+def imported(client, user, lines, **form) -> dict:
+    response = upload(client, user, lines, **form)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def stored(db, user_id: int) -> int:
+    return db.scalar(
+        select(func.count()).where(FinancialTransaction.user_id == user_id)
+    )
+
+def test_parse_amount():
+    assert parse_amount("-1,234.50") == -1234.5
+    assert parse_amount(" 12 ") == 12.0
+    assert parse_amount("-1.234,50", ",") == -1234.5
+    assert parse_amount("12,50", ",") == 12.5
+    for raw, separator in (("12,50", "."), ("1.234.5", "."), ("", "."), ("12.5.0", ","),
+                           ("1,23", "."), ("abc", ".")):
+        with pytest.raises(ValueError):
+            parse_amount(raw, separator)
+
+def test_repeats_in_a_statement_are_kept(client, db, user):
+    result = imported(client, user, [COFFEE, COFFEE, LUNCH])
+    assert (result["imported"], result["duplicates"]) == (3, 0)
+
+    # The same statement again, and one with a third coffee
+    result = imported(client, user, [COFFEE, COFFEE, LUNCH])
+    assert (result["imported"], result["duplicates"]) == (0, 3)
+    result = imported(client, user, [COFFEE, LUNCH, COFFEE, COFFEE])
+    assert (result["imported"], result["duplicates"]) == (1, 3)
+    assert stored(db, user["id"]) == 4
+
+def test_duplicates_across_chunks(client, db, user, monkeypatch):
+    monkeypatch.setattr(finance_import, "IMPORT_CHUNK_SIZE", 1)
+    assert imported(client, user, [COFFEE, LUNCH])["imported"] == 2
+    result = imported(client, user, [COFFEE, COFFEE, LUNCH, COFFEE])
+    assert (result["imported"], result["duplicates"]) == (2, 2)
+    assert stored(db, user["id"]) == 4
+
+def test_descriptions_are_normalized(client, user):
+    imported(client, user, [COFFEE])
+    result = imported(client, user, ["2026-03-02T17:00:00,-3.2,  COFFEE "])
+    assert (result["imported"], result["duplicates"]) == (0, 1)
+
+def test_decimal_comma(client, db, user):
+    result = imported(
+        client, user, ['2026-03-02;-1.234,50;Rent', "2026-03-03;12,5;Refund"],
+        header="date;amount;description", delimiter=";", decimal_separator=","
+    )
+    assert result["imported"] == 2
+    amounts = db.execute(select(
+        FinancialTransaction.transaction_type, FinancialTransaction.amount
+    ).where(FinancialTransaction.user_id == user["id"]).order_by(
+        FinancialTransaction.transaction_date
+    )).all()
+    assert [tuple(row) for row in amounts] == [("expense", 1234.5), ("income", 12.5)]
+
+    # Without it, "12,5" is an error rather than 125
+    result = imported(client, user, ['2026-03-04,"12,5",Refund'])
+    assert (result["imported"], result["failed"]) == (0, 1)
+    assert upload(client, user, [COFFEE], decimal_separator="'").status_code == 422
+
+def test_row_errors(client, user):
+    result = imported(client, user, [
+        "2026-03-02,12.00,Salary,income",
+        "2026-03-02,12.00,Gift,donation",
+        "not a date,1.00,Thing,expense",
+        "2026-03-02,5.00,Broker,Investment",
+    ], header="date,amount,description,type", type_column="type")
+    assert (result["imported"], result["failed"]) == (2, 2)
+    assert [error["line"] for error in result["errors"]] == [3, 4]
+    assert "donation" in result["errors"][0]["error"]
+
+def test_unreadable_files(client, user):
+    assert upload(client, user, [COFFEE], amount_column="value").status_code == 400
+    response = client.post(
+        "/finance/transactions/import", headers=user["headers"],
+        files={"file": ("statement.csv", io.BytesIO(b"date,amount\n\xff\xfe,1\n"), "text/csv")},
+    )
+    assert response.status_code == 400
+    # Larger than csv.field_size_limit()
+    response = upload(client, user, [f'2026-03-02,1.00,"{"x" * 200_000}"'])
+    assert response.status_code == 400
+    assert "Unreadable CSV" in response.json()["detail"]
@@ -0,0 +1,72 @@
+"""Daily rollups stay equal to the raw transaction sums they summarize"""
+import io
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import select
+from shared.finance_rollups import rollup_day
+from shared.models import FinancialTransaction
+
+def statement(days_ago_amounts) -> bytes:
+    today = datetime.now(timezone.utc).date()
+    lines = ["date,amount,description"] + [
+        f"{(today - timedelta(days=days_ago)).isoformat()}T12:00:00,{amount},Line {i}"
+        for i, (days_ago, amount) in enumerate(days_ago_amounts)
+    ]
+    return ("\n".join(lines) + "\n").encode()
+
+def raw_summary(db, user_id: int, days: int) -> dict:
+    """The summary computed from financial_transactions directly"""
+    start_day = datetime.now(timezone.utc).date() - timedelta(days=days - 1)
+    totals, categories = defaultdict(float), defaultdict(float)
+    for transaction in db.scalars(
+        select(FinancialTransaction).where(FinancialTransaction.user_id == user_id)
+    ):
+        if rollup_day(transaction.transaction_date) < start_day:
+            continue
+        totals[transaction.transaction_type] += transaction.amount
+        if transaction.transaction_type == "expense":
+            categories[transaction.category] += transaction.amount
+    return {"totals": dict(totals), "categories": dict(categories)}
+
+def test_summary_matches_raw_sums(client, db, user):
+    headers = user["headers"]
+    client.post("/finance/transactions", headers=headers, json={
+        "transaction_type": "income", "category": "salary", "amount": 2500.0
+    })
+    client.post("/finance/transactions/bulk", headers=headers, json=[
+        {"transaction_type": "expense", "category": "food", "amount": 12.25},
+        {"transaction_type": "expense", "category": "rent", "amount": 900.0},
+        {"transaction_type": "investment", "category": "stocks", "amount": 300.0},
+        {"transaction_type": "expense", "category": "food", "amount": -1},
+    ])
+    # Today, the window's first day, and the day before it
+    client.post(
+        "/finance/transactions/import", headers=headers,
+        files={"file": ("s.csv", io.BytesIO(statement([(0, -4.5), (6, -20), (7, -1000)])),
+                        "text/csv")},
+    )
+
+    for days in (1, 7, 30):
+        summary = client.get(
+            f"/finance/analytics/summary?days={days}", headers=headers
+        ).json()
+        raw = raw_summary(db, user["id"], days)
+        assert summary["total_income"] == raw["totals"].get("income", 0)
+        assert summary["total_expenses"] == raw["totals"].get("expense", 0)
+        assert summary["total_investments"] == raw["totals"].get("investment", 0)
+        assert summary["category_breakdown"] == raw["categories"]
+        assert summary["period_days"] == days
+
+def test_window_covers_exactly_days(client, user):
+    headers = user["headers"]
+    client.post(
+        "/finance/transactions/import", headers=headers,
+        files={"file": ("s.csv", io.BytesIO(statement([(0, -1), (6, -10), (7, -100)])),
+                        "text/csv")},
+    )
+    expenses = lambda days: client.get(
+        f"/finance/analytics/summary?days={days}", headers=headers
+    ).json()["total_expenses"]
+    assert expenses(1) == 1
+    assert expenses(7) == 11
+    assert expenses(8) == 111
@@ -0,0 +1,114 @@
+"""/health/records/series buckets and LTTB downsampling"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import insert
+from shared.health_series import PREAGGREGATE_FACTOR, get_health_series, lttb
+from shared.health_stats import window_start
+from shared.models import HealthRecord
+
+def add_records(db, user_id: int, values, record_type: str = "heart_rate"):
+    """values: (recorded_at, value) pairs"""
+    db.execute(insert(HealthRecord), [
+        {"user_id": user_id, "record_type": record_type, "value": value, "unit": "bpm",
+         "recorded_at": recorded_at}
+        for recorded_at, value in values
+    ])
+    db.commit()
+
+def series(client, user, **params) -> dict:
+    response = client.get(
+        "/health/records/series", params={"record_type": "heart_rate", **params},
+        headers=user["headers"]
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_lttb_keeps_ends_and_spikes():
+    points = [(x, 10.0) for x in range(1000)]
+    points[437] = (437, 99.0)
+    sampled = lttb(points, 20)
+    assert len(sampled) == 20
+    assert sampled[0] == points[0] and sampled[-1] == points[-1]
+    assert (437, 99.0) in sampled
+    assert [x for x, _ in sampled] == sorted(x for x, _ in sampled)
+    assert lttb(points[:5], 20) == points[:5]
+
+@pytest.fixture
+def monday():
+    """00:00 UTC on the Monday of last week"""
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return today - timedelta(days=today.weekday() + 7)
+
+def test_bucket_boundaries(client, db, user, monday):
+    add_records(db, user["id"], [
+        (monday - timedelta(seconds=1), 2.0),
+        (monday, 1.0),
+        (monday + timedelta(minutes=59, seconds=59), 3.0),
+        (monday + timedelta(hours=1), 4.0),
+    ])
+    start = lambda point: point["start"][:19]
+    monday_text = monday.strftime("%Y-%m-%dT%H:%M:%S")
+
+    weeks = series(client, user, bucket="week")["points"]
+    assert [(start(p), p["count"]) for p in weeks] == [
+        ((monday - timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%S"), 1), (monday_text, 3)
+    ]
+    days = series(client, user, bucket="day")["points"]
+    assert [(p["min"], p["max"], p["count"]) for p in days] == [(2.0, 2.0, 1), (1.0, 4.0, 3)]
+    assert start(days[1]) == monday_text
+    hours = series(client, user, bucket="hour")["points"]
+    assert [(p["min"], p["mean"], p["max"]) for p in hours[-2:]] == [(1.0, 2.0, 3.0), (4.0, 4.0, 4.0)]
+
+def test_default_bucket_and_validation(client, user):
+    assert series(client, user)["bucket"] == "day"
+    for params in ({"bucket": "month"}, {"points": 2}, {"days": 0}):
+        assert client.get(
+            "/health/records/series", params={"record_type": "heart_rate", **params},
+            headers=user["headers"]
+        ).status_code == 422
+
+def test_dense_data_is_bounded(client, db, user):
+    now = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+    values = [(now - timedelta(minutes=i), 60.0 + i % 7) for i in range(3000)]
+    values[1234] = (values[1234][0], 250.0)
+    add_records(db, user["id"], values)
+    assert 3000 > PREAGGREGATE_FACTOR * 50
+
+    points = series(client, user, days=3, points=50)["points"]
+    assert 3 <= len(points) <= 50
+    assert max(point["value"] for point in points) == 250.0
+    assert min(point["value"] for point in points) == 60.0
+    times = [point["recorded_at"] for point in points]
+    assert times == sorted(times)
+
+def test_sparse_data_keeps_raw_points(client, db, user):
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    add_records(db, user["id"], [(now - timedelta(hours=i), float(i)) for i in range(10)])
+    points = series(client, user, points=50)["points"]
+    assert sorted(point["value"] for point in points) == [float(i) for i in range(10)]
+
+def test_series_is_not_a_record_id(client, user):
+    assert client.get(
+        "/health/records/series?record_type=x", headers=user["headers"]
+    ).status_code == 200
+
+def test_window_is_whole_utc_days(client, db, user):
+    start = window_start(2)
+    add_records(db, user["id"], [(start - timedelta(seconds=1), 5.0), (start, 6.0)])
+    raw = series(client, user, days=2, points=50)["points"]
+    assert [point["value"] for point in raw] == [6.0]
+    days = series(client, user, days=2, bucket="day")["points"]
+    assert [point["count"] for point in days] == [1]
+
+def test_slices_do_not_move_during_the_day(db, user):
+    start = window_start(1).replace(tzinfo=timezone.utc)
+    add_records(db, user["id"], [(start + timedelta(minutes=i), float(i)) for i in range(40)])
+    slices = PREAGGREGATE_FACTOR * 3
+    width = timedelta(days=1) / slices
+    points = get_health_series(db, user["id"], "heart_rate", 1, points=3)["points"]
+    assert points
+    for point in points:
+        # Midpoints of slices of [start of today, end of today)
+        offset = (point["recorded_at"] - start) / width - 0.5
+        assert abs(offset - round(offset)) < 1e-6
+        assert 0 <= offset < slices
@@ -0,0 +1,31 @@
+"""/health/analytics/summary windows are whole UTC days"""
+from datetime import timedelta
+from sqlalchemy import insert
+from shared.health_stats import window_start
+from shared.models import HealthRecord
+
+def test_window_starts_at_utc_midnight(client, db, user):
+    start = window_start(7)
+    assert (start.hour, start.minute, start.second) == (0, 0, 0)
+    db.execute(insert(HealthRecord), [
+        {"user_id": user["id"], "record_type": "mood", "value": value, "recorded_at": recorded_at}
+        for recorded_at, value in (
+            (start, 1.0),
+            (start - timedelta(seconds=1), 100.0),
+        )
+    ])
+    db.commit()
+
+    response = client.get("/health/analytics/summary?days=7", headers=user["headers"])
+    assert response.status_code == 200
+    assert (response.json()["mood"]["count"], response.json()["mood"]["max"]) == (1, 1.0)
+    # The day before is in an 8-day window
+    eight = client.get("/health/analytics/summary?days=8", headers=user["headers"]).json()
+    assert eight["mood"]["count"] == 2
+
+    # Nothing leaves the window while the UTC date stays the same, so the
+    # daily ETag still matches
+    again = client.get("/health/analytics/summary?days=7", headers={
+        **user["headers"], "If-None-Match": response.headers["ETag"]
+    })
+    assert again.status_code == 304
@@ -0,0 +1,75 @@
+"""Keyset pagination of /health/records and /finance/transactions"""
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import insert
+from shared.models import FinancialTransaction, HealthRecord
+
+def all_pages(client, url: str, headers: dict) -> tuple:
+    """(items, pages) following X-Next-Cursor to the end"""
+    items, pages, cursor = [], 0, None
+    while True:
+        params = {"cursor": cursor} if cursor else {}
+        response = client.get(url, params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        items += response.json()
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return items, pages
+
+@pytest.fixture
+def records(db, user):
+    """23 records, several sharing a timestamp, plus one outside 30 days"""
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"user_id": user["id"], "record_type": "weight" if i % 2 else "mood",
+         "value": float(i), "recorded_at": now - timedelta(hours=i // 3)}
+        for i in range(23)
+    ]
+    rows.append({"user_id": user["id"], "record_type": "weight", "value": 0.0,
+                 "recorded_at": now - timedelta(days=40)})
+    db.execute(insert(HealthRecord), rows)
+    db.commit()
+    return rows
+
+def test_cursor_round_trip(client, user, records):
+    items, pages = all_pages(client, "/health/records?limit=5", user["headers"])
+    assert pages == 5
+    ids = [item["id"] for item in items]
+    assert len(ids) == len(set(ids)) == 23
+    keys = [(item["recorded_at"], item["id"]) for item in items]
+    assert keys == sorted(keys, reverse=True)
+
+def test_cursor_keeps_filters(client, user, records):
+    first = client.get(
+        "/health/records", params={"limit": 4, "record_type": "weight"}, headers=user["headers"]
+    )
+    cursor = first.headers["X-Next-Cursor"]
+    items, _ = all_pages(client, f"/health/records?limit=4&cursor={cursor}", user["headers"])
+    assert {item["record_type"] for item in first.json() + items} == {"weight"}
+    assert len(first.json() + items) == 11
+
+    mismatch = client.get(
+        "/health/records", params={"cursor": cursor, "record_type": "mood"},
+        headers=user["headers"]
+    )
+    assert mismatch.status_code == 400
+
+def test_invalid_cursor_and_window(client, user):
+    assert client.get(
+        "/health/records?cursor=not-a-cursor", headers=user["headers"]
+    ).status_code == 400
+    assert client.get("/health/records?days=0", headers=user["headers"]).status_code == 422
+    assert client.get("/finance/transactions?days=0", headers=user["headers"]).status_code == 422
+
+def test_transactions_pages(client, db, user):
+    now = datetime.now(timezone.utc)
+    db.execute(insert(FinancialTransaction), [
+        {"user_id": user["id"], "transaction_type": "expense", "category": "food",
+         "amount": float(i + 1), "transaction_date": now - timedelta(minutes=i % 4)}
+        for i in range(12)
+    ])
+    db.commit()
+    items, pages = all_pages(client, "/finance/transactions?limit=5", user["headers"])
+    assert pages == 3
+    assert sorted(item["amount"] for item in items) == [float(i + 1) for i in range(12)]
@@ -0,0 +1,144 @@
+"""
+The per-user time-window queries must be served by the composite indexes
+(alembic revision 0001 and later), not by sequential scans. Plans are
+taken from the statements the endpoints' own code runs.
+"""
+import re
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event, select, text
+from shared.auth import UserPrincipal
+from shared.finance_rollups import get_rollup_summary
+from shared.health_stats import get_health_stats
+from shared.models import User
+from shared.recommendation_store import active_recommendations
+
+@pytest.fixture(scope="module")
+def seeded(database):
+    """A generated user with 60 days of data, plus fresh statistics"""
+    from benchmarks import datagen
+    datagen.generate(40, days=60, seed=1)
+    with database.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    with database.connect() as conn:
+        user = conn.execute(
+            select(User).where(User.username == datagen.username(7))
+        ).one()
+    return UserPrincipal(id=user.id, username=user.username, is_active=True,
+                         revision=user.revision)
+
+@contextmanager
+def captured(engine, table: str):
+    """Collects (statement, parameters) of every query that reads `table`"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if re.search(rf"\bFROM {table}\b", statement):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+def explain(engine, statement: str, parameters) -> str:
+    """The query plan as text"""
+    with engine.begin() as conn:
+        if engine.dialect.name == "postgresql":
+            # Only a missing index leaves a sequential scan as the sole plan
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+            rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).all()
+            return "\n".join(row[0] for row in rows)
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+        return "\n".join(row[-1] for row in rows)
+
+def index_name(table: str, columns: str) -> str:
+    """
+    Pattern for the index on `columns`: ix_<table>_<columns>, or
+    <partition>_<columns>_idx on a PostgreSQL partition
+    """
+    return rf"\b(ix_{table}_{columns}|{table}_\w+_{columns}_idx)\b"
+
+def assert_uses_index(engine, statements: list, table: str, *indexes: str):
+    """
+    Every captured statement avoids a full scan of `table` and uses one of
+    `indexes` (patterns from index_name)
+    """
+    assert statements, f"no query read {table}"
+    for statement, parameters in statements:
+        plan = explain(engine, statement, parameters)
+        if engine.dialect.name == "postgresql":
+            assert "Seq Scan" not in plan, plan
+        else:
+            assert not re.search(rf"\bSCAN {table}\b(?! USING)", plan), plan
+        assert any(re.search(index, plan) for index in indexes), plan
+
+def test_health_records_pages(database, db, seeded):
+    from health_service.main import get_health_records
+    table = "health_records"
+    with captured(database, table) as statements:
+        first = get_health_records(record_type=None, days=30, cursor=None, limit=5,
+                                   current_user=seeded, db=db)
+        # A later page adds the keyset condition
+        get_health_records(record_type=None, days=30, limit=5,
+                           cursor=first.headers["X-Next-Cursor"], current_user=seeded, db=db)
+    assert len(statements) == 2
+    assert_uses_index(database, statements, table,
+                      index_name(table, "user_id_recorded_at"))
+
+def test_health_records_by_type(database, db, seeded):
+    from health_service.main import get_health_records
+    table = "health_records"
+    with captured(database, table) as statements:
+        get_health_records(record_type="exercise", days=30, cursor=None, limit=5,
+                           current_user=seeded, db=db)
+    assert_uses_index(database, statements, table,
+                      index_name(table, "user_id_record_type_recorded_at"))
+
+def test_health_summary(database, db, seeded):
+    table = "health_records"
+    with captured(database, table) as statements:
+        get_health_stats(db, seeded.id, 30)
+        get_health_stats(db, seeded.id, 30, "exercise")
+    # Either composite index serves a per-user window grouped by type
+    assert_uses_index(database, statements, table,
+                      index_name(table, "user_id_recorded_at"),
+                      index_name(table, "user_id_record_type_recorded_at"))
+
+def test_transactions_pages(database, db, seeded):
+    from finance_service.main import get_transactions
+    table = "financial_transactions"
+    with captured(database, table) as statements:
+        first = get_transactions(transaction_type=None, category=None, days=30, cursor=None,
+                                 limit=5, current_user=seeded, db=db)
+        get_transactions(transaction_type=None, category=None, days=30, limit=5,
+                         cursor=first.headers["X-Next-Cursor"], current_user=seeded, db=db)
+    assert len(statements) == 2
+    assert_uses_index(database, statements, table,
+                      index_name(table, "user_id_transaction_date"))
+
+def test_finance_summary(database, db, seeded):
+    table = "financial_daily_rollups"
+    with captured(database, table) as statements:
+        get_rollup_summary(db, seeded.id, 30)
+    # The unique constraint's index; SQLite names it itself
+    if database.dialect.name == "postgresql":
+        index = r"\buq_financial_daily_rollups_user_day_type_category\b"
+    else:
+        index = r"\bsqlite_autoindex_financial_daily_rollups_\d+\b"
+    assert_uses_index(database, statements, table, index)
+
+def test_goals(database, db, seeded):
+    from career_service.main import get_career_goals
+    table = "career_goals"
+    with captured(database, table) as statements:
+        get_career_goals(current_user=seeded, db=db)
+    assert_uses_index(database, statements, table,
+                      index_name(table, "user_id_status"))
+
+def test_active_recommendations(database, db, seeded):
+    table = "ml_recommendations"
+    with captured(database, table) as statements:
+        db.scalars(active_recommendations(seeded.id, "health")).all()
+    assert_uses_index(database, statements, table, r"\bix_ml_recommendations_unread\b")
@@ -0,0 +1,52 @@
+"""Rate limiting and load shedding"""
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from shared import rate_limit
+from shared.rate_limit import (
+    LoadSheddingMiddleware, RateLimitMiddleware, RateLimitStore, is_liveness_path, parse_rules
+)
+
+def test_liveness_paths():
+    for path in ("/health", "/auth/health", "/health/health", "/finance/health"):
+        assert is_liveness_path(path), path
+    for path in ("/career/goals/health", "/health/records/health", "/healthz", "/x/health"):
+        assert not is_liveness_path(path), path
+
+def test_store_must_implement_take():
+    class Incomplete(RateLimitStore):
+        pass
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def app_with(middleware, **options) -> TestClient:
+    async def ok(request):
+        return PlainTextResponse("ok")
+    app = Starlette(routes=[Route("/{path:path}", ok, methods=["GET", "POST"])])
+    return TestClient(middleware(app, **options))
+
+def test_rate_limit_skips_probes_only(monkeypatch):
+    monkeypatch.setattr(rate_limit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit, "_store", rate_limit.MemoryStore())
+    client = app_with(RateLimitMiddleware, rules=parse_rules("* /=1/60"))
+    assert [client.get("/auth/health").status_code for _ in range(3)] == [200] * 3
+    responses = [client.get("/records/health") for _ in range(2)]
+    assert [response.status_code for response in responses] == [200, 429]
+
+def test_shedding_retry_after(monkeypatch):
+    monkeypatch.setattr(rate_limit, "SHED_HASH_QUEUE_DEPTH", 1)
+    monkeypatch.setattr(rate_limit, "queue_depth", lambda: 1)
+    monkeypatch.setattr(rate_limit, "HASH_RETRY_AFTER_SECONDS", 7)
+    monkeypatch.setattr(rate_limit, "SHED_DB_POOL_WAITING", 0)
+    client = app_with(LoadSheddingMiddleware)
+    response = client.post("/auth/token")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "7"
+    assert client.post("/health").status_code == 200
+    assert client.post("/goals").status_code == 200
+
+    assert rate_limit.overload_reason("POST", "/auth/register") == (
+        "Authentication is busy, please retry shortly", 7
+    )
@@ -0,0 +1,63 @@
+"""Read-your-writes across processes: replicas behind the primary are skipped"""
+import os
+import tempfile
+import pytest
+from shared import replicas
+from shared.models import User
+
+@pytest.fixture
+def replica(monkeypatch):
+    """A stand-in replica (its own SQLite file) as the only one configured"""
+    path = os.path.join(tempfile.mkdtemp(prefix="thrivementor-replica-"), "replica.db")
+    replica = replicas.Replica("replica_test", f"sqlite:///{path}")
+    User.__table__.create(replica.engine)
+    monkeypatch.setattr(replicas, "replicas", [replica])
+    yield replica
+    replica.engine.dispose()
+
+def replicate_user(replica, db, user_id: int, data_version: int):
+    """Copy the user's row to the replica at the given data_version"""
+    row = db.get(User, user_id)
+    with replica.engine.begin() as conn:
+        conn.execute(User.__table__.delete().where(User.id == user_id))
+        conn.execute(User.__table__.insert().values(
+            id=row.id, email=row.email, username=row.username,
+            hashed_password=row.hashed_password, data_version=data_version
+        ))
+
+def bound_to(session):
+    try:
+        return session.get_bind()
+    finally:
+        session.close()
+
+def test_lagging_replica_is_skipped(client, db, replica, user):
+    response = client.post("/health/records", headers=user["headers"], json={
+        "record_type": "mood", "value": 7
+    })
+    assert response.status_code in (200, 201), response.text
+    # As if another process had served the write
+    replicas._recent_writers.delete(user["id"])
+    written = db.get(User, user["id"]).data_version
+    assert written >= 1
+
+    replicate_user(replica, db, user["id"], written - 1)
+    assert bound_to(replicas.read_session(user["id"])) is replicas.engine
+
+    replicate_user(replica, db, user["id"], written)
+    assert bound_to(replicas.read_session(user["id"])) is replica.engine
+    assert bound_to(replicas.read_session(None)) is replica.engine
+
+def test_recent_writer_skips_the_comparison(db, replica, user):
+    replicate_user(replica, db, user["id"], 10 ** 6)
+    replicas.record_write(user["id"])
+    try:
+        assert bound_to(replicas.read_session(user["id"])) is replicas.engine
+    finally:
+        replicas._recent_writers.delete(user["id"])
+
+def test_broken_replica_falls_back(replica, user):
+    User.__table__.drop(replica.engine)
+    # Without a users table the comparison fails like a broken replica would
+    assert bound_to(replicas.read_session(user["id"])) is replicas.engine
+    assert not replica.healthy
@@ -0,0 +1,113 @@
+"""
+Train the recommendation model
+Fits one classifier per recommendation type on past recommendations
+(was it read?) and the current features of the user who got it, then
+writes a versioned artifact that the API loads at startup:
+
+    python train_recommender.py
+"""
+import argparse
+import os
+from datetime import datetime
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from sqlalchemy import func, select
+from shared.database import SessionLocal
+from shared.models import MLRecommendation
+from shared.ml_features import FEATURES, feature_matrix, range_features
+from shared.ml_model import MODEL_DIR, LATEST_FILE, candidate_matrix
+
+# Fewer labelled recommendations than this and the type keeps fixed scores
+MIN_SAMPLES = 50
+
+def training_set(db, recommendation_type: str):
+    """(X, y, candidates) for one type, or None without enough labels"""
+    labels = pd.DataFrame(db.execute(
+        select(MLRecommendation.user_id, MLRecommendation.title, MLRecommendation.is_read)
+        .where(MLRecommendation.recommendation_type == recommendation_type)
+    ).all(), columns=["user_id", "title", "is_read"])
+    y = labels["is_read"].fillna(False).astype(int).to_numpy()
+    if len(labels) < MIN_SAMPLES or len(np.unique(y)) < 2:
+        return None
+
+    low, high = int(labels["user_id"].min()), int(labels["user_id"].max()) + 1
+    features = range_features(db, recommendation_type, low, high)
+    candidates = sorted(labels["title"].unique())
+    X = candidate_matrix(
+        feature_matrix(recommendation_type, features, labels["user_id"]),
+        candidates,
+        list(labels["title"])
+    )
+    return X, y, candidates
+
+def train(db, recommendation_type: str):
+    """Fitted model entry for the artifact, or None"""
+    data = training_set(db, recommendation_type)
+    if data is None:
+        print(f"  {recommendation_type}: not enough labelled recommendations, skipped")
+        return None
+    X, y, candidates = data
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=0, stratify=y
+    )
+    pipeline = make_pipeline(
+        StandardScaler(), LogisticRegression(max_iter=1000)
+    )
+    pipeline.fit(X_train, y_train)
+    auc = roc_auc_score(y_test, pipeline.predict_proba(X_test)[:, 1])
+    print(f"  {recommendation_type}: {len(y)} samples, holdout ROC AUC {auc:.3f}")
+    # Final model on everything
+    pipeline.fit(X, y)
+    return {
+        "pipeline": pipeline,
+        "features": FEATURES[recommendation_type],
+        "candidates": candidates,
+        "samples": int(len(y)),
+        "holdout_auc": float(auc),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output-dir", default=MODEL_DIR, help="artifact directory")
+    args = parser.parse_args()
+
+    print("Training recommendation model...")
+    db = SessionLocal()
+    try:
+        models = {}
+        for recommendation_type in FEATURES:
+            entry = train(db, recommendation_type)
+            if entry is not None:
+                models[recommendation_type] = entry
+        user_count = db.scalar(select(func.count(func.distinct(MLRecommendation.user_id))))
+    finally:
+        db.close()
+    if not models:
+        print("Nothing to train; no artifact written")
+        return
+
+    version = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    os.makedirs(args.output_dir, exist_ok=True)
+    filename = f"recommender-{version}.joblib"
+    # Uncompressed so the API can memory-map it
+    joblib.dump({
+        "version": version,
+        "trained_at": datetime.utcnow().isoformat(),
+        "users": user_count,
+        "models": models,
+    }, os.path.join(args.output_dir, filename))
+    # Swap the pointer atomically so a starting API never reads half of it
+    latest = os.path.join(args.output_dir, LATEST_FILE)
+    with open(latest + ".tmp", "w") as f:
+        f.write(filename + "\n")
+    os.replace(latest + ".tmp", latest)
+    print(f"Wrote {filename}")
+
+if __name__ == "__main__":
+    main()
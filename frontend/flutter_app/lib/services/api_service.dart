@@ -8,6 +8,28 @@ class ApiService {
   
   ApiService(this.authService);
   
+  // List endpoints return one page at a time; follow X-Next-Cursor until
+  // the last page so callers get every item in the window
+  Future<List<dynamic>> _getAllPages(Uri uri, String error) async {
+    final items = <dynamic>[];
+    String? cursor;
+    do {
+      final page = cursor == null
+          ? uri
+          : uri.replace(queryParameters: {...uri.queryParameters, 'cursor': cursor});
+      final response = await http.get(
+        page,
+        headers: authService.getAuthHeaders(),
+      );
+      if (response.statusCode != 200) {
+        throw Exception(error);
+      }
+      items.addAll(json.decode(response.body));
+      cursor = response.headers['x-next-cursor'];
+    } while (cursor != null);
+    return items;
+  }
+  
   // Career Service
   Future<List<dynamic>> getCareerGoals() async {
     final response = await http.get(
@@ -40,6 +62,26 @@ class ApiService {
         .replace(queryParameters: {
           if (recordType != null) 'record_type': recordType,
           'days': days.toString(),
+          'limit': '500',
+        });
+    
+    return _getAllPages(uri, 'Failed to load health records');
+  }
+
+  // Chart data: min/mean/max per bucket (hour, day, week), or with
+  // maxPoints only, at most that many downsampled raw points
+  Future<Map<String, dynamic>> getHealthSeries(
+    String recordType, {
+    String? bucket,
+    int? maxPoints,
+    int days = 30,
+  }) async {
+    final uri = Uri.parse('$baseUrl/health/records/series')
+        .replace(queryParameters: {
+          'record_type': recordType,
+          'days': days.toString(),
+          if (bucket != null) 'bucket': bucket,
+          if (maxPoints != null) 'points': maxPoints.toString(),
         });
     
     final response = await http.get(
@@ -50,7 +92,7 @@ class ApiService {
     if (response.statusCode == 200) {
       return json.decode(response.body);
     }
-    throw Exception('Failed to load health records');
+    throw Exception('Failed to load health series');
   }
   
   Future<Map<String, dynamic>> createHealthRecord(Map<String, dynamic> record) async {
@@ -72,17 +114,10 @@ class ApiService {
         .replace(queryParameters: {
           if (transactionType != null) 'transaction_type': transactionType,
           'days': days.toString(),
+          'limit': '500',
         });
     
-    final response = await http.get(
-      uri,
-      headers: authService.getAuthHeaders(),
-    );
-    
-    if (response.statusCode == 200) {
-      return json.decode(response.body);
-    }
-    throw Exception('Failed to load transactions');
+    return _getAllPages(uri, 'Failed to load transactions');
   }
   
   Future<Map<String, dynamic>> createTransaction(Map<String, dynamic> transaction) async {